@@ -0,0 +1,3 @@
+"""
+Archivos __init__.py para hacer los módulos importables
+"""
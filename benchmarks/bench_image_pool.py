@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: escalado del ImageProcessingService con el número de núcleos
+
+Genera covers sintéticos y mide cuántas miniaturas por segundo se producen
+con hilos (como hoy) y con el pool de procesos para 1..N workers.
+
+Uso:
+    python3 benchmarks/bench_image_pool.py [--images 200] [--size 600x900]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from utils.image_pool import ImageProcessingService
+
+
+def make_images(directory, count, size):
+    """Crea imágenes JPEG con ruido (no se comprimen de forma trivial)"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"game-{i}.jpg")
+        Image.effect_noise(size, 60 + i % 40).convert('RGB').save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def thumbnail_in_thread(path, size):
+    with Image.open(path) as img:
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        return img.size
+
+
+def bench_threads(paths, size, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda p: thumbnail_in_thread(p, size), paths))
+    return len(paths) / (time.perf_counter() - start)
+
+
+def bench_processes(paths, size, workers):
+    service = ImageProcessingService(workers=workers)
+    try:
+        # Calentar el pool para no medir el arranque de los procesos
+        for future in [service.submit_thumbnail_file(p, size) for p in paths[:workers]]:
+            future.result()
+        start = time.perf_counter()
+        for future in [service.submit_thumbnail_file(p, size) for p in paths]:
+            future.result()
+        return len(paths) / (time.perf_counter() - start)
+    finally:
+        service.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--size', default='600x900', help='Tamaño de las imágenes generadas')
+    args = parser.parse_args()
+
+    image_size = tuple(int(v) for v in args.size.split('x'))
+    thumb_size = (150, 200)
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generando {args.images} imágenes {args.size}...")
+        paths = make_images(directory, args.images, image_size)
+
+        print(f"\n{'workers':>8} {'hilos img/s':>12} {'procesos img/s':>15} {'escala':>8}")
+        base = None
+        for workers in worker_counts:
+            threads = bench_threads(paths, thumb_size, workers)
+            processes = bench_processes(paths, thumb_size, workers)
+            base = base or processes
+            print(f"{workers:>8} {threads:>12.1f} {processes:>15.1f} {processes / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memoria de la lista de juegos en bibliotecas grandes
+
+Compara los registros Game (con __slots__) contra un dict por fila como
+los que se usaban antes (incluido configpath), y la búsqueda por slug con
+el índice contra un recorrido lineal de la lista.
+
+Uso:
+    python3 benchmarks/bench_memory.py [--games 10000 25000 50000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_library import create_synthetic_home, apply_to_config
+
+
+def load_dicts(db_path):
+    """Carga como antes: un dict por fila, con configpath"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.execute("""
+        SELECT id, slug, name, runner, platform, configpath,
+               has_custom_coverart_big, has_custom_banner, has_custom_icon
+        FROM games
+        WHERE installed = 1 AND runner IS NOT NULL
+        ORDER BY name
+    """)
+    games = [{
+        'id': row[0],
+        'slug': row[1],
+        'name': row[2],
+        'runner': row[3],
+        'platform': row[4],
+        'configpath': row[5],
+        'has_cover': bool(row[6]),
+        'has_banner': bool(row[7]),
+        'has_icon': bool(row[8])
+    } for row in cursor.fetchall()]
+    conn.close()
+    return games
+
+
+def measure_memory(load):
+    """(bytes retenidos por el resultado, pico durante la carga)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = load()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained - before, peak - before
+
+
+def measure_lookups(find, slugs):
+    start = time.perf_counter()
+    for slug in slugs:
+        find(slug)
+    return (time.perf_counter() - start) / len(slugs) * 1e6
+
+
+def run(count, workdir, seed):
+    from utils.database import LutrisDatabase
+    from utils.models import index_by_slug
+
+    home = os.path.join(workdir, f"home-{count}")
+    paths = create_synthetic_home(home, games=count, art_ratio=0.0, variants=1, seed=seed)
+    apply_to_config(paths, os.path.join(workdir, "cache"))
+    db = LutrisDatabase()
+
+    dicts, dict_bytes, dict_peak = measure_memory(lambda: load_dicts(paths['db_path']))
+    games, game_bytes, game_peak = measure_memory(db.get_all_games)
+    index, index_bytes, _ = measure_memory(lambda: index_by_slug(games))
+
+    rng = random.Random(seed)
+    slugs = [rng.choice(games).slug for _ in range(200)]
+    scan_us = measure_lookups(lambda slug: next((g for g in dicts if g['slug'] == slug), None), slugs)
+    index_us = measure_lookups(index.get, slugs)
+
+    return {
+        'games': len(games),
+        'dict_mb': dict_bytes / 2**20,
+        'dict_peak_mb': dict_peak / 2**20,
+        'game_mb': game_bytes / 2**20,
+        'game_peak_mb': game_peak / 2**20,
+        'index_mb': index_bytes / 2**20,
+        'scan_us': scan_us,
+        'index_us': index_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria de la lista de juegos")
+    parser.add_argument('--games', type=int, nargs='+', default=[10000, 25000, 50000])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'juegos':>8} {'dict MB':>9} {'pico':>7} {'Game MB':>9} {'pico':>7} "
+          f"{'índice MB':>10} {'lineal µs':>10} {'índice µs':>10}")
+    with tempfile.TemporaryDirectory(prefix="lvm-bench-mem-") as workdir:
+        for count in args.games:
+            r = run(count, workdir, args.seed)
+            print(f"{r['games']:>8} {r['dict_mb']:>9.2f} {r['dict_peak_mb']:>7.2f} "
+                  f"{r['game_mb']:>9.2f} {r['game_peak_mb']:>7.2f} {r['index_mb']:>10.2f} "
+                  f"{r['scan_us']:>10.1f} {r['index_us']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
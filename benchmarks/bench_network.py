@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rendimiento de red contra el servidor local de SteamGridDB
+
+Levanta benchmarks/sgdb_stub.py y mide búsquedas, listados de imágenes y
+descargas con distintos perfiles de fallos (latencia, 429, 5xx, cortes).
+Los resultados son reproducibles: no dependen de la red ni de la API real.
+
+Uso:
+    python3 benchmarks/bench_network.py [--games 20] [--profiles limpio lento 429]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from benchmarks.sgdb_stub import SteamGridDBStub
+from benchmarks.synthetic_library import create_synthetic_home, apply_to_config
+
+# Perfil -> fallos inyectados en el servidor
+PROFILES = {
+    'limpio': {},
+    'lento': {'latency': 0.05},
+    '429': {'rate_429': 0.1, 'retry_after': 0},
+    '5xx': {'rate_5xx': 0.1},
+    'cortes': {'rate_truncate': 0.1},
+}
+
+
+def run_profile(name, faults, args, workdir):
+    from utils.api import SteamGridDBAPI
+    from utils.image_manager import ImageManager
+
+    with SteamGridDBStub(seed=args.seed, **faults) as stub:
+        api = SteamGridDBAPI(base_url=stub.api_url)
+        manager = ImageManager()
+        timings = {}
+
+        start = time.perf_counter()
+        found = [api.search_game(f"juego {i}") for i in range(args.games)]
+        timings['search'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        images = [api.get_images(game['id'], 'cover') for game in found if game]
+        timings['get_images'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        downloads = 0
+        for i, candidates in enumerate(images):
+            if candidates:
+                path = os.path.join(workdir, f"{name}-{i}.jpg")
+                downloads += bool(manager.download_image(candidates[0].url, path))
+        timings['download'] = time.perf_counter() - start
+
+        return {
+            'found': sum(1 for game in found if game),
+            'downloads': downloads,
+            'requests': stub.stats['requests'],
+            'faults': sum(v for k, v in stub.stats.items() if k.startswith('fault:')),
+            **timings,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    # Sin pausas aleatorias: solo se mide el cliente y los fallos inyectados
+    config.API_REQUEST_JITTER = (0, 0)
+    config.STEAMGRIDDB_API_KEY = "benchmark"
+
+    print(f"\n{'perfil':<8} {'búsq. s':>8} {'imgs s':>8} {'desc. s':>8} {'ok':>7} {'peticiones':>11} {'fallos':>7}")
+    with tempfile.TemporaryDirectory() as workdir:
+        # Instalación vacía para no tocar la del usuario
+        paths = create_synthetic_home(os.path.join(workdir, "lutris"), games=0, variants=1)
+        apply_to_config(paths, os.path.join(workdir, "cache"))
+        for name in args.profiles:
+            r = run_profile(name, PROFILES[name], args, workdir)
+            print(f"{name:<8} {r['search']:>8.2f} {r['get_images']:>8.2f} {r['download']:>8.2f} "
+                  f"{r['found']:>3}/{r['downloads']:<3} {r['requests']:>11} {r['faults']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks sobre una biblioteca sintética grande
+
+Genera una instalación de Lutris falsa (pga.db + imágenes) y mide:
+listado de runners, consultas de juegos, generación de miniaturas,
+renderizado completo de la lista (si hay pantalla) y reemplazo masivo.
+
+Uso:
+    python3 benchmarks/run_benchmarks.py --games 5000 --output resultados.json
+    python3 benchmarks/run_benchmarks.py --baseline base.json
+    python3 benchmarks/run_benchmarks.py --save-baseline base.json
+"""
+import argparse
+import functools
+import http.server
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_library import create_synthetic_home, apply_to_config
+
+
+def measure(fn, repeat: int) -> dict:
+    """Ejecuta fn varias veces y resume los tiempos en milisegundos"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'max_ms': max(samples),
+        'repeat': repeat,
+    }
+
+
+# ==========================================
+# Benchmarks
+# ==========================================
+
+def bench_runner_listing(ctx, repeat):
+    db = ctx['db']
+    return measure(db.get_runners, repeat)
+
+
+def bench_game_queries(ctx, repeat):
+    db = ctx['db']
+    runners = db.get_runners()
+
+    def run():
+        for runner in runners:
+            db.get_games_by_runner(runner)
+
+    result = measure(run, repeat)
+    result['runners'] = len(runners)
+    return result
+
+
+def bench_all_games_query(ctx, repeat):
+    return measure(ctx['db'].get_all_games, repeat)
+
+
+def bench_thumbnails(ctx, repeat):
+    import config
+    manager = ctx['image_manager']
+    games = ctx['db'].get_all_games()[:ctx['args'].thumbnails]
+    sizes = {
+        'cover': (config.THUMBNAIL_WIDTH, config.THUMBNAIL_HEIGHT),
+        'banner': (config.BANNER_THUMBNAIL_WIDTH, config.BANNER_THUMBNAIL_HEIGHT),
+        'icon': (config.ICON_THUMBNAIL_SIZE, config.ICON_THUMBNAIL_SIZE),
+    }
+
+    def run():
+        for game in games:
+            for image_type, size in sizes.items():
+                manager.get_thumbnail(game.slug, image_type, size)
+
+    result = measure(run, repeat)
+    result['games'] = len(games)
+    result['per_game_ms'] = result['median_ms'] / max(1, len(games))
+    return result
+
+
+def bench_missing_art(ctx, repeat):
+    from utils.art_triage import find_missing_art
+    games = ctx['db'].get_all_games()
+    return measure(lambda: find_missing_art(games), repeat)
+
+
+def bench_search_index(ctx, repeat):
+    from utils.search_index import GameSearchIndex
+    games = ctx['db'].get_all_games()
+    index = GameSearchIndex(games)
+    result = measure(lambda: [index.search(q) for q in ("st", "street", "fihgter", "zelda 12")], repeat)
+    result['per_query_ms'] = result['median_ms'] / 4
+    return result
+
+
+def bench_list_render(ctx, repeat):
+    """Renderiza la lista completa del runner más grande (requiere pantalla)"""
+    if not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+        return {'skipped': 'sin pantalla (usa xvfb-run para medirlo)'}
+    try:
+        from ui.main_window import MainWindow
+        window = MainWindow()
+    except Exception as e:
+        return {'skipped': f"no se pudo crear la ventana: {e}"}
+
+    try:
+        window.root.withdraw()
+        runners = window.db.get_runners()
+        runner = max(runners, key=lambda r: len(window.db.get_games_by_runner(r)))
+        window.current_runner = runner
+        window.set_games(window.db.get_games_by_runner(runner)[:ctx['args'].render_limit])
+
+        def run():
+            window.display_games()
+            window.root.update_idletasks()
+
+        result = measure(run, repeat)
+        result['cards'] = len(window.games)
+        return result
+    finally:
+        window.on_close()
+
+
+def bench_bulk_replace(ctx, repeat):
+    """Reemplaza covers, banners e iconos servidos por un servidor HTTP local"""
+    templates = os.path.join(ctx['home'], ".templates")
+    handler = functools.partial(QuietHandler, directory=templates)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    manager = ctx['image_manager']
+    games = ctx['db'].get_all_games()[:ctx['args'].bulk]
+    urls = {
+        'cover': f"{base}/cover-0.jpg",
+        'banner': f"{base}/banner-0.jpg",
+        'icon': f"{base}/icon-0.png",
+    }
+    runs = itertools.count()
+
+    def run():
+        # URL distinta por juego, tipo y repetición (el servidor ignora la query):
+        # si no, la caché HTTP de imágenes sirve todo salvo la primera descarga
+        attempt = next(runs)
+        for game in games:
+            for image_type, url in urls.items():
+                manager.replace_image(game.slug, image_type, f"{url}?game={game.slug}&run={attempt}")
+
+    try:
+        result = measure(run, repeat)
+    finally:
+        server.shutdown()
+    result['games'] = len(games)
+    result['per_game_ms'] = result['median_ms'] / max(1, len(games))
+    return result
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+BENCHMARKS = {
+    'runner_listing': bench_runner_listing,
+    'game_queries': bench_game_queries,
+    'all_games_query': bench_all_games_query,
+    'thumbnails': bench_thumbnails,
+    'missing_art': bench_missing_art,
+    'search_index': bench_search_index,
+    'list_render': bench_list_render,
+    'bulk_replace': bench_bulk_replace,
+}
+
+
+# ==========================================
+# Comparación con la línea base
+# ==========================================
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Imprime la comparación y retorna los benchmarks que empeoraron"""
+    regressions = []
+    print(f"\n{'benchmark':<18} {'base ms':>10} {'actual ms':>10} {'ratio':>7}")
+    for name, result in results['results'].items():
+        base = baseline.get('results', {}).get(name, {})
+        if 'median_ms' not in result or 'median_ms' not in base:
+            continue
+        ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else 1.0
+        flag = "  ⚠️" if ratio > threshold else ""
+        print(f"{name:<18} {base['median_ms']:>10.2f} {result['median_ms']:>10.2f} {ratio:>6.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=2000, help='Juegos en la biblioteca sintética')
+    parser.add_argument('--runners', type=int, default=5)
+    parser.add_argument('--art-ratio', type=float, default=0.8, help='Fracción de juegos con cada imagen')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--thumbnails', type=int, default=200, help='Juegos para el benchmark de miniaturas')
+    parser.add_argument('--bulk', type=int, default=50, help='Juegos para el reemplazo masivo')
+    parser.add_argument('--render-limit', type=int, default=300, help='Máximo de cards a renderizar')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='Ejecutar solo estos benchmarks')
+    parser.add_argument('--output', help='Guardar resultados en este JSON')
+    parser.add_argument('--baseline', help='Comparar con un JSON de resultados anterior')
+    parser.add_argument('--save-baseline', help='Guardar los resultados como línea base')
+    parser.add_argument('--threshold', type=float, default=1.10, help='Ratio a partir del cual hay regresión')
+    parser.add_argument('--keep', action='store_true', help='No borrar la biblioteca sintética')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="lvm-bench-")
+    home = os.path.join(workdir, "lutris")
+    print(f"🧪 Generando biblioteca sintética ({args.games} juegos) en {home}...")
+    start = time.perf_counter()
+    paths = create_synthetic_home(home, games=args.games, runners=args.runners, art_ratio=args.art_ratio)
+    print(f"   lista en {time.perf_counter() - start:.1f}s")
+    apply_to_config(paths, os.path.join(workdir, "cache"))
+
+    from utils.database import LutrisDatabase
+    from utils.image_manager import ImageManager
+    ctx = {'args': args, 'home': home, 'db': LutrisDatabase(), 'image_manager': ImageManager()}
+
+    results = {
+        'meta': {
+            'games': args.games,
+            'runners': args.runners,
+            'art_ratio': args.art_ratio,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {}
+    }
+
+    for name in args.only or BENCHMARKS:
+        print(f"⏱️  {name}...", end=" ", flush=True)
+        result = BENCHMARKS[name](ctx, args.repeat)
+        results['results'][name] = result
+        if 'skipped' in result:
+            print(f"omitido ({result['skipped']})")
+        else:
+            print(f"{result['median_ms']:.2f} ms")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"💾 Resultados guardados en {path}")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            exit_code = 1
+
+    if not args.keep:
+        import shutil
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
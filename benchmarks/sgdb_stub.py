@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita la API de SteamGridDB (y su CDN de imágenes)
+
+Implementa /search/autocomplete, /grids/game, /heroes/game, /icons/game y
+sirve imágenes de fixtures (o generadas). Puede inyectar latencia, 429 con
+Retry-After, 403, 5xx y cuerpos truncados de forma reproducible (semilla).
+
+Uso como servidor:
+    python3 benchmarks/sgdb_stub.py --port 8765 --latency 0.05 --rate-429 0.1
+    LVM_STEAMGRIDDB_URL=http://127.0.0.1:8765/api/v2 python3 main.py
+
+Uso desde Python:
+    with SteamGridDBStub(latency=0.02) as stub:
+        api = SteamGridDBAPI(base_url=stub.api_url)
+"""
+import argparse
+import gzip
+import hashlib
+import http.server
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter
+
+API_PREFIX = "/api/v2"
+
+# Tipo de endpoint -> (carpeta de imágenes, tamaño, formato, mime)
+KINDS = {
+    'grids': ('grids', (600, 900), 'JPEG', 'image/jpeg'),
+    'heroes': ('heroes', (1920, 620), 'JPEG', 'image/jpeg'),
+    'icons': ('icons', (256, 256), 'PNG', 'image/png'),
+}
+THUMB_SIZES = {'grids': (300, 450), 'heroes': (480, 155), 'icons': (128, 128)}
+
+
+def _stable_id(text: str) -> int:
+    """Id determinista a partir de un texto"""
+    return int(hashlib.sha1(text.lower().encode()).hexdigest()[:7], 16)
+
+
+class _Faults:
+    """Configuración de fallos inyectados (probabilidades entre 0 y 1)"""
+
+    def __init__(self, latency=0.0, rate_429=0.0, retry_after=1, rate_403=0.0,
+                 rate_5xx=0.0, rate_truncate=0.0, seed=1234):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rate_403 = rate_403
+        self.rate_5xx = rate_5xx
+        self.rate_truncate = rate_truncate
+        self.random = random.Random(seed)
+        self.forced = []  # Fallos forzados para las próximas peticiones
+        self.lock = threading.Lock()
+
+    def next_fault(self):
+        """Decide el fallo (o None) para la siguiente petición"""
+        with self.lock:
+            if self.forced:
+                return self.forced.pop(0)
+            roll = self.random.random()
+            for fault, rate in (('429', self.rate_429), ('403', self.rate_403),
+                                ('5xx', self.rate_5xx), ('truncate', self.rate_truncate)):
+                if roll < rate:
+                    return fault
+                roll -= rate
+            return None
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "SGDBStub/1.0"
+
+    def log_message(self, *args):
+        if self.server.stub.verbose:
+            super().log_message(*args)
+
+    # ------------------------------------------
+
+    def do_GET(self):
+        stub = self.server.stub
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path
+        stub.stats['requests'] += 1
+        stub.stats[f"path:{path.split('/')[3] if path.startswith(API_PREFIX) else 'images'}"] += 1
+
+        if stub.faults.latency:
+            time.sleep(stub.faults.latency)
+
+        fault = stub.faults.next_fault()
+        if fault:
+            stub.stats[f"fault:{fault}"] += 1
+        if fault == '429':
+            return self._send(429, b'{"success":false,"errors":["Too Many Requests"]}',
+                              extra={'Retry-After': str(stub.faults.retry_after)})
+        if fault == '403':
+            return self._send(403, b'<html>Forbidden</html>', 'text/html')
+        if fault == '5xx':
+            return self._send(503, b'{"success":false}')
+
+        if path.startswith(API_PREFIX):
+            if not self.headers.get('Authorization', '').startswith('Bearer '):
+                return self._send(401, b'{"success":false,"errors":["Unauthorized"]}')
+            body = self._api(path[len(API_PREFIX):], urllib.parse.parse_qs(parsed.query))
+            if body is None:
+                return self._send(404, b'{"success":false,"errors":["Not found"]}')
+            extra = None
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                # mtime fijo: el mismo JSON comprimido da siempre el mismo ETag
+                body = gzip.compress(body, mtime=0)
+                extra = {'Content-Encoding': 'gzip'}
+            return self._send(200, body, extra=extra, truncate=fault == 'truncate')
+
+        image = stub.image_bytes(path)
+        if image is None:
+            return self._send(404, b'Not found', 'text/plain')
+        data, mime = image
+        return self._send(200, data, mime, truncate=fault == 'truncate')
+
+    def _api(self, path, query):
+        parts = [p for p in path.split('/') if p]
+        stub = self.server.stub
+
+        if parts[:2] == ['search', 'autocomplete'] and len(parts) == 3:
+            term = urllib.parse.unquote(parts[2])
+            data = [{
+                'id': _stable_id(f"{term}-{i}"),
+                'name': term.title() if i == 0 else f"{term.title()} {i + 1}",
+                'types': ['steam'],
+                'verified': i == 0,
+            } for i in range(stub.search_results)]
+            return json.dumps({'success': True, 'data': data}).encode()
+
+        if len(parts) == 3 and parts[0] in KINDS and parts[1] == 'game':
+            kind = parts[0]
+            game_id = parts[2]
+            base = f"http://{self.headers.get('Host')}"
+            folder, size, _fmt, mime = KINDS[kind]
+            data = []
+            for i in range(stub.images_per_game):
+                image_id = _stable_id(f"{kind}-{game_id}-{i}")
+                data.append({
+                    'id': image_id,
+                    'score': stub.images_per_game - i,
+                    'style': 'alternate',
+                    'width': size[0],
+                    'height': size[1],
+                    'nsfw': False,
+                    'humor': False,
+                    'notes': None,
+                    'mime': mime,
+                    'language': 'en',
+                    'url': f"{base}/{folder}/{image_id}{'.png' if mime == 'image/png' else '.jpg'}",
+                    'thumb': f"{base}/thumbs/{folder}/{image_id}{'.png' if mime == 'image/png' else '.jpg'}",
+                    'lock': False,
+                    'epilepsy': False,
+                    'upvotes': 10 - i % 10,
+                    'downvotes': i % 3,
+                    'author': {'name': 'stub', 'steam64': '0', 'avatar': f"{base}/avatar.png"},
+                })
+            return json.dumps({'success': True, 'page': 0, 'total': len(data), 'limit': 50, 'data': data}).encode()
+
+        return None
+
+    def _send(self, code, body, content_type='application/json', extra=None, truncate=False):
+        if code == 200 and not truncate:
+            # Validador como el del CDN: un If-None-Match que coincide recibe 304 sin cuerpo
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            extra = dict(extra or {}, ETag=etag)
+            if self.headers.get('If-None-Match') == etag:
+                self.server.stub.stats['not_modified'] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+        self.server.stub.stats['bytes_sent'] += len(body[:len(body) // 2] if truncate else body)
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        # En un cuerpo truncado se anuncia la longitud completa y se corta la conexión
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        if truncate:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body[:len(body) // 2] if truncate else body)
+        if truncate:
+            self.close_connection = True
+
+
+class SteamGridDBStub:
+    """Servidor de prueba en un hilo; usable como context manager"""
+
+    def __init__(self, host='127.0.0.1', port=0, fixtures_dir=None, images_per_game=30,
+                 search_results=5, verbose=False, **faults):
+        """
+        Args:
+            host, port: Dirección de escucha (port=0 elige uno libre)
+            fixtures_dir: Carpeta con grids/, heroes/ e icons/ (opcional)
+            images_per_game: Imágenes que lista cada endpoint de imágenes
+            search_results: Resultados de /search/autocomplete
+            **faults: latency, rate_429, retry_after, rate_403, rate_5xx,
+                      rate_truncate, seed
+        """
+        self.fixtures_dir = fixtures_dir
+        self.images_per_game = images_per_game
+        self.search_results = search_results
+        self.verbose = verbose
+        self.faults = _Faults(**faults)
+        self.stats = Counter()
+        self._images = {}
+        self._server = http.server.ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        """Valor para SteamGridDBAPI(base_url=...) o LVM_STEAMGRIDDB_URL"""
+        return self.base_url + API_PREFIX
+
+    def set_faults(self, **faults):
+        """Cambia los fallos inyectados en caliente"""
+        for key, value in faults.items():
+            setattr(self.faults, key, value)
+
+    def force(self, *faults):
+        """Fuerza fallos ('429', '403', '5xx', 'truncate') para las próximas peticiones"""
+        with self.faults.lock:
+            self.faults.forced.extend(faults)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def image_bytes(self, path):
+        """Bytes y mime de una imagen servida (fixture o generada una vez por tipo)"""
+        parts = [p for p in path.split('/') if p]
+        thumb = bool(parts) and parts[0] == 'thumbs'
+        if thumb:
+            parts = parts[1:]
+        if len(parts) != 2:
+            return None
+        kind = next((k for k, spec in KINDS.items() if spec[0] == parts[0]), None)
+        if kind is None:
+            return None
+
+        key = (kind, thumb)
+        if key not in self._images:
+            self._images[key] = self._load_image(kind, parts[1], thumb)
+        return self._images[key]
+
+    def _load_image(self, kind, name, thumb):
+        folder, size, image_format, mime = KINDS[kind]
+        if self.fixtures_dir:
+            candidates = [os.path.join(self.fixtures_dir, folder, name)]
+            folder_path = os.path.join(self.fixtures_dir, folder)
+            if os.path.isdir(folder_path):
+                candidates += sorted(os.path.join(folder_path, f) for f in os.listdir(folder_path))
+            for candidate in candidates:
+                if os.path.isfile(candidate):
+                    with open(candidate, 'rb') as f:
+                        return f.read(), mime
+
+        from PIL import Image
+        buffer = io.BytesIO()
+        image = Image.effect_noise(THUMB_SIZES[kind] if thumb else size, 50)
+        image = image.convert('RGBA' if image_format == 'PNG' else 'RGB')
+        image.save(buffer, image_format, quality=90)
+        return buffer.getvalue(), mime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', help='Carpeta con grids/, heroes/ e icons/')
+    parser.add_argument('--latency', type=float, default=0.0, help='Segundos añadidos a cada respuesta')
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--rate-403', type=float, default=0.0)
+    parser.add_argument('--rate-5xx', type=float, default=0.0)
+    parser.add_argument('--rate-truncate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    stub = SteamGridDBStub(
+        host=args.host, port=args.port, fixtures_dir=args.fixtures, verbose=args.verbose,
+        latency=args.latency, rate_429=args.rate_429, retry_after=args.retry_after,
+        rate_403=args.rate_403, rate_5xx=args.rate_5xx, rate_truncate=args.rate_truncate,
+        seed=args.seed
+    )
+    print(f"🧪 SteamGridDB de prueba en {stub.api_url}")
+    print(f"   LVM_STEAMGRIDDB_URL={stub.api_url} python3 main.py")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n📊 {dict(stub.stats)}")
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Generador de una instalación sintética de Lutris para benchmarks
+Crea un pga.db con el esquema real de la tabla games y covers, banners e
+iconos de tamaños realistas.
+"""
+import os
+import random
+import shutil
+import sqlite3
+from PIL import Image
+
+# Esquema de la tabla games de Lutris (pga.db)
+GAMES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    sortname TEXT,
+    slug TEXT,
+    installer_slug TEXT,
+    parent_slug TEXT,
+    platform TEXT,
+    runner TEXT,
+    executable TEXT,
+    directory TEXT,
+    updated DATETIME,
+    lastplayed INTEGER,
+    installed INTEGER,
+    installed_at INTEGER,
+    year INTEGER,
+    configpath TEXT,
+    has_custom_banner INTEGER,
+    has_custom_icon INTEGER,
+    has_custom_coverart_big INTEGER,
+    playtime REAL,
+    hidden INTEGER,
+    service TEXT,
+    service_id TEXT,
+    discord_id TEXT
+)
+"""
+
+RUNNERS = {
+    "mame": "Arcade",
+    "duckstation": "Sony PlayStation",
+    "pcsx2": "Sony PlayStation 2",
+    "citra": "Nintendo 3DS",
+    "cemu": "Nintendo Wii U",
+    "wine": "Windows",
+    "linux": "Linux",
+    "dolphin": "Nintendo GameCube",
+}
+
+WORDS = [
+    "street", "fighter", "metal", "gear", "final", "fantasy", "super", "mario",
+    "legend", "zelda", "resident", "evil", "crash", "spyro", "sonic", "racing",
+    "dragon", "quest", "kingdom", "hearts", "tekken", "soul", "calibur", "gran",
+]
+REGIONS = ["(USA)", "(Europe)", "(Japan)", "(World 910522)", "(Rev 1)", ""]
+
+# Tamaños típicos de SteamGridDB / Lutris
+ART_SPECS = {
+    'cover': ((600, 900), 'JPEG', '.jpg'),
+    'banner': ((1920, 620), 'JPEG', '.jpg'),
+    'icon': ((128, 128), 'PNG', '.png'),
+}
+
+
+def make_game_name(rng: random.Random, index: int) -> str:
+    words = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(2, 4)))
+    return f"{words} {index} {rng.choice(REGIONS)}".strip()
+
+
+def _make_templates(directory: str, rng: random.Random, variants: int):
+    """Crea unas pocas imágenes por tipo que luego se copian (decodificar cuesta lo mismo)"""
+    templates = {}
+    for image_type, (size, image_format, extension) in ART_SPECS.items():
+        templates[image_type] = []
+        for i in range(variants):
+            path = os.path.join(directory, f"{image_type}-{i}{extension}")
+            noise = Image.effect_noise(size, 30 + rng.randint(0, 60))
+            if image_format == 'PNG':
+                noise.convert('RGBA').save(path, image_format)
+            else:
+                noise.convert('RGB').save(path, image_format, quality=90)
+            templates[image_type].append(path)
+    return templates
+
+
+def create_synthetic_home(root: str, games: int = 1000, runners: int = 5,
+                          art_ratio: float = 0.8, seed: int = 42, variants: int = 8) -> dict:
+    """
+    Crea una instalación de Lutris sintética
+
+    Args:
+        root: Directorio donde crear la instalación
+        games: Cantidad de juegos
+        runners: Cantidad de runners distintos entre los que repartirlos
+        art_ratio: Fracción de juegos con cada tipo de imagen
+        seed: Semilla (resultados reproducibles)
+        variants: Imágenes distintas por tipo
+
+    Returns:
+        Dict de rutas con las mismas claves que LDetector.get_paths()
+    """
+    rng = random.Random(seed)
+    paths = {
+        'mode': 'SINTETICO',
+        'db_path': os.path.join(root, "pga.db"),
+        'covers_dir': os.path.join(root, "coverart/"),
+        'banners_dir': os.path.join(root, "banners/"),
+        'lutris_icons_dir': os.path.join(root, "icons/"),
+        'config_dir_main': os.path.join(root, "games/"),
+        'system_icons_dir': os.path.join(root, "hicolor/128x128/apps/"),
+    }
+    for key in ('covers_dir', 'banners_dir', 'lutris_icons_dir', 'config_dir_main', 'system_icons_dir'):
+        os.makedirs(paths[key], exist_ok=True)
+
+    templates_dir = os.path.join(root, ".templates")
+    os.makedirs(templates_dir, exist_ok=True)
+    templates = _make_templates(templates_dir, rng, variants)
+    art_dirs = {
+        'cover': paths['covers_dir'],
+        'banner': paths['banners_dir'],
+        'icon': paths['lutris_icons_dir'],
+    }
+
+    runner_names = list(RUNNERS)[:max(1, min(runners, len(RUNNERS)))]
+    rows = []
+    for index in range(games):
+        runner = runner_names[index % len(runner_names)]
+        name = make_game_name(rng, index)
+        slug = f"game-{index}"
+        flags = {}
+        for image_type, (_size, _fmt, extension) in ART_SPECS.items():
+            present = rng.random() < art_ratio
+            flags[image_type] = int(present)
+            if present:
+                shutil.copyfile(rng.choice(templates[image_type]),
+                                os.path.join(art_dirs[image_type], f"{slug}{extension}"))
+        rows.append((
+            index + 1, name, name, slug, None, None, RUNNERS[runner], runner,
+            None, f"/games/{slug}", None, None, 1, 0, None, f"{slug}-{index}",
+            flags['banner'], flags['icon'], flags['cover'], 0.0, 0, None, None, None
+        ))
+
+    conn = sqlite3.connect(paths['db_path'])
+    conn.execute(GAMES_SCHEMA)
+    conn.executemany(f"INSERT INTO games VALUES ({', '.join('?' * 24)})", rows)
+    conn.commit()
+    conn.close()
+    return paths
+
+
+def apply_to_config(paths: dict, cache_dir: str):
+    """Apunta el módulo config a la instalación sintética (sin tocar la del usuario)"""
+    import config
+    config.DB_PATH = paths['db_path']
+    config.COVERS_DIR = paths['covers_dir']
+    config.BANNERS_DIR = paths['banners_dir']
+    config.LUTRIS_ICONS_DIR = paths['lutris_icons_dir']
+    config.SYSTEM_ICONS_DIR = paths['system_icons_dir']
+    config.CACHE_DIR = cache_dir
+    os.makedirs(cache_dir, exist_ok=True)
@@ -11,12 +11,66 @@ import sys
 # El usuario debe proporcionarlo al iniciar la aplicación
 STEAMGRIDDB_API_KEY = None
 
+# URL base de la API (se puede apuntar a un servidor local de pruebas,
+# ver benchmarks/sgdb_stub.py)
+STEAMGRIDDB_BASE_URL = os.environ.get("LVM_STEAMGRIDDB_URL", "https://www.steamgriddb.com/api/v2").rstrip("/")
+
+# Pausa aleatoria (mín, máx) en segundos antes de cada petición a la API
+API_REQUEST_JITTER = (0.5, 1.0)
+
+# ==========================================
+# 📡 CONEXIÓN Y MODO SIN CONEXIÓN
+# ==========================================
+# Forzar el modo sin conexión (solo cachés locales)
+OFFLINE_MODE = os.environ.get("LVM_OFFLINE", "") not in ("", "0")
+# Tiempo máximo de la sonda de conectividad (segundos)
+CONNECTIVITY_PROBE_TIMEOUT = 1.5
+# Cada cuánto se vuelve a sondear estando sin conexión (segundos)
+OFFLINE_RECHECK_INTERVAL = 30.0
+# Tamaño máximo de la caché de respuestas, miniaturas e imágenes (MB)
+HTTP_CACHE_MAX_MB = 500
+# Tiempo en que una respuesta de la API en caché se usa sin consultar (segundos);
+# pasado ese tiempo se revalida con If-None-Match / If-Modified-Since
+API_CACHE_FRESH_SECONDS = 600
+# Lo mismo para miniaturas e imágenes (casi nunca cambian)
+IMAGE_CACHE_FRESH_SECONDS = 7 * 24 * 3600
+# Fallos seguidos (403, 5xx, cortes) que pausan las peticiones a un host
+BREAKER_FAILURE_THRESHOLD = 5
+# Segundos de pausa antes de probar de nuevo con una sola petición
+BREAKER_COOLDOWN = 30.0
+# Reintentos permitidos por petición (fracción) y mínimo por segundo
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MIN_PER_SECOND = 0.5
+# Tiempos de espera por tipo de tráfico: (conexión, lectura) en segundos
+NET_TIMEOUTS = {
+    'api': (5.0, 15.0),        # búsquedas y listados de SteamGridDB
+    'thumbnail': (3.0, 5.0),   # miniaturas del selector
+    'image': (5.0, 20.0),      # imágenes completas e iconos
+}
+# Plazo total de una operación, reintentos y esperas incluidos (segundos)
+NET_DEADLINES = {
+    'api': 45.0,
+    'thumbnail': 5.0,
+    'image': 60.0,
+}
+# Peticiones simultáneas por destino: API de SteamGridDB y CDN de imágenes
+SCHEDULER_LIMITS = {
+    'api': 3,
+    'images': 6,
+}
+# Hilos de cada destino que la precarga y los trabajos masivos no pueden ocupar
+SCHEDULER_RESERVED = 1
+# Segundos de espera tras los que una tarea encolada sube un nivel de prioridad
+SCHEDULER_AGING_SECONDS = 3.0
+# Parecido mínimo (0-1) entre un nombre local y un resultado de SteamGridDB
+# para aceptarlo al resolver juegos en bloque
+NAME_MATCH_MIN_SCORE = 0.5
+
 # ==========================================
 # 📁 RUTAS DE LUTRIS (DETECCIÓN AUTOMÁTICA)
 # ==========================================
-# Importar el detector universal
+# El detector universal se importa al configurar las rutas (no al arrancar)
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from l_detector import get_lutris_paths
 
 # Esta función se llamará después de obtener el modo del usuario
 def configure_lutris_paths(mode=None):
@@ -27,6 +81,7 @@ def configure_lutris_paths(mode=None):
         mode: 'NATIVO', 'FLATPAK' o 'NATIVO_DEFAULT'
     """
     global DB_PATH, COVERS_DIR, BANNERS_DIR, LUTRIS_ICONS_DIR, SYSTEM_ICONS_DIR
+    from l_detector import get_lutris_paths
     
     print("🔍 Configurando rutas de Lutris...")
     _paths = get_lutris_paths(interactive=False, mode=mode)
@@ -69,10 +124,30 @@ BANNER_THUMBNAIL_WIDTH = 300
 BANNER_THUMBNAIL_HEIGHT = 100  # Para banners (heroes)
 ICON_THUMBNAIL_SIZE = 64
 
+# Tamaños de los iconos generados (PNG)
+LUTRIS_ICON_SIZE = 128
+SYSTEM_ICON_SIZES = (32, 48, 64, 128, 256)  # Tamaños del tema hicolor
+
 # Tamaños de imágenes en el selector
 SELECTOR_THUMB_WIDTH = 200
 SELECTOR_THUMB_HEIGHT = 280
 
+# ==========================================
+# 🗜️ NORMALIZACIÓN DE IMÁGENES DESCARGADAS
+# ==========================================
+# Desactivada por defecto (el usuario puede activarla en la configuración)
+ART_NORMALIZE_DEFAULT = False
+# Tamaño máximo (ancho, alto) por tipo; nunca se amplía
+ART_TARGET_SIZES = {
+    "cover": (600, 900),
+    "banner": (960, 310),
+}
+ART_JPEG_QUALITY = 88
+ART_PNG_COMPRESS_LEVEL = 9
+
+# Procesos para trabajos masivos de imágenes (None = número de CPUs)
+IMAGE_POOL_WORKERS = None
+
 # ==========================================
 # 🎮 PLATAFORMAS SOPORTADAS
 # ==========================================
@@ -98,8 +173,20 @@ SKIP_COUNT = {
     "icon": 1
 }
 
+# ==========================================
+# 👀 VIGILANCIA DE IMÁGENES
+# ==========================================
+# Segundos de calma antes de refrescar las cards afectadas
+WATCHER_DEBOUNCE = 0.5
+# Intervalo de sondeo cuando inotify no está disponible
+WATCHER_POLL_INTERVAL = 3.0
+
 # ==========================================
 # 🔄 CACHE
 # ==========================================
+# Cada módulo crea sus subdirectorios al usarlos (no se toca el disco al importar)
 CACHE_DIR = os.path.expanduser("~/.cache/lutris_visual_manager/")
-os.makedirs(CACHE_DIR, exist_ok=True)
+# Respaldos de imágenes reemplazadas: trabajos que se conservan siempre
+# y antigüedad (días) a partir de la cual se olvidan los demás
+BACKUP_KEEP_JOBS = 20
+BACKUP_KEEP_DAYS = 30
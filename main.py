@@ -7,8 +7,13 @@ Autor: Asistente AI
 Fecha: Diciembre 2025
 """
 
+import argparse
 import sys
 import os
+import time
+
+# Inicio del proceso (para --startup-profile)
+_START = time.perf_counter()
 
 # Asegurarse de que el directorio actual esté en el path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -37,94 +42,166 @@ def check_dependencies():
         print("Instala con: sudo apt install python3-tk")
         return False
     
-    try:
-        from PIL import Image
-    except ImportError:
+    # Solo comprobar que Pillow está instalado: se importa al cargar imágenes
+    import importlib.util
+    if importlib.util.find_spec("PIL") is None:
         print("❌ Error: Pillow no está instalado.")
         print("Instala con: pip install Pillow")
         return False
     
     return True
 
+def parse_args():
+    """Opciones de línea de comandos (diagnóstico)"""
+    parser = argparse.ArgumentParser(description="Lutris Visual Manager")
+    parser.add_argument('--trace', metavar='ARCHIVO',
+                        help='Guardar trazas de rendimiento (Chrome trace-event JSON) al salir')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='Medir el tiempo hasta el primer pintado por fases y salir')
+    return parser.parse_args()
+
+def create_root():
+    """Crea la única ventana raíz de Tk de la aplicación (las vistas se alternan en ella)"""
+    import customtkinter as ctk
+    from ui import theme
+    
+    # Configurar escalado de fuentes para reducir carga en X11
+    try:
+        ctk.deactivate_automatic_dpi_awareness()
+    except Exception:
+        pass
+    
+    theme.apply_theme()
+    root = ctk.CTk()
+    root.configure(fg_color=theme.PRIMARY_BG)
+    return root
+
 def main():
     """Punto de entrada de la aplicación"""
+    args = parse_args()
+    
     print("=" * 50)
     print("🎮 L-Visual-Manager")
     print("=" * 50)
     
+    # Trazas de rendimiento (desactivadas salvo --trace o LVM_TRACE)
+    from utils import tracing
+    if args.trace:
+        tracing.enable(args.trace)
+    else:
+        tracing.enable_from_environment()
+    
+    from utils.startup_profile import StartupProfiler
+    profiler = StartupProfiler(enabled=args.startup_profile, start=_START)
+    
     # Verificar dependencias
     if not check_dependencies():
         sys.exit(1)
     
     # Cargar gestor de configuración
     from utils.config_manager import get_config_manager
+    import config
     config_mgr = get_config_manager()
+    profiler.mark("configuración")
     
-    # Verificar si ya existe un API Key guardado
-    saved_api_key = config_mgr.get_api_key()
+    root = create_root()
+    profiler.mark("ventana raíz")
     
-    if saved_api_key:
-        print("\n✓ API Key encontrado en configuración")
-        api_key = saved_api_key
-    else:
-        # Solicitar API Key
-        print("\n🔑 Solicitando API Key de SteamGridDB...")
-        from ui.apikey_window import get_api_key
+    # Estado compartido entre las vistas
+    state = {'exit_code': 0, 'app': None}
+    
+    def quit_app(exit_code=0, message=None):
+        if message:
+            print(message)
+        state['exit_code'] = exit_code
+        if state['app'] is not None:
+            state['app'].on_close()
+        else:
+            root.destroy()
+    
+    root.protocol("WM_DELETE_WINDOW", lambda: quit_app(1, "\n❌ Ventana cerrada. Saliendo..."))
+    
+    def start_main_window(selected_mode):
+        if not selected_mode:
+            quit_app(1, "\n❌ No se seleccionó ninguna instalación. Saliendo...")
+            return
+        
+        print(f"\n✓ Modo seleccionado: {selected_mode}")
+        
+        # Guardar el modo seleccionado para la próxima vez
+        config_mgr.set_last_installation_mode(selected_mode)
+        
+        # Configurar rutas de Lutris según el modo seleccionado
+        config.configure_lutris_paths(selected_mode)
+        profiler.mark("rutas de Lutris")
+        
+        # Verificar que la base de datos exista
+        if not os.path.exists(config.DB_PATH):
+            print(f"❌ Error: No se encuentra la base de datos de Lutris en:")
+            print(f"   {config.DB_PATH}")
+            print("\n¿Tienes Lutris instalado?")
+            quit_app(1)
+            return
         
-        api_key = get_api_key(show_change_option=False)
+        print("✓ Base de datos de Lutris encontrada")
+        print("✓ Iniciando aplicación...")
+        print("\n⚠️  IMPORTANTE: Cierra Lutris antes de hacer cambios")
+        print("=" * 50)
         
+        from ui.main_window import MainWindow
+        profiler.mark("importar ventana principal")
+        state['app'] = MainWindow(root=root)
+        profiler.mark("construir ventana principal")
+        
+        # Con --startup-profile se sale tras el primer pintado de la ventana principal
+        profiler.mark_first_paint(root, "pintado ventana principal",
+                                  callback=lambda: quit_app(0))
+    
+    def ask_installation():
+        # Mostrar la vista de selección de instalación
+        print("\n🔍 Detectando instalaciones de Lutris...")
+        from ui.installation_selector import InstallationSelector
+        
+        saved_mode = config_mgr.get_last_installation_mode()
+        selector = InstallationSelector(master=root, on_done=start_main_window)
+        
+        # El perfil de arranque no espera al usuario: usa el último modo guardado
+        auto_select = None
+        if args.startup_profile and saved_mode:
+            auto_select = lambda: selector.select_mode(saved_mode)
+        profiler.mark_first_paint(root, "pintado primera vista", callback=auto_select)
+    
+    def on_api_key(api_key):
         if not api_key:
-            print("\n❌ No se proporcionó API Key. Saliendo...")
-            sys.exit(1)
+            quit_app(1, "\n❌ No se proporcionó API Key. Saliendo...")
+            return
         
         # Guardar API Key
         if config_mgr.set_api_key(api_key):
             print("✓ API Key guardado correctamente")
         else:
             print("⚠️  No se pudo guardar el API Key (se usará esta sesión)")
+        
+        config.STEAMGRIDDB_API_KEY = api_key
+        ask_installation()
     
-    # Configurar API Key en config
-    import config
-    config.STEAMGRIDDB_API_KEY = api_key
-    
-    # Verificar si hay un modo de instalación guardado
-    saved_mode = config_mgr.get_last_installation_mode()
-    
-    # Mostrar ventana de selección de instalación
-    print("\n🔍 Detectando instalaciones de Lutris...")
-    from ui.installation_selector import get_installation_choice
-    
-    selected_mode = get_installation_choice(default_mode=saved_mode)
-    
-    if not selected_mode:
-        print("\n❌ No se seleccionó ninguna instalación. Saliendo...")
-        sys.exit(1)
-    
-    print(f"\n✓ Modo seleccionado: {selected_mode}")
-    
-    # Guardar el modo seleccionado para la próxima vez
-    config_mgr.set_last_installation_mode(selected_mode)
-    
-    # Configurar rutas de Lutris según el modo seleccionado
-    config.configure_lutris_paths(selected_mode)
-    
-    # Verificar que la base de datos exista
-    if not os.path.exists(config.DB_PATH):
-        print(f"❌ Error: No se encuentra la base de datos de Lutris en:")
-        print(f"   {config.DB_PATH}")
-        print("\n¿Tienes Lutris instalado?")
-        sys.exit(1)
+    # Verificar si ya existe un API Key guardado
+    saved_api_key = config_mgr.get_api_key()
     
-    print("✓ Base de datos de Lutris encontrada")
-    print("✓ Iniciando aplicación...")
-    print("\n⚠️  IMPORTANTE: Cierra Lutris antes de hacer cambios")
-    print("=" * 50)
+    if saved_api_key:
+        print("\n✓ API Key encontrado en configuración")
+        config.STEAMGRIDDB_API_KEY = saved_api_key
+        ask_installation()
+    else:
+        # Solicitar API Key
+        print("\n🔑 Solicitando API Key de SteamGridDB...")
+        from ui.apikey_window import APIKeyWindow
+        APIKeyWindow(show_change_option=False, master=root, on_done=on_api_key)
+        profiler.mark_first_paint(root, "pintado primera vista")
     
-    # Iniciar la aplicación
+    # Un único bucle de eventos para todas las vistas
     try:
-        from ui.main_window import MainWindow
-        app = MainWindow()
-        app.run()
+        root.mainloop()
     except KeyboardInterrupt:
         print("\n\n👋 Aplicación cerrada por el usuario")
     except Exception as e:
@@ -132,6 +209,9 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    
+    profiler.report()
+    sys.exit(state['exit_code'])
 
 if __name__ == "__main__":
     main()
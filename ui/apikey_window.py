@@ -15,18 +15,21 @@ except:
     pass
 
 class APIKeyWindow:
-    def __init__(self, show_change_option=False, current_key=None):
+    def __init__(self, show_change_option=False, current_key=None, master=None, on_done=None):
         """
         Args:
             show_change_option: Si es True, muestra opción para cambiar API Key existente
             current_key: API Key actual a mostrar en el campo (opcional)
+            master: Ventana existente donde mostrar la vista (por defecto crea una propia)
+            on_done: Callback con el API Key (o None si se canceló) al usar master
         """
         self.api_key = None
         self.show_change_option = show_change_option
         self.current_key = current_key
-        self.window = ctk.CTk()
+        self.on_done = on_done
+        self.standalone = master is None
+        self.window = ctk.CTk() if self.standalone else master
         self.window.title("API Key - SteamGridDB")
-        self.window.geometry("600x450")
         self.center_window(600, 450)
         
         # Configurar el tema
@@ -36,6 +39,10 @@ class APIKeyWindow:
         # Prevenir cierre con X
         self.window.protocol("WM_DELETE_WINDOW", self.on_cancel)
         
+        # Contenedor de la vista (se destruye al terminar si la ventana es compartida)
+        self.container = ctk.CTkFrame(self.window, fg_color=theme.PRIMARY_BG, corner_radius=0)
+        self.container.pack(fill="both", expand=True)
+        
         self.create_widgets()
     
     def center_window(self, width, height):
@@ -50,7 +57,7 @@ class APIKeyWindow:
         """Crea los widgets de la interfaz"""
         # Frame principal con padding
         main_frame = ctk.CTkFrame(
-            self.window,
+            self.container,
             fg_color=theme.PRIMARY_BG,
             corner_radius=0
         )
@@ -202,14 +209,22 @@ class APIKeyWindow:
             return
         
         self.api_key = api_key
-        self.window.quit()
-        self.window.destroy()
+        self.finish()
     
     def on_cancel(self):
         """Cancela y cierra la aplicación"""
         self.api_key = None
-        self.window.quit()
-        self.window.destroy()
+        self.finish()
+    
+    def finish(self):
+        """Cierra la ventana propia o retira la vista y avisa con on_done"""
+        if self.standalone:
+            self.window.quit()
+            self.window.destroy()
+            return
+        self.container.destroy()
+        if self.on_done:
+            self.on_done(self.api_key)
     
     def show_error(self, message):
         """Muestra un mensaje de error"""
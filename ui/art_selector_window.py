@@ -0,0 +1,443 @@
+"""
+Selector de imágenes de un juego con pestañas Cover / Banner / Icono
+Pide las tres listas a SteamGridDB a la vez al abrir y conserva listas y
+miniaturas mientras la ventana siga abierta: cambiar de pestaña no vuelve
+a descargar nada. Se puede elegir una imagen por pestaña y aplicarlas
+todas juntas.
+"""
+import customtkinter as ctk
+from typing import Callable
+import os
+from utils.api import SteamGridDBAPI
+from utils.image_manager import ImageManager
+from utils.connectivity import get_connectivity
+from utils.scheduler import get_scheduler, INTERACTIVE, VISIBLE, OFFSCREEN
+from ui import theme
+
+# Configurar CustomTkinter para evitar problemas de X11
+os.environ.setdefault('TK_SILENCE_DEPRECATION', '1')
+
+IMAGE_TYPES = ('cover', 'banner', 'icon')
+TYPE_NAMES = {'cover': 'Cover', 'banner': 'Banner', 'icon': 'Icono'}
+
+# Miniaturas por tipo: (ancho, alto, columnas, separación)
+GRID_LAYOUT = {
+    'cover': (200, 280, 4, theme.PADDING_S),   # Proporción 2:3
+    'banner': (400, 140, 2, theme.PADDING_M),  # Proporción ~3:1
+    'icon': (128, 128, 5, theme.PADDING_S),
+}
+
+# Filas de miniaturas que caben en pantalla (el resto se pide después)
+VISIBLE_ROWS = 2
+
+# Imágenes que se piden por tipo
+IMAGES_PER_TYPE = 20
+
+
+class ArtSelectorWindow:
+    def __init__(self, parent, game_name: str, game_id: int, slug: str, runner: str,
+                 on_apply: Callable, initial_type: str = 'cover'):
+        """
+        Ventana para elegir cover, banner e icono de un juego en SteamGridDB
+
+        Args:
+            parent: Ventana padre
+            game_name: Nombre del juego
+            game_id: ID del juego en SGDB
+            slug: Slug del juego en Lutris
+            runner: Runner del juego
+            on_apply: Función on_apply(slug, {tipo: url}) con las imágenes elegidas
+            initial_type: Pestaña abierta al empezar
+        """
+        self.parent = parent
+        self.game_name = game_name
+        self.game_id = game_id
+        self.slug = slug
+        self.runner = runner
+        self.on_apply = on_apply
+
+        self.api = SteamGridDBAPI()
+        self.image_manager = ImageManager()
+        self.scheduler = get_scheduler()
+
+        self.images = {}  # tipo -> lista de ImageCandidate
+        self.selections = {}  # tipo -> url elegida
+        self.selected_cards = {}  # tipo -> card marcada
+        self.thumb_futures = {image_type: [] for image_type in IMAGE_TYPES}
+        self.promoted = set()  # pestañas cuyas miniaturas ya son todas visibles
+        self.closed = False
+
+        # Crear ventana
+        self.window = ctk.CTkToplevel(parent)
+        self.window.title(f"Imágenes - {game_name}")
+        self.window.geometry("1000x740")
+        self.window.configure(fg_color=theme.PRIMARY_BG)
+
+        # Hacer modal
+        self.window.transient(parent)
+        self.window.grab_set()
+
+        self.setup_ui()
+        self.tabview.set(self.tab_name(initial_type if initial_type in IMAGE_TYPES else 'cover'))
+        self.load_all()
+
+    @staticmethod
+    def tab_name(image_type):
+        return f"{theme.ICONS[image_type]} {TYPE_NAMES[image_type]}"
+
+    def current_type(self):
+        current = self.tabview.get()
+        return next(t for t in IMAGE_TYPES if self.tab_name(t) == current)
+
+    def setup_ui(self):
+        """Configura la interfaz de la ventana"""
+        # Header
+        header = ctk.CTkFrame(self.window, fg_color=theme.SECONDARY_BG, corner_radius=0, height=80)
+        header.pack(fill="x")
+        header.pack_propagate(False)
+
+        header_content = ctk.CTkFrame(header, fg_color="transparent")
+        header_content.pack(expand=True, fill="both", padx=theme.PADDING_L)
+
+        ctk.CTkLabel(
+            header_content,
+            text=f"{theme.ICONS['game']} {self.game_name}",
+            font=theme.FONT_SUBTITLE,
+            text_color=theme.TEXT_PRIMARY
+        ).pack(anchor="w", pady=(theme.PADDING_S, 0))
+
+        ctk.CTkLabel(
+            header_content,
+            text="Elige una imagen en cada pestaña y aplícalas juntas",
+            font=theme.FONT_BODY,
+            text_color=theme.TEXT_SECONDARY
+        ).pack(anchor="w", pady=(theme.PADDING_XS, 0))
+
+        # Pestañas
+        self.tabview = ctk.CTkTabview(
+            self.window,
+            fg_color=theme.PRIMARY_BG,
+            segmented_button_fg_color=theme.SECONDARY_BG,
+            segmented_button_selected_color=theme.ACCENT_BLUE,
+            segmented_button_selected_hover_color=theme.ACCENT_BLUE_HOVER,
+            segmented_button_unselected_color=theme.SECONDARY_BG,
+            segmented_button_unselected_hover_color=theme.HOVER_BG,
+            command=self.on_tab_changed
+        )
+        self.tabview.pack(fill="both", expand=True, padx=theme.PADDING_M, pady=(theme.PADDING_S, 0))
+
+        self.scroll_frames = {}
+        self.loading_labels = {}
+        for image_type in IMAGE_TYPES:
+            tab = self.tabview.add(self.tab_name(image_type))
+            scrollable = ctk.CTkScrollableFrame(
+                tab,
+                fg_color="transparent",
+                scrollbar_button_color=theme.SCROLLBAR,
+                scrollbar_button_hover_color=theme.HOVER_BG
+            )
+            scrollable.pack(fill="both", expand=True)
+            self.scroll_frames[image_type] = scrollable
+
+            loading = ctk.CTkLabel(
+                scrollable,
+                text=f"{theme.ICONS['refresh']} Cargando {TYPE_NAMES[image_type].lower()}s...",
+                font=theme.FONT_BODY,
+                text_color=theme.TEXT_SECONDARY
+            )
+            loading.pack(pady=150)
+            self.loading_labels[image_type] = loading
+
+        self.enable_mousewheel_scroll()
+
+        # Footer con botones
+        footer = ctk.CTkFrame(self.window, fg_color=theme.SECONDARY_BG, corner_radius=0, height=70)
+        footer.pack(fill="x")
+        footer.pack_propagate(False)
+
+        button_container = ctk.CTkFrame(footer, fg_color="transparent")
+        button_container.pack(expand=True, fill="both", padx=theme.PADDING_L, pady=theme.PADDING_M)
+
+        ctk.CTkButton(
+            button_container,
+            text=f"{theme.ICONS['close']} Cancelar",
+            **theme.get_button_secondary_colors(),
+            command=self.on_closing,
+            width=120,
+            height=theme.BUTTON_HEIGHT,
+            font=theme.FONT_BODY
+        ).pack(side="right", padx=theme.PADDING_XS)
+
+        self.apply_button = ctk.CTkButton(
+            button_container,
+            text=f"{theme.ICONS['check']} Aplicar",
+            **theme.get_button_colors(),
+            command=self.apply_selection,
+            state="disabled",
+            width=140,
+            height=theme.BUTTON_HEIGHT,
+            font=theme.FONT_BODY
+        )
+        self.apply_button.pack(side="right", padx=theme.PADDING_XS)
+
+        self.status_label = ctk.CTkLabel(
+            button_container,
+            text="",
+            font=theme.FONT_SMALL,
+            text_color=theme.TEXT_SECONDARY
+        )
+        self.status_label.pack(side="left")
+
+    # ------------------------------------------
+    # Carga
+    # ------------------------------------------
+
+    def load_all(self):
+        """Pide las tres listas a la vez (una tarea interactiva por tipo)"""
+        for image_type in IMAGE_TYPES:
+            future = self.scheduler.submit(self.api.get_images, self.game_id, image_type, self.runner,
+                                           limit=IMAGES_PER_TYPE, lane='api', priority=INTERACTIVE)
+            future.add_done_callback(
+                lambda f, image_type=image_type: self.after_load(image_type, f)
+            )
+
+    def after_load(self, image_type, future):
+        """Callback del planificador (hilo secundario)"""
+        images = [] if future.cancelled() or future.exception() else future.result()
+        if not self.closed:
+            self.window.after(0, lambda: self.display_images(image_type, images))
+
+    def display_images(self, image_type, images):
+        """Rellena la pestaña de un tipo con su cuadrícula de imágenes"""
+        if self.closed:
+            return
+        self.images[image_type] = images
+        self.loading_labels[image_type].destroy()
+        scrollable = self.scroll_frames[image_type]
+
+        if not images:
+            if get_connectivity().is_offline():
+                text = f"Sin conexión: no hay {TYPE_NAMES[image_type].lower()}s guardados para este juego"
+            else:
+                text = f"No se encontraron {TYPE_NAMES[image_type].lower()}s para este juego"
+            ctk.CTkLabel(
+                scrollable,
+                text=f"{theme.ICONS['error']} {text}",
+                font=theme.FONT_BODY,
+                text_color=theme.TEXT_SECONDARY
+            ).pack(pady=150)
+            self.update_status()
+            return
+
+        width, height, columns, padding = GRID_LAYOUT[image_type]
+        grid_container = ctk.CTkFrame(scrollable, fg_color="transparent")
+        grid_container.pack(fill="both", expand=True, padx=theme.PADDING_M, pady=theme.PADDING_M)
+
+        # Solo la pestaña abierta pide sus primeras filas como visibles
+        showing = image_type == self.current_type()
+        for idx, img_data in enumerate(images):
+            row, col = divmod(idx, columns)
+            priority = VISIBLE if showing and row < VISIBLE_ROWS else OFFSCREEN
+            self.create_image_card(grid_container, image_type, img_data, idx, row, col,
+                                   width, height, padding, priority)
+
+        for i in range(columns):
+            grid_container.grid_columnconfigure(i, weight=1, uniform="column")
+        self.update_status()
+
+    def create_image_card(self, parent, image_type, img_data, index, row, col,
+                          width, height, padding, priority):
+        """Crea una card para una imagen y encola su miniatura"""
+        card = ctk.CTkFrame(
+            parent,
+            fg_color=theme.CARD_BG,
+            corner_radius=theme.RADIUS_M,
+            border_width=2,
+            border_color=theme.BORDER,
+            width=width + (padding * 4),
+            height=height + 60
+        )
+        card.grid(row=row, column=col, padx=padding, pady=padding, sticky="n")
+        card.grid_propagate(False)
+
+        inner_frame = ctk.CTkFrame(card, fg_color="transparent")
+        inner_frame.pack(fill="both", expand=True, padx=padding, pady=padding)
+
+        badge_frame = ctk.CTkFrame(inner_frame, fg_color="transparent", height=30)
+        badge_frame.pack(fill="x", pady=(0, theme.PADDING_XS))
+
+        badge = ctk.CTkLabel(
+            badge_frame,
+            text=f"#{index + 1}",
+            font=theme.FONT_SMALL,
+            text_color=theme.TEXT_PRIMARY,
+            fg_color=theme.ACCENT_BLUE,
+            corner_radius=12,
+            width=40,
+            height=24
+        )
+        badge.pack(side="left")
+
+        # Marcar las imágenes ya descargadas (disponibles sin conexión)
+        available = self.image_manager.is_available_offline(img_data.url)
+        offline = get_connectivity().is_offline()
+        if available or offline:
+            ctk.CTkLabel(
+                badge_frame,
+                text="Local" if available else "Requiere conexión",
+                font=theme.FONT_TINY,
+                text_color=theme.PRIMARY_BG if available else theme.TEXT_SECONDARY,
+                fg_color=theme.SUCCESS if available else theme.TERTIARY_BG,
+                corner_radius=12,
+                height=24
+            ).pack(side="right")
+
+        img_frame = ctk.CTkFrame(
+            inner_frame,
+            fg_color=theme.SECONDARY_BG,
+            corner_radius=theme.RADIUS_S,
+            width=width,
+            height=height
+        )
+        img_frame.pack(expand=True)
+        img_frame.pack_propagate(False)
+
+        placeholder = ctk.CTkLabel(
+            img_frame,
+            text=theme.ICONS['download'],
+            font=("Arial", 32),
+            text_color=theme.TEXT_DISABLED
+        )
+        placeholder.place(relx=0.5, rely=0.5, anchor="center")
+
+        def on_click(event=None):
+            if get_connectivity().is_offline() and not self.image_manager.is_available_offline(img_data.url):
+                self.status_label.configure(
+                    text=f"{TYPE_NAMES[image_type]} #{index + 1}: sin conexión y no está guardada",
+                    text_color=theme.WARNING
+                )
+                return "break"
+            self.toggle_image(image_type, img_data.url, card)
+            return "break"
+
+        def on_enter(event):
+            if card is not self.selected_cards.get(image_type):
+                card.configure(border_color=theme.BORDER_HOVER, fg_color=theme.TERTIARY_BG)
+
+        def on_leave(event):
+            if card is not self.selected_cards.get(image_type):
+                card.configure(border_color=theme.BORDER, fg_color=theme.CARD_BG)
+
+        for widget in [card, inner_frame, img_frame, badge_frame, badge, placeholder]:
+            widget.bind("<Button-1>", on_click)
+            widget.bind("<Enter>", on_enter)
+            widget.bind("<Leave>", on_leave)
+            widget.configure(cursor="hand2")
+
+        def load_thumb():
+            thumb = self.image_manager.download_thumbnail(img_data.thumb, (width, height))
+            if thumb and not self.closed:
+                ctk_image = ctk.CTkImage(light_image=thumb, dark_image=thumb, size=(width, height))
+                self.window.after(0, lambda: self.update_thumbnail(placeholder, ctk_image, img_frame))
+
+        self.thumb_futures[image_type].append(
+            self.scheduler.submit(load_thumb, lane='images', priority=priority)
+        )
+
+    def update_thumbnail(self, placeholder, ctk_image, img_frame):
+        """Muestra la miniatura (la referencia queda en el frame mientras viva la ventana)"""
+        try:
+            placeholder.configure(image=ctk_image, text="")
+            img_frame.ctk_image = ctk_image
+        except Exception:
+            pass
+
+    def promote_thumbnails(self, image_type, count=None):
+        """Pasa a visibles las miniaturas pendientes de una pestaña (las `count` primeras)"""
+        if image_type in self.promoted:
+            return
+        futures = self.thumb_futures[image_type]
+        if count is None:
+            self.promoted.add(image_type)
+        for future in futures[:count]:
+            self.scheduler.set_priority(future, VISIBLE)
+
+    # ------------------------------------------
+    # Pestañas y selección
+    # ------------------------------------------
+
+    def on_tab_changed(self):
+        """Las listas y miniaturas ya están en memoria: solo se reordena lo pendiente"""
+        image_type = self.current_type()
+        columns = GRID_LAYOUT[image_type][2]
+        self.promote_thumbnails(image_type, columns * VISIBLE_ROWS)
+        self.update_status()
+
+    def toggle_image(self, image_type, url, card):
+        """Elige una imagen de la pestaña (o la desmarca si ya estaba elegida)"""
+        previous = self.selected_cards.pop(image_type, None)
+        if previous is not None:
+            previous.configure(border_color=theme.BORDER, fg_color=theme.CARD_BG, border_width=2)
+
+        if previous is card:
+            self.selections.pop(image_type, None)
+        else:
+            card.configure(border_color=theme.ACCENT_BLUE, fg_color=theme.TERTIARY_BG, border_width=3)
+            self.selected_cards[image_type] = card
+            self.selections[image_type] = url
+        self.update_status()
+
+    def update_status(self):
+        """Resumen de lo elegido y estado del botón Aplicar"""
+        if self.selections:
+            chosen = ", ".join(TYPE_NAMES[t] for t in IMAGE_TYPES if t in self.selections)
+            self.status_label.configure(text=f"{theme.ICONS['check']} Elegido: {chosen}",
+                                        text_color=theme.SUCCESS)
+            self.apply_button.configure(state="normal",
+                                        text=f"{theme.ICONS['check']} Aplicar ({len(self.selections)})")
+        else:
+            images = self.images.get(self.current_type())
+            text = "" if images is None else f"{len(images)} imágenes encontradas"
+            self.status_label.configure(text=text, text_color=theme.TEXT_SECONDARY)
+            self.apply_button.configure(state="disabled", text=f"{theme.ICONS['check']} Aplicar")
+
+    def apply_selection(self):
+        """Entrega todas las imágenes elegidas de una vez y cierra la ventana"""
+        if self.selections:
+            self.on_apply(self.slug, dict(self.selections))
+            self.on_closing()
+
+    # ------------------------------------------
+    # Scroll y cierre
+    # ------------------------------------------
+
+    def enable_mousewheel_scroll(self):
+        """Habilita el scroll con la ruedita del mouse en la pestaña abierta"""
+        def scroll(units):
+            image_type = self.current_type()
+            self.promote_thumbnails(image_type)
+            try:
+                self.scroll_frames[image_type]._parent_canvas.yview_scroll(units, "units")
+            except Exception:
+                pass
+
+        self.window.bind("<MouseWheel>", lambda event: scroll(int(-1 * (event.delta / 120))))
+        self.window.bind("<Button-4>", lambda event: scroll(-1))
+        self.window.bind("<Button-5>", lambda event: scroll(1))
+        self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+    def on_closing(self):
+        """Cancela las miniaturas pendientes y cierra la ventana"""
+        self.closed = True
+        for futures in self.thumb_futures.values():
+            for future in futures:
+                future.cancel()
+
+        try:
+            self.window.unbind("<MouseWheel>")
+            self.window.unbind("<Button-4>")
+            self.window.unbind("<Button-5>")
+        except Exception:
+            pass
+
+        self.window.destroy()
@@ -0,0 +1,249 @@
+"""
+Panel de diagnóstico: latencias de la API, aciertos de caché y estado del proceso
+Lee el registro de utils.metrics una vez por segundo; no hace peticiones
+ni toca el disco, así que se puede dejar abierto mientras se usa la app.
+"""
+import time
+import customtkinter as ctk
+from ui import theme
+from utils import circuit_breaker, metrics, scheduler
+
+# Intervalo de refresco del panel (ms)
+REFRESH_MS = 1000
+
+# Ancho máximo de las barras de texto de los histogramas
+BAR_WIDTH = 30
+
+# Niveles de caché que se muestran (prefijo cache.<nivel>.hit/miss)
+CACHE_TIERS = (
+    ('api', "Respuestas de la API"),
+    ('thumbs', "Miniaturas"),
+    ('images', "Imágenes completas"),
+)
+
+
+def _format_bytes(value):
+    if value is None:
+        return "—"
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def _format_ms(value):
+    return "—" if value is None else f"{value:.0f} ms"
+
+
+def format_histogram(name, hist):
+    """Líneas de texto de un histograma: resumen y una barra por cubo"""
+    lines = [
+        f"{name}: n={hist['count']}  p50≤{_format_ms(hist['p50'])}  "
+        f"p95≤{_format_ms(hist['p95'])}  máx={_format_ms(hist['max'])}"
+    ]
+    peak = max(hist['buckets']) or 1
+    lower = 0
+    for bound, amount in zip(list(hist['bounds']) + [None], hist['buckets']):
+        label = f"{lower}-{bound}" if bound is not None else f">{lower}"
+        if amount:
+            bar = "█" * max(1, round(amount / peak * BAR_WIDTH))
+            lines.append(f"    {label:>11} ms │{bar} {amount}")
+        lower = bound
+    return lines
+
+
+def format_report(snapshot, tk_backlog=None, tk_lag_ms=None):
+    """Informe de texto a partir de metrics.snapshot()"""
+    counters = snapshot['counters']
+    histograms = snapshot['histograms']
+    gauges = snapshot['gauges']
+    lines = []
+
+    # API
+    lines.append("🌐 API de SteamGridDB")
+    latency = {name: h for name, h in sorted(histograms.items()) if name.startswith("api.latency_ms.")}
+    if not latency:
+        lines.append("    Sin peticiones todavía")
+    for name, hist in latency.items():
+        lines.extend("    " + line for line in format_histogram(name.rsplit('.', 1)[-1], hist))
+    status = sorted((name[len("api.http_"):], int(value)) for name, value in counters.items()
+                    if name.startswith("api.http_"))
+    lines.append(
+        f"    Reintentos: {int(counters.get('api.retries', 0))}   "
+        f"Errores de conexión: {int(counters.get('api.connection_errors', 0))}   "
+        f"HTTP: {', '.join(f'{code}×{n}' for code, n in status) or '—'}"
+    )
+    lines.append(f"    Descargado: {_format_bytes(counters.get('net.bytes_downloaded', 0))}   "
+                 f"Plazos agotados: {int(counters.get('net.deadline_exceeded', 0))}")
+    lines.append("")
+
+    # Cachés
+    lines.append("💾 Cachés")
+    for tier, label in CACHE_TIERS:
+        hits = int(counters.get(f"cache.{tier}.hit", 0))
+        misses = int(counters.get(f"cache.{tier}.miss", 0))
+        total = hits + misses
+        rate = f"{hits / total * 100:.0f}%" if total else "—"
+        lines.append(f"    {label:<22} aciertos {rate:>5}  ({hits}/{total})")
+        revalidations = int(counters.get(f"cache.{tier}.revalidations", 0))
+        if revalidations:
+            not_modified = int(counters.get(f"cache.{tier}.not_modified", 0))
+            lines.append(f"    {'':<22} revalidadas {revalidations}, "
+                         f"sin transferencia {not_modified / revalidations * 100:.0f}% (304)")
+    lines.append("")
+
+    # Cortacircuitos por host y presupuesto de reintentos
+    lines.append("⛔ Cortacircuitos")
+    breakers = circuit_breaker.all_breakers()
+    if not breakers:
+        lines.append("    Sin peticiones todavía")
+    for host, breaker in sorted(breakers.items()):
+        detail = f" (reintento en {breaker.retry_in():.0f}s)" if breaker.state == circuit_breaker.OPEN else ""
+        lines.append(f"    {host:<30} {breaker.state}{detail}  fallos seguidos: {breaker.failures}")
+    lines.append(
+        f"    Rechazadas: {int(counters.get('api.breaker_rejected', 0) + counters.get('images.breaker_rejected', 0))}   "
+        f"Reintentos negados por presupuesto: {int(counters.get('api.retry_budget_exhausted', 0))}   "
+        f"Fichas: {circuit_breaker.get_retry_budget().tokens:.1f}"
+    )
+    lines.append("")
+
+    # Peticiones combinadas (single-flight)
+    lines.append("🔗 Peticiones combinadas")
+    for group, label in (('api', "API"), ('images', "Descargas de imágenes")):
+        calls = int(counters.get(f"singleflight.{group}.calls", 0))
+        shared = int(counters.get(f"singleflight.{group}.shared", 0))
+        lines.append(f"    {label:<22} {shared} de {calls} evitadas (esperaron a una igual en curso)")
+    names = int(counters.get("resolver.names", 0))
+    if names:
+        searches = int(counters.get("resolver.searches", 0))
+        lines.append(f"    {'Búsquedas por nombre':<22} {searches} para {names} nombres (variantes agrupadas)")
+    lines.append("")
+
+    # Planificador de red: colas por destino y espera por prioridad
+    lines.append("🚦 Planificador de red")
+    for lane, label in (('api', "API"), ('images', "Imágenes")):
+        queued = gauges.get(f"scheduler.queued.{lane}")
+        running = gauges.get(f"scheduler.running.{lane}")
+        lines.append(f"    {label:<22} en curso {'—' if running is None else running}  "
+                     f"en cola {'—' if queued is None else queued}")
+    waits = [(name, histograms.get(f"scheduler.wait_ms.{name}")) for name in scheduler.PRIORITY_NAMES.values()]
+    for name, hist in waits:
+        if hist:
+            lines.append(f"    espera {name:<15} n={hist['count']}  p50≤{_format_ms(hist['p50'])}  "
+                         f"p95≤{_format_ms(hist['p95'])}  máx={_format_ms(hist['max'])}")
+    lines.append(f"    Canceladas: {int(counters.get('scheduler.cancelled', 0))}   "
+                 f"Caducadas en cola: {int(counters.get('scheduler.expired', 0))}")
+    lines.append("")
+
+    # Imágenes
+    decode = histograms.get("image.thumbnail_decode_ms")
+    if decode:
+        lines.append("🖼 Imágenes")
+        lines.extend("    " + line for line in format_histogram("decodificar miniatura", decode))
+        lines.append("")
+
+    # Proceso
+    lines.append("⚙️ Proceso")
+    pending = gauges.get("pool.pending")
+    lines.append(f"    Trabajos pendientes en el pool: {'—' if pending is None else pending}")
+    lines.append(f"    Tareas after() pendientes en Tk: {'—' if tk_backlog is None else tk_backlog}")
+    lines.append(f"    Retraso del bucle de eventos: {_format_ms(tk_lag_ms)}")
+    lines.append(f"    Memoria residente: {_format_bytes(gauges.get('process.rss_bytes'))}")
+    lines.append(f"    Hilos: {gauges.get('process.threads', '—')}")
+    return "\n".join(lines)
+
+
+class DiagnosticsWindow(ctk.CTkToplevel):
+    def __init__(self, parent):
+        """
+        Args:
+            parent: Ventana principal
+        """
+        super().__init__(parent)
+        self.title("Diagnóstico")
+        self.geometry("640x620")
+        self.configure(fg_color=theme.PRIMARY_BG)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        self._refresh_job = None
+        self._expected_at = None
+        self.tk_lag_ms = None
+
+        self.setup_ui()
+        self.transient(parent)
+        self.refresh()
+
+    def setup_ui(self):
+        main_frame = ctk.CTkFrame(self, fg_color="transparent")
+        main_frame.pack(fill="both", expand=True, padx=theme.PADDING_L, pady=theme.PADDING_L)
+
+        header = ctk.CTkFrame(main_frame, fg_color="transparent")
+        header.pack(fill="x", pady=(0, theme.PADDING_M))
+
+        ctk.CTkLabel(
+            header,
+            text="Diagnóstico",
+            font=theme.FONT_TITLE,
+            text_color=theme.TEXT_PRIMARY
+        ).pack(side="left")
+
+        ctk.CTkButton(
+            header,
+            text="Reiniciar contadores",
+            width=160,
+            height=theme.BUTTON_HEIGHT,
+            font=theme.FONT_BODY,
+            **theme.get_button_colors("secondary"),
+            command=self.reset_metrics
+        ).pack(side="right")
+
+        self.report_box = ctk.CTkTextbox(
+            main_frame,
+            font=ctk.CTkFont(family="monospace", size=11),
+            fg_color=theme.SECONDARY_BG,
+            text_color=theme.TEXT_PRIMARY,
+            wrap="none"
+        )
+        self.report_box.pack(fill="both", expand=True)
+
+        self.bind("<Escape>", lambda e: self.close())
+
+    def _tk_backlog(self):
+        """Cantidad de callbacks after() pendientes en el intérprete de Tk"""
+        try:
+            return len(self.tk.splitlist(self.tk.call('after', 'info')))
+        except Exception:
+            return None
+
+    def refresh(self):
+        """Redibuja el informe y mide cuánto se retrasó este mismo after()"""
+        now = time.perf_counter()
+        if self._expected_at is not None:
+            self.tk_lag_ms = max(0.0, (now - self._expected_at) * 1000)
+
+        report = format_report(metrics.snapshot(), self._tk_backlog(), self.tk_lag_ms)
+        scroll = self.report_box.yview()[0]
+        self.report_box.configure(state="normal")
+        self.report_box.delete("1.0", "end")
+        self.report_box.insert("1.0", report)
+        self.report_box.configure(state="disabled")
+        self.report_box.yview_moveto(scroll)
+
+        self._expected_at = time.perf_counter() + REFRESH_MS / 1000
+        self._refresh_job = self.after(REFRESH_MS, self.refresh)
+
+    def reset_metrics(self):
+        metrics.reset()
+        self.refresh_now()
+
+    def refresh_now(self):
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+        self._expected_at = None
+        self.refresh()
+
+    def close(self):
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        self.destroy()
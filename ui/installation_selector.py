@@ -17,9 +17,17 @@ except:
 
 
 class InstallationSelector:
-    def __init__(self):
-        """Ventana para seleccionar entre instalación Nativa o Flatpak de Lutris"""
+    def __init__(self, master=None, on_done=None):
+        """
+        Ventana para seleccionar entre instalación Nativa o Flatpak de Lutris
+        
+        Args:
+            master: Ventana existente donde mostrar la vista (por defecto crea una propia)
+            on_done: Callback con el modo elegido al usar master
+        """
         self.selected_mode = None
+        self.on_done = on_done
+        self.standalone = master is None
         
         # Rutas de las bases de datos
         self.PATH_NATIVE_DB = os.path.expanduser("~/.local/share/lutris/pga.db")
@@ -29,13 +37,13 @@ class InstallationSelector:
         self.native_exists = os.path.exists(self.PATH_NATIVE_DB)
         self.flatpak_exists = os.path.exists(self.PATH_FLATPAK_DB)
         
-        # Aplicar tema
-        theme.apply_theme()
-        
-        # Crear ventana
-        self.window = ctk.CTk()
+        if self.standalone:
+            # Aplicar tema y crear ventana
+            theme.apply_theme()
+            self.window = ctk.CTk()
+        else:
+            self.window = master
         self.window.title("L-Visual-Manager")
-        self.window.geometry("700x450")
         self.window.resizable(False, False)
         
         # Color de fondo
@@ -44,11 +52,14 @@ class InstallationSelector:
         # Centrar ventana
         self.center_window()
         
+        # Contenedor de la vista (se destruye al terminar si la ventana es compartida)
+        self.container = ctk.CTkFrame(self.window, fg_color=theme.PRIMARY_BG, corner_radius=0)
+        self.container.pack(fill="both", expand=True)
+        
         self.setup_ui()
     
     def center_window(self):
         """Centra la ventana en la pantalla"""
-        self.window.update_idletasks()
         width = 700
         height = 450
         x = (self.window.winfo_screenwidth() // 2) - (width // 2)
@@ -59,7 +70,7 @@ class InstallationSelector:
         """Configura la interfaz de la ventana"""
         # Frame principal con padding
         main_frame = ctk.CTkFrame(
-            self.window,
+            self.container,
             fg_color="transparent"
         )
         main_frame.pack(fill="both", expand=True, padx=theme.PADDING_L, pady=theme.PADDING_L)
@@ -135,7 +146,7 @@ class InstallationSelector:
             warning_label.pack(pady=theme.PADDING_M)
             
             # Usar configuración por defecto después de 2 segundos
-            self.window.after(2000, lambda: self.select_mode("NATIVO_DEFAULT"))
+            self.container.after(2000, lambda: self.select_mode("NATIVO_DEFAULT"))
     
     def create_option_card(self, parent, icon, title, description, exists, command, column):
         """Crea una card moderna para cada opción"""
@@ -230,9 +241,16 @@ class InstallationSelector:
     
     def select_mode(self, mode):
         """Selecciona el modo y cierra la ventana"""
+        if self.selected_mode is not None:
+            return
         self.selected_mode = mode
-        self.window.quit()
-        self.window.destroy()
+        if self.standalone:
+            self.window.quit()
+            self.window.destroy()
+            return
+        self.container.destroy()
+        if self.on_done:
+            self.on_done(mode)
     
     def run(self):
         """Ejecuta la ventana y retorna el modo seleccionado"""
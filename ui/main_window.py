@@ -3,16 +3,22 @@ Ventana principal del Lutris Visual Manager
 Versión moderna con CustomTkinter y Material Design
 """
 import customtkinter as ctk
-from PIL import Image
 import threading
 import os
 import config
 from utils.database import LutrisDatabase
-from utils.api import SteamGridDBAPI
-from utils.image_manager import ImageManager
-from ui.selector_window import SelectorWindow
+from utils.art_watcher import ArtWatcher
+from utils.search_index import GameSearchIndex
+from utils.art_triage import find_missing_art, summarize_missing_art
+from utils.backup_store import new_job_id
+from utils.config_manager import get_config_manager
+from utils.connectivity import get_connectivity
+from utils.models import index_by_slug
+from utils.scheduler import get_scheduler, when_all, INTERACTIVE
+from utils import bulk_actions
 from ui import theme
 from ui import dialogs
+from utils import circuit_breaker, tracing
 
 # Configurar CustomTkinter para evitar problemas de X11
 os.environ.setdefault('TK_SILENCE_DEPRECATION', '1')
@@ -24,28 +30,114 @@ except:
     pass
 
 
+# Tipos que aplica la acción masiva "Mejor imagen"
+BULK_TYPE_CHOICES = {
+    "Todas": ('cover', 'banner', 'icon'),
+    "Cover": ('cover',),
+    "Banner": ('banner',),
+    "Icono": ('icon',),
+}
+
+# Estado de cada juego durante una acción masiva: (texto, color)
+BULK_STATUS_TEXT = {
+    bulk_actions.PENDING: ("En cola", theme.TEXT_SECONDARY),
+    bulk_actions.SEARCHING: ("Buscando...", theme.INFO),
+    bulk_actions.DOWNLOADING: ("Descargando...", theme.INFO),
+    bulk_actions.ENCODING: ("Recomprimiendo...", theme.INFO),
+    bulk_actions.DONE: ("Listo", theme.SUCCESS),
+    bulk_actions.FAILED: ("Error", theme.ERROR),
+    bulk_actions.CANCELLED: ("Cancelado", theme.TEXT_DISABLED),
+}
+
+
 class MainWindow:
-    def __init__(self):
-        # Aplicar tema
-        theme.apply_theme()
-        
-        # Crear ventana principal
-        self.root = ctk.CTk()
+    def __init__(self, root=None):
+        """
+        Args:
+            root: Ventana raíz existente en la que construir la interfaz
+                  (por defecto se crea una nueva)
+        """
+        if root is None:
+            # Aplicar tema
+            theme.apply_theme()
+            root = ctk.CTk()
+        
+        # Ventana principal
+        self.root = root
         self.root.title(config.WINDOW_TITLE)
-        self.root.geometry(f"{config.WINDOW_WIDTH}x{config.WINDOW_HEIGHT}")
+        self.root.resizable(True, True)
+        
+        # Restaurar el tamaño de la última sesión y guardarlo al redimensionar
+        # (ConfigManager agrupa las escrituras de la ráfaga de eventos)
+        self.config_mgr = get_config_manager()
+        self.saved_geometry = self.config_mgr.get_window_geometry('main')
+        self.root.geometry(self.saved_geometry or f"{config.WINDOW_WIDTH}x{config.WINDOW_HEIGHT}")
+        self.root.bind("<Configure>", self.on_root_configure, add="+")
         self.root.configure(fg_color=theme.PRIMARY_BG)
         
-        # Instancias de utilidades
+        # Instancias de utilidades (la API y las imágenes se cargan al primer uso)
         self.db = LutrisDatabase()
-        self.api = SteamGridDBAPI()
-        self.image_manager = ImageManager()
+        self._api = None
+        self._image_manager = None
+        self._name_resolver = None
         
         self.current_runner = None
         self.games = []
+        self.games_by_slug = {}  # slug -> Game de la lista cargada
+        self.sgdb_matches = {}  # slug -> resultado de la búsqueda en SteamGridDB
+        self.selected_slugs = set()  # juegos marcados para acciones masivas
+        self.last_selected_slug = None  # ancla de la selección con Mayús
+        self.bulk_job = None  # BulkJob en curso
         self.runner_map = {}
+        self.game_cards = {}  # slug -> widgets de la card
+        self.search_index = None
+        self.visible_slugs = []  # slugs de las cards empaquetadas, en orden
+        self.triage_mode = False
+        self.missing_art = {}  # slug -> resultado del triage
+        self.settings_window = None
+        self.diagnostics_window = None
         
         self.setup_ui()
         self.load_runners()
+        
+        # Vigilar los directorios de imágenes para refrescar solo las cards afectadas
+        self.art_watcher = ArtWatcher(self.on_art_changed)
+        self.art_watcher.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Sonda de conectividad en segundo plano; sin red se usan las cachés
+        connectivity = get_connectivity()
+        connectivity.add_listener(lambda offline: self.root.after(0, self.update_connection_status, offline))
+        self.update_connection_status(connectivity.offline)
+        connectivity.probe_async()
+        
+        # Cortacircuitos de SteamGridDB (403/5xx repetidos): avisar en la cabecera
+        self._breaker_job = None
+        circuit_breaker.add_listener(lambda host, state: self.root.after(0, self.update_breaker_status))
+    
+    @property
+    def api(self):
+        """Cliente de SteamGridDB"""
+        if self._api is None:
+            from utils.api import SteamGridDBAPI
+            self._api = SteamGridDBAPI()
+        return self._api
+    
+    @property
+    def name_resolver(self):
+        """Resolución de nombres en SteamGridDB (agrupa variantes del mismo juego)"""
+        if self._name_resolver is None:
+            from utils.name_resolver import NameResolver
+            self._name_resolver = NameResolver(self.api)
+        return self._name_resolver
+    
+    @property
+    def image_manager(self):
+        """Gestor de imágenes (importa Pillow)"""
+        if self._image_manager is None:
+            from utils.image_manager import ImageManager
+            self._image_manager = ImageManager()
+        return self._image_manager
     
     def setup_ui(self):
         """Configura la interfaz principal con sidebar"""
@@ -150,6 +242,32 @@ class MainWindow:
         )
         refresh_btn.pack(padx=theme.PADDING_M, pady=theme.PADDING_S)
         
+        # Botón de triage (juegos sin imágenes en todas las plataformas)
+        missing_btn = ctk.CTkButton(
+            self.sidebar,
+            text=f"{theme.ICONS['warning']} Sin imágenes",
+            **theme.get_button_secondary_colors(),
+            command=self.show_missing_art,
+            width=240,
+            height=theme.BUTTON_HEIGHT,
+            corner_radius=theme.RADIUS_S,
+            font=theme.FONT_BODY
+        )
+        missing_btn.pack(padx=theme.PADDING_M, pady=theme.PADDING_S)
+        
+        # Botón para deshacer el último trabajo (restaura desde los respaldos locales)
+        undo_btn = ctk.CTkButton(
+            self.sidebar,
+            text="↩ Deshacer último cambio",
+            **theme.get_button_secondary_colors(),
+            command=self.undo_last_job,
+            width=240,
+            height=theme.BUTTON_HEIGHT,
+            corner_radius=theme.RADIUS_S,
+            font=theme.FONT_BODY
+        )
+        undo_btn.pack(padx=theme.PADDING_M, pady=theme.PADDING_S)
+        
         # Separador
         ctk.CTkFrame(
             self.sidebar,
@@ -170,6 +288,19 @@ class MainWindow:
         )
         settings_btn.pack(padx=theme.PADDING_M, pady=theme.PADDING_S)
         
+        # Botón del panel de diagnóstico
+        diagnostics_btn = ctk.CTkButton(
+            self.sidebar,
+            text="Diagnóstico",
+            **theme.get_button_secondary_colors(),
+            command=self.show_diagnostics,
+            width=240,
+            height=theme.BUTTON_HEIGHT,
+            corner_radius=theme.RADIUS_S,
+            font=theme.FONT_BODY
+        )
+        diagnostics_btn.pack(padx=theme.PADDING_M, pady=theme.PADDING_S)
+        
         # Espaciador
         ctk.CTkLabel(self.sidebar, text="", height=20).pack(expand=True)
         
@@ -219,9 +350,51 @@ class MainWindow:
         )
         self.header_label.pack(side="left", padx=theme.PADDING_L, pady=theme.PADDING_M)
         
+        # Buscador (filtra las cards existentes en cada pulsación)
+        self.search_entry = ctk.CTkEntry(
+            header,
+            **theme.get_entry_colors(),
+            placeholder_text=f"{theme.ICONS['search']} Buscar juego...",
+            width=260,
+            height=32,
+            corner_radius=theme.RADIUS_S,
+            font=theme.FONT_BODY
+        )
+        self.search_entry.pack(side="right", padx=theme.PADDING_L, pady=theme.PADDING_M)
+        self.search_entry.bind("<KeyRelease>", lambda e: self.apply_search_filter())
+        self.search_entry.bind("<Escape>", lambda e: self.clear_search())
+        
+        self.search_info_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=theme.FONT_SMALL,
+            text_color=theme.TEXT_SECONDARY
+        )
+        self.search_info_label.pack(side="right", pady=theme.PADDING_M)
+        
+        # Indicador del modo sin conexión (solo visible sin red)
+        self.connection_label = ctk.CTkLabel(
+            header,
+            text="📴 Sin conexión",
+            font=theme.FONT_SMALL,
+            text_color=theme.WARNING
+        )
+        
+        # Indicador de peticiones en pausa por el cortacircuitos
+        self.breaker_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=theme.FONT_SMALL,
+            text_color=theme.ERROR
+        )
+        
+        # Barra de acciones masivas (solo visible con juegos seleccionados)
+        self.setup_bulk_bar(parent)
+        
         # Área de scroll para los juegos
         scroll_frame = ctk.CTkFrame(parent, fg_color="transparent")
         scroll_frame.pack(fill="both", expand=True, padx=0, pady=0)
+        self.games_area = scroll_frame
         
         # ScrollableFrame
         self.scrollable_frame = ctk.CTkScrollableFrame(
@@ -238,6 +411,74 @@ class MainWindow:
         # Mensaje inicial
         self.show_empty_state("Selecciona una plataforma del menú lateral")
     
+    def setup_bulk_bar(self, parent):
+        """Crea la barra de acciones sobre los juegos seleccionados"""
+        self.bulk_bar = ctk.CTkFrame(parent, fg_color=theme.SECONDARY_BG, corner_radius=0)
+        
+        self.selection_label = ctk.CTkLabel(
+            self.bulk_bar,
+            text="",
+            font=theme.FONT_BODY,
+            text_color=theme.TEXT_PRIMARY
+        )
+        self.selection_label.pack(side="left", padx=theme.PADDING_L, pady=theme.PADDING_S)
+        
+        small_button = dict(
+            fg_color=theme.TERTIARY_BG,
+            hover_color=theme.HOVER_BG,
+            text_color=theme.TEXT_SECONDARY,
+            height=28,
+            font=theme.FONT_SMALL
+        )
+        self.select_all_button = ctk.CTkButton(
+            self.bulk_bar, text="Todos", width=60, command=self.select_all_visible, **small_button
+        )
+        self.select_all_button.pack(side="left", padx=theme.PADDING_XS)
+        self.clear_selection_button = ctk.CTkButton(
+            self.bulk_bar, text="Ninguno", width=70, command=self.clear_selection, **small_button
+        )
+        self.clear_selection_button.pack(side="left", padx=theme.PADDING_XS)
+        
+        self.bulk_cancel_button = ctk.CTkButton(
+            self.bulk_bar,
+            text=f"{theme.ICONS['close']} Cancelar",
+            **theme.get_button_secondary_colors(),
+            command=self.cancel_bulk_action,
+            width=110,
+            height=28,
+            font=theme.FONT_SMALL
+        )
+        
+        # Acciones (de derecha a izquierda)
+        self.bulk_buttons = []
+        for action, label in (('reencode', "Recomprimir"),
+                              ('resolve', "Volver a buscar"),
+                              ('best_art', "Mejor imagen")):
+            button = ctk.CTkButton(
+                self.bulk_bar,
+                text=label,
+                **theme.get_button_colors(),
+                command=lambda action=action: self.run_bulk_action(action),
+                width=120,
+                height=28,
+                font=theme.FONT_SMALL
+            )
+            button.pack(side="right", padx=theme.PADDING_XS, pady=theme.PADDING_S)
+            self.bulk_buttons.append(button)
+        
+        # Tipos de imagen para "Mejor imagen"
+        self.bulk_types_menu = ctk.CTkOptionMenu(
+            self.bulk_bar,
+            values=list(BULK_TYPE_CHOICES),
+            width=110,
+            height=28,
+            font=theme.FONT_SMALL,
+            fg_color=theme.TERTIARY_BG,
+            button_color=theme.TERTIARY_BG,
+            button_hover_color=theme.HOVER_BG
+        )
+        self.bulk_types_menu.pack(side="right", padx=theme.PADDING_XS)
+    
     def show_empty_state(self, message):
         """Muestra un estado vacío con un mensaje"""
         for widget in self.scrollable_frame.winfo_children():
@@ -280,19 +521,106 @@ class MainWindow:
         if options:
             self.runner_combo.configure(values=options)
             self.games_counter.configure(text=f"{len(options)} plataformas")
+        
+        self.build_search_index()
+    
+    def build_search_index(self):
+        """Construye el índice de búsqueda de todas las plataformas en segundo plano"""
+        def build():
+            index = GameSearchIndex(self.db.get_all_games())
+            self.root.after(0, lambda: setattr(self, 'search_index', index))
+        
+        threading.Thread(target=build, daemon=True).start()
     
     def on_runner_selected(self, choice):
         """Maneja la selección de un runner"""
         self.current_runner = self.runner_map.get(choice)
         
         if self.current_runner:
+            self.triage_mode = False
             self.header_label.configure(text=f"{theme.ICONS['platform']} {choice}")
             self.load_games()
     
     def refresh_games(self):
         """Refresca la lista de juegos"""
-        if self.current_runner:
+        if self.triage_mode:
+            self.show_missing_art()
+            self.build_search_index()
+        elif self.current_runner:
             self.load_games()
+            self.build_search_index()
+    
+    def show_missing_art(self):
+        """Muestra solo los juegos a los que les falta alguna imagen (todas las plataformas)"""
+        self.triage_mode = True
+        self.current_runner = None
+        self.runner_combo.set("Selecciona una plataforma...")
+        self.header_label.configure(text=f"{theme.ICONS['warning']} Juegos sin imágenes")
+        self.show_empty_state(f"{theme.ICONS['refresh']} Analizando imágenes...")
+        
+        def load():
+            results = find_missing_art(self.db.get_all_games())
+            
+            def show():
+                self.missing_art = {r['game'].slug: r for r in results}
+                self.set_games([r['game'] for r in results])
+                self.display_games()
+            
+            self.root.after(0, show)
+        
+        threading.Thread(target=load, daemon=True).start()
+    
+    def create_triage_toolbar(self):
+        """Barra con el resumen del triage y el botón de relleno masivo"""
+        summary = summarize_missing_art(list(self.missing_art.values()))
+        
+        toolbar = ctk.CTkFrame(self.scrollable_frame, fg_color=theme.SECONDARY_BG, corner_radius=theme.RADIUS_M)
+        toolbar.pack(fill="x", pady=theme.PADDING_S, padx=theme.PADDING_S)
+        
+        ctk.CTkLabel(
+            toolbar,
+            text=(f"Sin cover: {summary['cover']}   "
+                  f"Sin banner: {summary['banner']}   "
+                  f"Sin icono: {summary['icon']}   "
+                  f"Flag en DB sin archivo: {summary['stale']}"),
+            font=theme.FONT_BODY,
+            text_color=theme.TEXT_SECONDARY
+        ).pack(side="left", padx=theme.PADDING_M, pady=theme.PADDING_S)
+        
+        self.fill_button = ctk.CTkButton(
+            toolbar,
+            text=f"{theme.ICONS['download']} Completar todo",
+            **theme.get_button_colors(),
+            command=self.fill_missing_art,
+            width=160,
+            height=theme.BUTTON_HEIGHT,
+            corner_radius=theme.RADIUS_S,
+            font=theme.FONT_BODY
+        )
+        self.fill_button.pack(side="right", padx=theme.PADDING_M, pady=theme.PADDING_S)
+    
+    def fill_missing_art(self):
+        """Descarga la mejor imagen de SteamGridDB para cada tipo que falta"""
+        pending = list(self.missing_art.values())
+        if not pending:
+            return
+        
+        self.fill_button.configure(state="disabled")
+        self.show_notification(f"Completando imágenes de {len(pending)} juegos...", type="info")
+        
+        def done(summary):
+            self.show_notification(f"Imágenes completadas en {len(summary['updated'])} de {len(pending)} juegos")
+            self.refresh_games()
+        
+        # Misma tubería que las acciones masivas: búsquedas agrupadas y descargas
+        # en paralelo en el planificador (BULK) y una sola transacción al final
+        bulk_actions.BulkJob(
+            'best_art', [result['game'] for result in pending], self.api, self.image_manager, self.db,
+            types={result['game'].slug: result['missing'] for result in pending},
+            matches=self.sgdb_matches,
+            resolver=self.name_resolver,
+            on_done=lambda summary: self.root.after(0, done, summary)
+        ).start()
     
     def load_games(self):
         """Carga los juegos del runner seleccionado"""
@@ -305,28 +633,99 @@ class MainWindow:
         
         # Cargar en hilo separado
         def load():
-            self.games = self.db.get_games_by_runner(self.current_runner)
+            self.set_games(self.db.get_games_by_runner(self.current_runner))
             self.root.after(0, self.display_games)
         
         threading.Thread(target=load, daemon=True).start()
     
+    def set_games(self, games):
+        """Reemplaza la lista cargada y su índice por slug"""
+        self.games = games
+        self.games_by_slug = index_by_slug(games)
+    
+    @tracing.traced("ui.display_games")
     def display_games(self):
         """Muestra los juegos en cards"""
         # Limpiar el frame
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
         
+        self.game_cards = {}
+        # La selección solo conserva juegos de la lista actual
+        self.selected_slugs &= set(self.games_by_slug)
+        self.update_bulk_bar()
+        
         if not self.games:
-            self.show_empty_state(f"{theme.ICONS['warning']} No hay juegos instalados")
+            if self.triage_mode:
+                self.show_empty_state(f"{theme.ICONS['success']} Todos los juegos tienen sus imágenes")
+            else:
+                self.show_empty_state(f"{theme.ICONS['warning']} No hay juegos instalados")
             self.games_counter.configure(text="0 juegos")
             return
         
         self.games_counter.configure(text=f"{len(self.games)} juegos")
         
+        if self.triage_mode:
+            self.create_triage_toolbar()
+        
         # Crear una card por cada juego
         for game in self.games:
             self.create_game_card(game)
+        self.visible_slugs = [game.slug for game in self.games]
+        
+        # Mantener el filtro activo al recargar
+        if self.search_entry.get().strip():
+            self.apply_search_filter()
+    
+    def apply_search_filter(self):
+        """Filtra las cards del runner actual reutilizando los widgets existentes"""
+        query = self.search_entry.get().strip()
+        
+        if not query or self.search_index is None:
+            wanted = [game.slug for game in self.games if game.slug in self.game_cards]
+            self.search_info_label.configure(text="")
+        else:
+            wanted = []
+            other_runners = {}
+            for game_id in self.search_index.search(query):
+                game = self.search_index.games[game_id]
+                if self.triage_mode or game.runner == self.current_runner:
+                    if game.slug in self.game_cards:
+                        wanted.append(game.slug)
+                else:
+                    other_runners[game.runner] = other_runners.get(game.runner, 0) + 1
+            
+            # Informar coincidencias en otras plataformas
+            if other_runners:
+                parts = [
+                    f"{config.PLATFORMS.get(r, r.capitalize())} ({n})"
+                    for r, n in sorted(other_runners.items(), key=lambda item: -item[1])[:3]
+                ]
+                self.search_info_label.configure(text="También en: " + ", ".join(parts))
+            else:
+                self.search_info_label.configure(text="")
+        
+        if wanted == self.visible_slugs:
+            return
+        
+        # Ocultar y volver a empaquetar solo lo necesario, en el orden de relevancia
+        for slug in self.visible_slugs:
+            entry = self.game_cards.get(slug)
+            if entry:
+                entry['card'].pack_forget()
+        for slug in wanted:
+            self.game_cards[slug]['card'].pack(fill="x", pady=theme.PADDING_S, padx=theme.PADDING_S)
+        self.visible_slugs = wanted
+        
+        self.games_counter.configure(text=f"{len(wanted)} de {len(self.games)} juegos" if query else f"{len(self.games)} juegos")
+        self.scrollable_frame._parent_canvas.yview_moveto(0)
     
+    def clear_search(self):
+        """Limpia el buscador y muestra todos los juegos"""
+        self.search_entry.delete(0, "end")
+        self.apply_search_filter()
+    
+    @tracing.traced("ui.create_game_card")
     def create_game_card(self, game):
         """Crea una card moderna para cada juego"""
         # Card principal
@@ -340,25 +739,65 @@ class MainWindow:
         inner_frame = ctk.CTkFrame(card, fg_color="transparent")
         inner_frame.pack(fill="both", expand=True, padx=theme.PADDING_M, pady=theme.PADDING_M)
         
-        # Sección superior: Nombre del juego
+        # Sección superior: casilla de selección, nombre y estado de la acción masiva
+        title_row = ctk.CTkFrame(inner_frame, fg_color="transparent")
+        title_row.pack(anchor="w", pady=(0, theme.PADDING_XS))
+        
+        select_var = ctk.BooleanVar(value=game.slug in self.selected_slugs)
+        checkbox = ctk.CTkCheckBox(
+            title_row,
+            text="",
+            width=24,
+            variable=select_var,
+            command=lambda: self.toggle_selection(game.slug, select_var.get())
+        )
+        checkbox.pack(side="left")
+        
         title_label = ctk.CTkLabel(
-            inner_frame,
-            text=game['name'],
+            title_row,
+            text=game.name,
             font=theme.FONT_HEADING,
             text_color=theme.TEXT_PRIMARY,
             anchor="w"
         )
-        title_label.pack(anchor="w", pady=(0, theme.PADDING_XS))
+        title_label.pack(side="left")
+        # Mayús+clic en el nombre marca todo el tramo desde el último marcado
+        title_label.bind("<Shift-Button-1>", lambda e: self.select_range(game.slug))
+        
+        status_label = ctk.CTkLabel(
+            title_row,
+            text="",
+            font=theme.FONT_SMALL,
+            text_color=theme.TEXT_SECONDARY
+        )
+        status_label.pack(side="left", padx=theme.PADDING_M)
         
         slug_label = ctk.CTkLabel(
             inner_frame,
-            text=f"Slug: {game['slug']}",
+            text=f"Slug: {game.slug}",
             font=theme.FONT_SMALL,
             text_color=theme.TEXT_SECONDARY,
             anchor="w"
         )
         slug_label.pack(anchor="w", pady=(0, theme.PADDING_M))
         
+        # En modo triage, indicar qué imágenes faltan
+        triage = self.missing_art.get(game.slug) if self.triage_mode else None
+        if triage:
+            names = {'cover': 'Cover', 'banner': 'Banner', 'icon': 'Icono'}
+            platform = config.PLATFORMS.get(game.runner, game.runner.capitalize())
+            text = f"{platform} - Falta: {', '.join(names[t] for t in triage['missing'])}"
+            if triage['stale_flags']:
+                text += f" (flag en DB sin archivo: {', '.join(names[t] for t in triage['stale_flags'])})"
+            missing_label = ctk.CTkLabel(
+                inner_frame,
+                text=text,
+                font=theme.FONT_SMALL,
+                text_color=theme.WARNING,
+                anchor="w"
+            )
+            missing_label.pack(anchor="w", pady=(0, theme.PADDING_S))
+        
         # Botón de editar metadatos (Top Right)
         edit_btn = ctk.CTkButton(
             inner_frame,
@@ -371,6 +810,19 @@ class MainWindow:
             command=lambda: self.open_metadata_editor(game)
         )
         edit_btn.place(relx=1.0, rely=0.0, anchor="ne", x=0, y=0)
+        
+        # Botón para restaurar las imágenes anteriores del juego
+        restore_btn = ctk.CTkButton(
+            inner_frame,
+            text="↩ Restaurar",
+            width=90,
+            height=24,
+            fg_color=theme.TERTIARY_BG,
+            hover_color=theme.HOVER_BG,
+            text_color=theme.TEXT_SECONDARY,
+            command=lambda: self.undo_game_changes(game)
+        )
+        restore_btn.place(relx=1.0, rely=0.0, anchor="ne", x=-90, y=0)
 
         
         # Separador
@@ -384,10 +836,53 @@ class MainWindow:
         images_frame = ctk.CTkFrame(inner_frame, fg_color="transparent")
         images_frame.pack(fill="x", pady=theme.PADDING_S)
         
-        # Cover, Banner, Icon
-        self.create_image_section(images_frame, game, 'cover').pack(side="left", expand=True, fill="both", padx=theme.PADDING_XS)
-        self.create_image_section(images_frame, game, 'banner').pack(side="left", expand=True, fill="both", padx=theme.PADDING_XS)
-        self.create_image_section(images_frame, game, 'icon').pack(side="left", expand=True, fill="both", padx=theme.PADDING_XS)
+        self.populate_image_sections(images_frame, game)
+        
+        self.game_cards[game.slug] = {
+            'game': game,
+            'card': card,
+            'images_frame': images_frame,
+            'select_var': select_var,
+            'status_label': status_label
+        }
+        
+        # Recreada durante una acción masiva: mostrar su estado actual
+        if self.bulk_job and game.slug in self.bulk_job.status:
+            self.show_bulk_status(game.slug, self.bulk_job.status[game.slug])
+    
+    def populate_image_sections(self, images_frame, game):
+        """Crea las secciones Cover, Banner e Icon dentro de una card"""
+        for image_type in ('cover', 'banner', 'icon'):
+            self.create_image_section(images_frame, game, image_type).pack(
+                side="left", expand=True, fill="both", padx=theme.PADDING_XS
+            )
+    
+    def refresh_game_card(self, slug):
+        """Vuelve a cargar las miniaturas de una sola card sin recargar la lista"""
+        entry = self.game_cards.get(slug)
+        if not entry:
+            return
+        
+        images_frame = entry['images_frame']
+        try:
+            if not images_frame.winfo_exists():
+                return
+        except Exception:
+            return
+        
+        for widget in images_frame.winfo_children():
+            widget.destroy()
+        self.populate_image_sections(images_frame, entry['game'])
+    
+    def on_art_changed(self, changes):
+        """Callback del vigilante (hilo secundario): cambios slug -> tipos"""
+        self.root.after(0, lambda: self.apply_art_changes(changes))
+    
+    def apply_art_changes(self, changes):
+        """Refresca solo las cards cuyas imágenes cambiaron en disco"""
+        for slug in changes:
+            if slug in self.game_cards:
+                self.refresh_game_card(slug)
     
     def create_image_section(self, parent, game, image_type):
         """Crea una sección de imagen con preview y botón"""
@@ -424,7 +919,7 @@ class MainWindow:
         type_label.pack(pady=(theme.PADDING_S, theme.PADDING_XS))
         
         # Intentar cargar la imagen
-        pil_img = self.image_manager.get_thumbnail(game['slug'], image_type, thumb_size)
+        pil_img = self.image_manager.get_thumbnail(game.slug, image_type, thumb_size)
         
         if pil_img:
             # Usar CTkImage para compatibilidad con CustomTkinter
@@ -464,11 +959,156 @@ class MainWindow:
         
         return section_frame
     
+    # ------------------------------------------
+    # Selección múltiple y acciones masivas
+    # ------------------------------------------
+    
+    def toggle_selection(self, slug, selected):
+        """Marca o desmarca un juego (casilla de su card)"""
+        if selected:
+            self.selected_slugs.add(slug)
+        else:
+            self.selected_slugs.discard(slug)
+        self.last_selected_slug = slug
+        self.update_bulk_bar()
+    
+    def set_selection(self, slugs, selected=True):
+        """Marca o desmarca varios juegos y sincroniza sus casillas"""
+        for slug in slugs:
+            if selected:
+                self.selected_slugs.add(slug)
+            else:
+                self.selected_slugs.discard(slug)
+            entry = self.game_cards.get(slug)
+            if entry:
+                entry['select_var'].set(selected)
+        self.update_bulk_bar()
+    
+    def select_range(self, slug):
+        """Mayús+clic: marca los juegos visibles entre el último marcado y este"""
+        if self.last_selected_slug not in self.visible_slugs or slug not in self.visible_slugs:
+            self.toggle_selection(slug, True)
+            self.game_cards[slug]['select_var'].set(True)
+            return
+        a = self.visible_slugs.index(self.last_selected_slug)
+        b = self.visible_slugs.index(slug)
+        self.set_selection(self.visible_slugs[min(a, b):max(a, b) + 1])
+        self.last_selected_slug = slug
+    
+    def select_all_visible(self):
+        """Marca todos los juegos que muestra el filtro actual"""
+        self.set_selection(self.visible_slugs)
+    
+    def clear_selection(self):
+        self.set_selection(list(self.selected_slugs), selected=False)
+    
+    def update_bulk_bar(self):
+        """Muestra la barra con la selección o el progreso de la acción en curso"""
+        if self.bulk_job:
+            counts = self.bulk_job.counts()
+            finished = sum(counts.get(status, 0) for status in bulk_actions.FINISHED)
+            failed = counts.get(bulk_actions.FAILED, 0)
+            text = f"{bulk_actions.ACTIONS[self.bulk_job.action]}: {finished} de {len(self.bulk_job.games)}"
+            if failed:
+                text += f" ({failed} con error)"
+            self.selection_label.configure(text=text)
+        elif self.selected_slugs:
+            count = len(self.selected_slugs)
+            self.selection_label.configure(text=f"{count} juego{'s' if count != 1 else ''} seleccionado{'s' if count != 1 else ''}")
+        
+        if self.bulk_job or self.selected_slugs:
+            if not self.bulk_bar.winfo_ismapped():
+                self.bulk_bar.pack(fill="x", before=self.games_area)
+        else:
+            self.bulk_bar.pack_forget()
+    
+    def run_bulk_action(self, action):
+        """Lanza una acción masiva sobre los juegos seleccionados (en el orden de la lista)"""
+        if self.bulk_job:
+            return
+        games = [game for game in self.games if game.slug in self.selected_slugs]
+        if not games:
+            return
+        
+        self.bulk_job = bulk_actions.BulkJob(
+            action, games, self.api, self.image_manager, self.db,
+            types=BULK_TYPE_CHOICES[self.bulk_types_menu.get()],
+            matches=self.sgdb_matches,
+            resolver=self.name_resolver,
+            on_progress=lambda slug, status, detail: self.root.after(
+                0, self.on_bulk_progress, slug, status, detail),
+            on_done=lambda summary: self.root.after(0, self.on_bulk_done, summary)
+        )
+        
+        for button in self.bulk_buttons + [self.select_all_button, self.clear_selection_button]:
+            button.configure(state="disabled")
+        self.bulk_types_menu.configure(state="disabled")
+        self.bulk_cancel_button.configure(state="normal", text=f"{theme.ICONS['close']} Cancelar")
+        self.bulk_cancel_button.pack(side="right", padx=theme.PADDING_M, before=self.bulk_types_menu)
+        
+        for game in games:
+            self.show_bulk_status(game.slug, bulk_actions.PENDING)
+        self.update_bulk_bar()
+        self.bulk_job.start()
+    
+    def cancel_bulk_action(self):
+        """Cancela lo pendiente de la acción masiva (lo que está en curso termina)"""
+        if self.bulk_job:
+            self.bulk_job.cancel()
+            self.bulk_cancel_button.configure(state="disabled", text="Cancelando...")
+    
+    def show_bulk_status(self, slug, status, detail=""):
+        """Muestra el estado de la acción masiva en la card de un juego"""
+        entry = self.game_cards.get(slug)
+        if not entry:
+            return
+        text, color = BULK_STATUS_TEXT[status]
+        if detail:
+            text = f"{text}: {detail}"
+        try:
+            entry['status_label'].configure(text=text, text_color=color)
+        except Exception:
+            pass
+    
+    def on_bulk_progress(self, slug, status, detail):
+        self.show_bulk_status(slug, status, detail)
+        self.update_bulk_bar()
+    
+    def on_bulk_done(self, summary):
+        """Fin de la acción masiva: una sola actualización de la interfaz"""
+        job, self.bulk_job = self.bulk_job, None
+        
+        for button in self.bulk_buttons + [self.select_all_button, self.clear_selection_button]:
+            button.configure(state="normal")
+        self.bulk_types_menu.configure(state="normal")
+        self.bulk_cancel_button.pack_forget()
+        self.update_bulk_bar()
+        
+        done = summary.get(bulk_actions.DONE, 0)
+        failed = summary.get(bulk_actions.FAILED, 0)
+        cancelled = summary.get(bulk_actions.CANCELLED, 0)
+        message = f"{bulk_actions.ACTIONS[job.action]}: {done} de {len(job.games)} juegos"
+        if failed:
+            message += f", {failed} con error"
+        if cancelled:
+            message += f", {cancelled} cancelados"
+        self.show_notification(message, type="warning" if failed or cancelled else "success")
+        
+        # Solo se redibujan las cards con imágenes nuevas
+        if summary['updated']:
+            if self.triage_mode:
+                self.refresh_games()
+            else:
+                for slug in summary['updated']:
+                    self.refresh_game_card(slug)
+    
     def open_metadata_editor(self, game):
         """Abre la ventana para corregir metadatos"""
         from ui.metadata_window import MetadataWindow
         
         def on_update(sgdb_id=None):
+            # El nombre cambió: la próxima búsqueda no puede reutilizar la anterior
+            self.sgdb_matches.pop(game.slug, None)
             self.refresh_games()
             self.show_notification("Nombre actualizado correctly")
             
@@ -476,80 +1116,143 @@ class MainWindow:
             if sgdb_id:
                 self.show_notification("Descargando imágenes nuevas...", type="info")
                 
-                def batch_download():
-                    # Ejecutar descarga en batch
-                    results = self.image_manager.batch_update_images(
-                        game['slug'], 
-                        sgdb_id, 
-                        self.api
-                    )
-                    
-                    # Notificar resultados
-                    updated = [k for k, v in results.items() if v]
-                    if updated:
-                        msg = f"Imágenes actualizadas: {', '.join(updated)}"
-                        self.root.after(0, lambda: self.show_notification(msg))
-                        # Refrescar UI nuevamente para mostrar imágenes
-                        self.root.after(0, self.refresh_games)
+                def apply_urls(future):
+                    urls = future.result() if not future.cancelled() and future.exception() is None else {}
+                    if urls:
+                        # Mismo camino que el selector: descargas en paralelo y una sola escritura en la DB
+                        self.root.after(0, lambda: self.on_images_selected(game.slug, urls))
                     else:
                         self.root.after(0, lambda: self.show_notification("No se encontraron imágenes nuevas", type="warning"))
 
-                threading.Thread(target=batch_download, daemon=True).start()
+                # Primero la API (mejor imagen de cada tipo); las descargas van después al carril de imágenes
+                get_scheduler().submit(self.image_manager.best_image_urls, sgdb_id, self.api,
+                                       lane='api', priority=INTERACTIVE).add_done_callback(apply_urls)
             
         MetadataWindow(self.root, game, self.db, on_update)
 
     def open_selector(self, game, image_type):
-        """Abre la ventana de selección de imágenes"""
-        # Buscar el juego en SGDB
-        result = self.api.search_game(game['name'])
+        """Abre el selector de imágenes del juego en la pestaña del tipo pedido"""
+        match = self.sgdb_matches.get(game.slug)
+        if match:
+            self.show_selector(game, image_type, match)
+            return
+        
+        # Buscar el juego en SGDB sin bloquear la interfaz (una vez por juego)
+        def search():
+            # Sin umbral de parecido: si nada lo alcanza se abre el primer resultado
+            # (el usuario ve el juego y puede renombrarlo si no es)
+            result = self.name_resolver.resolve_name(game.name, fallback=True)
+            self.root.after(0, lambda: self.show_selector(game, image_type, result))
         
+        get_scheduler().submit(search, lane='api', priority=INTERACTIVE)
+    
+    def show_selector(self, game, image_type, result):
+        """Abre el selector con el resultado de la búsqueda"""
         if result:
-            # Abrir ventana de selección
-            SelectorWindow(self.root, result['name'], result['id'], 
-                          game['slug'], self.current_runner, image_type,
-                          self.on_image_selected)
+            self.sgdb_matches[game.slug] = result
+            from ui.art_selector_window import ArtSelectorWindow
+            ArtSelectorWindow(self.root, result['name'], result['id'], 
+                              game.slug, game.runner or self.current_runner,
+                              self.on_images_selected, initial_type=image_type)
         else:
+            if get_connectivity().is_offline():
+                message = (f"Sin conexión y '{game.name}' no está en la caché.\n"
+                           "Vuelve a intentarlo cuando haya red.")
+            else:
+                message = (f"No se encontró '{game.name}' en SteamGridDB.\n"
+                           "Intenta renombrar el juego en Lutris.")
+            dialogs.show_error(self.root, "Error", message)
+    
+    def on_images_selected(self, slug, selections):
+        """Callback del selector: aplica todas las imágenes elegidas en un solo lote"""
+        names = {'cover': 'cover', 'banner': 'banner', 'icon': 'icono'}
+        self.show_notification(f"Actualizando {', '.join(names[t] for t in selections)}...", type="info")
+        
+        # Descargas en paralelo bajo un mismo trabajo de respaldo ("Restaurar" las deshace juntas)
+        scheduler = get_scheduler()
+        job_id = new_job_id("selector")
+        futures = {
+            image_type: scheduler.submit(self.image_manager.replace_image, slug, image_type, url, job_id,
+                                         lane='images', priority=INTERACTIVE)
+            for image_type, url in selections.items()
+        }
+        
+        def finish(_):
+            results = {t: not f.cancelled() and f.exception() is None and bool(f.result())
+                       for t, f in futures.items()}
+            
+            # Una sola actualización de la DB para todo el lote
+            game = self.games_by_slug.get(slug)
+            if game and any(results.values()):
+                self.db.update_game_images(game.id, game.name)
+            
+            self.root.after(0, lambda: self.on_images_applied(slug, results))
+        
+        when_all(futures.values(), finish)
+    
+    def on_images_applied(self, slug, results):
+        """Refresca la card del juego una vez y avisa del resultado del lote"""
+        names = {'cover': 'Cover', 'banner': 'Banner', 'icon': 'Icono'}
+        updated = [names[t] for t, ok in results.items() if ok]
+        failed = [names[t] for t, ok in results.items() if not ok]
+        
+        if updated:
+            self.show_notification(f"Actualizado: {', '.join(updated)}")
+            if self.triage_mode:
+                self.refresh_games()
+            else:
+                self.refresh_game_card(slug)
+        if failed:
             dialogs.show_error(
                 self.root,
                 "Error",
-                f"No se encontró '{game['name']}' en SteamGridDB.\n"
-                "Intenta renombrar el juego en Lutris."
+                f"No se pudo actualizar: {', '.join(failed)}.\n"
+                "Verifica tu conexión a internet."
             )
     
-    def on_image_selected(self, slug, image_type, url):
-        """Callback cuando se selecciona una imagen"""
-        self.show_notification(f"Actualizando {image_type}...", type="info")
-        
-        # Reemplazar la imagen en un hilo separado
-        def replace():
-            success = self.image_manager.replace_image(slug, image_type, url)
+    def undo_game_changes(self, game):
+        """Restaura las imágenes anteriores de un juego desde el almacén de respaldos"""
+        def undo():
+            restored = self.image_manager.rollback_game(game.slug)
             
-            if success:
-                # Actualizar la DB
-                game = next((g for g in self.games if g['slug'] == slug), None)
-                if game:
-                    self.db.update_game_images(game['id'], game['name'])
-                
-                self.root.after(0, lambda: self.on_replace_success(image_type))
-            else:
-                self.root.after(0, lambda: self.on_replace_error(image_type))
+            def done():
+                if restored:
+                    self.show_notification(f"{restored} imágenes restauradas")
+                    self.refresh_game_card(game.slug)
+                else:
+                    self.show_notification("No hay cambios que deshacer", type="info")
+            
+            self.root.after(0, done)
         
-        threading.Thread(target=replace, daemon=True).start()
-    
-    def on_replace_success(self, image_type):
-        """Maneja el éxito al reemplazar una imagen"""
-        self.show_notification(f"{image_type.capitalize()} actualizado")
-        # Refrescar la lista
-        self.refresh_games()
+        threading.Thread(target=undo, daemon=True).start()
     
-    def on_replace_error(self, image_type):
-        """Maneja el error al reemplazar una imagen"""
-        dialogs.show_error(
+    def undo_last_job(self):
+        """Deshace el último trabajo (un cambio individual o un lote completo)"""
+        jobs = self.image_manager.backup_store.list_jobs()
+        if not jobs:
+            self.show_notification("No hay cambios que deshacer", type="info")
+            return
+        
+        job = jobs[0]
+        if not dialogs.show_question(
             self.root,
-            "Error",
-            f"No se pudo actualizar el {image_type}.\n"
-            "Verifica tu conexión a internet."
-        )
+            "Deshacer cambios",
+            f"¿Restaurar las imágenes de {len(job['slugs'])} juegos\n"
+            "al estado anterior al último cambio?"
+        ):
+            return
+        
+        def undo():
+            restored = self.image_manager.rollback_job(job['job'])
+            
+            def done():
+                self.show_notification(f"{restored} imágenes restauradas")
+                for slug in job['slugs']:
+                    self.refresh_game_card(slug)
+            
+            self.root.after(0, done)
+        
+        threading.Thread(target=undo, daemon=True).start()
     
     def enable_mousewheel_scroll(self, widget):
         """Habilita el scroll con la ruedita del mouse"""
@@ -595,29 +1298,49 @@ class MainWindow:
         widget._parent_canvas.bind("<Leave>", on_leave)
     
     def show_settings(self):
-        """Muestra ventana de configuración"""
-        from ui.apikey_window import get_api_key
-        from utils.config_manager import get_config_manager
+        """Muestra la ventana de configuración (Toplevel sobre la ventana principal)"""
+        from ui.settings_window import SettingsWindow
         
-        config_mgr = get_config_manager()
-        current_api_key = config_mgr.get_api_key()
+        # Si ya está abierta, solo traerla al frente
+        if self.settings_window is not None and self.settings_window.winfo_exists():
+            self.settings_window.lift()
+            return
         
-        # Solicitar nuevo API Key mostrando el actual
-        new_api_key = get_api_key(show_change_option=True, current_key=current_api_key)
+        config_mgr = self.config_mgr
+        self.settings_window = SettingsWindow(
+            self.root,
+            current_key=config_mgr.get_api_key(),
+            normalize_art=config_mgr.get_normalize_art(),
+            on_save=self.on_settings_saved
+        )
+    
+    def show_diagnostics(self):
+        """Muestra el panel de diagnóstico (latencias, cachés y estado del proceso)"""
+        from ui.diagnostics_window import DiagnosticsWindow
         
-        if new_api_key and new_api_key != current_api_key:
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        
+        self.diagnostics_window = DiagnosticsWindow(self.root)
+    
+    def on_settings_saved(self, new_api_key, normalize_art):
+        """Guarda los cambios de la ventana de configuración"""
+        config_mgr = self.config_mgr
+        self.settings_window = None
+        
+        if normalize_art != config_mgr.get_normalize_art():
+            config_mgr.set_normalize_art(normalize_art)
+        
+        if new_api_key and new_api_key != config_mgr.get_api_key():
             # Guardar nuevo API Key
             if config_mgr.set_api_key(new_api_key):
                 # Actualizar en config
                 config.STEAMGRIDDB_API_KEY = new_api_key
-                # Reinicializar API
-                self.api = SteamGridDBAPI()
+                # Reinicializar API (se crea de nuevo al usarla)
+                self._api = None
                 
-                dialogs.show_success(
-                    self.root,
-                    "API Key actualizado",
-                    "El API Key se ha actualizado correctamente.\nYa puedes continuar usando la aplicación."
-                )
+                self.show_notification("API Key actualizado")
             else:
                 dialogs.show_error(
                     self.root,
@@ -653,6 +1376,51 @@ class MainWindow:
         # Auto-destrucción
         self.root.after(2500, notification.destroy)
 
+    def update_connection_status(self, offline):
+        """Muestra u oculta el indicador de modo sin conexión"""
+        if offline:
+            self.connection_label.pack(side="right", padx=theme.PADDING_S, pady=theme.PADDING_M,
+                                       before=self.search_info_label)
+        else:
+            self.connection_label.pack_forget()
+    
+    def update_breaker_status(self):
+        """Muestra qué hosts tienen las peticiones en pausa (cortacircuitos no cerrado)"""
+        if self._breaker_job is not None:
+            self.root.after_cancel(self._breaker_job)
+            self._breaker_job = None
+        
+        paused = [b for b in circuit_breaker.all_breakers().values() if b.state != circuit_breaker.CLOSED]
+        if not paused:
+            self.breaker_label.pack_forget()
+            return
+        
+        breaker = paused[0]
+        if breaker.state == circuit_breaker.OPEN:
+            text = f"⛔ {breaker.host} en pausa ({breaker.retry_in():.0f}s)"
+            # Actualizar la cuenta atrás mientras siga abierto
+            self._breaker_job = self.root.after(1000, self.update_breaker_status)
+        else:
+            text = f"⛔ {breaker.host}: probando de nuevo..."
+        self.breaker_label.configure(text=text)
+        self.breaker_label.pack(side="right", padx=theme.PADDING_S, pady=theme.PADDING_M,
+                                before=self.search_info_label)
+    
+    def on_root_configure(self, event):
+        """Guarda la geometría de la ventana principal cuando cambia"""
+        if event.widget is not self.root:
+            return
+        geometry = self.root.geometry()
+        if geometry != self.saved_geometry:
+            self.saved_geometry = geometry
+            self.config_mgr.set_window_geometry('main', geometry)
+    
+    def on_close(self):
+        """Detiene los servicios en segundo plano y cierra la ventana"""
+        self.art_watcher.stop()
+        self.config_mgr.flush()
+        self.root.destroy()
+    
     def run(self):
         """Inicia la aplicación"""
         self.root.mainloop()
@@ -2,9 +2,9 @@
 Ventana para corregir metadatos (nombre del juego)
 """
 import customtkinter as ctk
-import threading
 from ui import theme, dialogs
 from utils.api import SteamGridDBAPI
+from utils.scheduler import get_scheduler, INTERACTIVE
 
 class MetadataWindow(ctk.CTkToplevel):
     def __init__(self, parent, game_data, db, callback):
@@ -64,7 +64,7 @@ class MetadataWindow(ctk.CTkToplevel):
         
         subtitle = ctk.CTkLabel(
             header_frame,
-            text=f"Actual: {self.game_data['name']}",
+            text=f"Actual: {self.game_data.name}",
             font=theme.FONT_BODY,
             text_color=theme.TEXT_SECONDARY
         )
@@ -82,7 +82,7 @@ class MetadataWindow(ctk.CTkToplevel):
         )
         self.entry.pack(side="left", fill="x", expand=True, padx=(0, theme.PADDING_S))
         self.entry.bind("<Return>", lambda e: self.search())
-        self.entry.insert(0, self.game_data['name'])
+        self.entry.insert(0, self.game_data.name)
 
         search_btn = ctk.CTkButton(
             search_frame,
@@ -151,7 +151,7 @@ class MetadataWindow(ctk.CTkToplevel):
         # I will write the component assuming `api.search_games` returns a list of dicts.
         # And I will update api.py in the next tool call.
         
-        threading.Thread(target=self._perform_search, args=(query,), daemon=True).start()
+        get_scheduler().submit(self._perform_search, query, lane='api', priority=INTERACTIVE)
 
     def _perform_search(self, query):
         # We need a method that returns list. 
@@ -207,7 +207,7 @@ class MetadataWindow(ctk.CTkToplevel):
     def select_game(self, game):
         # Update DB
         try:
-            self.db.update_game_name(self.game_data['id'], game['name'])
+            self.db.update_game_name(self.game_data.id, game['name'])
             
             # Call callback to refresh UI, passing the new SGDB ID
             if self.callback:
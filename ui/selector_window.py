@@ -5,12 +5,13 @@ Versión moderna con CustomTkinter y Material Design
 import customtkinter as ctk
 from tkinter import messagebox
 from PIL import Image
-import threading
 from typing import Callable
 import os
 import config
 from utils.api import SteamGridDBAPI
 from utils.image_manager import ImageManager
+from utils.connectivity import get_connectivity
+from utils.scheduler import get_scheduler, INTERACTIVE, VISIBLE, OFFSCREEN
 from ui import theme
 
 # Configurar CustomTkinter para evitar problemas de X11
@@ -23,6 +24,10 @@ except:
     pass
 
 
+# Filas de miniaturas que caben en pantalla al abrir (el resto se pide después)
+VISIBLE_ROWS = 2
+
+
 class SelectorWindow:
     def __init__(self, parent, game_name: str, game_id: int, slug: str, 
                  runner: str, image_type: str, on_select_callback: Callable):
@@ -52,6 +57,10 @@ class SelectorWindow:
         self.images_data = []
         self.selected_url = None
         self.selected_card = None
+        self.scheduler = get_scheduler()
+        # Miniaturas aún en cola (se cancelan al cerrar)
+        self.thumb_futures = []
+        self.offscreen_promoted = False
         
         # Crear ventana
         self.window = ctk.CTkToplevel(parent)
@@ -163,7 +172,7 @@ class SelectorWindow:
             button_container,
             text=f"{theme.ICONS['close']} Cancelar",
             **theme.get_button_secondary_colors(),
-            command=self.window.destroy,
+            command=self.on_closing,
             width=120,
             height=theme.BUTTON_HEIGHT,
             font=theme.FONT_BODY
@@ -199,7 +208,8 @@ class SelectorWindow:
                                                    self.runner, limit=20)
             self.window.after(0, self.display_images)
         
-        threading.Thread(target=load, daemon=True).start()
+        # La lista la pidió el usuario: pasa por delante de miniaturas y trabajos masivos
+        self.scheduler.submit(load, lane='api', priority=INTERACTIVE)
     
     def display_images(self):
         """Muestra las imágenes en una cuadrícula moderna"""
@@ -236,13 +246,16 @@ class SelectorWindow:
             col = idx % columns
             
             # Card para cada imagen
-            self.create_image_card(grid_container, img_data, thumb_width, thumb_height, idx, row, col, card_padding)
+            priority = VISIBLE if row < VISIBLE_ROWS else OFFSCREEN
+            self.create_image_card(grid_container, img_data, thumb_width, thumb_height, idx, row, col,
+                                   card_padding, priority)
         
         # Configurar pesos de columnas para que se distribuyan uniformemente
         for i in range(columns):
             grid_container.grid_columnconfigure(i, weight=1, uniform="column")
     
-    def create_image_card(self, parent, img_data, width, height, index, row, col, padding):
+    def create_image_card(self, parent, img_data, width, height, index, row, col, padding,
+                          priority=VISIBLE):
         """Crea una card para cada imagen con efecto hover"""
         # Frame de la card con tamaño fijo
         card = ctk.CTkFrame(
@@ -277,6 +290,21 @@ class SelectorWindow:
         )
         badge.pack(side="left")
         
+        # Marcar las imágenes ya descargadas (disponibles sin conexión)
+        available = self.image_manager.is_available_offline(img_data.url)
+        offline = get_connectivity().is_offline()
+        if available or offline:
+            local_badge = ctk.CTkLabel(
+                badge_frame,
+                text="Local" if available else "Requiere conexión",
+                font=theme.FONT_TINY,
+                text_color=theme.PRIMARY_BG if available else theme.TEXT_SECONDARY,
+                fg_color=theme.SUCCESS if available else theme.TERTIARY_BG,
+                corner_radius=12,
+                height=24
+            )
+            local_badge.pack(side="right")
+        
         # Contenedor para la imagen (centrado)
         img_frame = ctk.CTkFrame(
             inner_frame,
@@ -299,7 +327,13 @@ class SelectorWindow:
         
         # Hacer la card completamente clickeable
         def on_click(event=None):
-            self.select_image(img_data['url'], card, index)
+            if get_connectivity().is_offline() and not self.image_manager.is_available_offline(img_data.url):
+                self.image_counter.configure(
+                    text=f"Imagen #{index + 1}: sin conexión y no está guardada",
+                    text_color=theme.WARNING
+                )
+                return "break"
+            self.select_image(img_data.url, card, index)
             return "break"  # Evitar propagación
         
         # Bind a todos los widgets para mejor experiencia
@@ -321,10 +355,10 @@ class SelectorWindow:
             widget.bind("<Enter>", on_enter)
             widget.bind("<Leave>", on_leave)
         
-        # Cargar miniatura en hilo separado
+        # Cargar miniatura en el planificador de red
         def load_thumb():
             try:
-                thumb = self.image_manager.download_thumbnail(img_data['thumb'], (width, height))
+                thumb = self.image_manager.download_thumbnail(img_data.thumb, (width, height))
                 if thumb:
                     # Usar CTkImage para compatibilidad
                     ctk_image = ctk.CTkImage(light_image=thumb, dark_image=thumb, size=(width, height))
@@ -332,7 +366,15 @@ class SelectorWindow:
             except Exception as e:
                 print(f"Error cargando miniatura: {e}")
         
-        threading.Thread(target=load_thumb, daemon=True).start()
+        self.thumb_futures.append(self.scheduler.submit(load_thumb, lane='images', priority=priority))
+    
+    def promote_thumbnails(self):
+        """Al hacer scroll, las miniaturas de abajo pasan a ser visibles"""
+        if self.offscreen_promoted:
+            return
+        self.offscreen_promoted = True
+        for future in self.thumb_futures:
+            self.scheduler.set_priority(future, VISIBLE)
     
     def update_thumbnail(self, placeholder, ctk_image, img_frame):
         """Actualiza el placeholder con la imagen cargada"""
@@ -359,9 +401,13 @@ class SelectorWindow:
         )
         icon.pack(pady=(150, theme.PADDING_M))
         
+        if get_connectivity().is_offline():
+            text = f"Sin conexión: no hay {self.get_type_name().lower()}s guardados para este juego"
+        else:
+            text = f"No se encontraron {self.get_type_name().lower()}s para este juego"
         message = ctk.CTkLabel(
             empty_frame,
-            text=f"No se encontraron {self.get_type_name().lower()}s para este juego",
+            text=text,
             font=theme.FONT_BODY,
             text_color=theme.TEXT_SECONDARY
         )
@@ -400,18 +446,21 @@ class SelectorWindow:
     def enable_mousewheel_scroll(self, widget):
         """Habilita el scroll con la ruedita del mouse"""
         def _on_mousewheel(event):
+            self.promote_thumbnails()
             try:
                 widget._parent_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
             except:
                 pass
         
         def _on_scroll_up(event):
+            self.promote_thumbnails()
             try:
                 widget._parent_canvas.yview_scroll(-1, "units")
             except:
                 pass
         
         def _on_scroll_down(event):
+            self.promote_thumbnails()
             try:
                 widget._parent_canvas.yview_scroll(1, "units")
             except:
@@ -432,6 +481,10 @@ class SelectorWindow:
     
     def on_closing(self):
         """Limpia los bindings antes de cerrar la ventana"""
+        # Las miniaturas que no han empezado ya no hacen falta
+        for future in self.thumb_futures:
+            future.cancel()
+        
         try:
             # Desvincular eventos
             self.window.unbind("<MouseWheel>")
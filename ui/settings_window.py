@@ -0,0 +1,175 @@
+"""
+Ventana de configuración (API Key y opciones de imágenes)
+Es un CTkToplevel de la ventana principal: no crea otro intérprete de Tk ni
+otro mainloop, así que las tareas programadas con after() siguen corriendo.
+"""
+import customtkinter as ctk
+from ui import theme, dialogs
+
+
+class SettingsWindow(ctk.CTkToplevel):
+    def __init__(self, parent, current_key, normalize_art, on_save):
+        """
+        Args:
+            parent: Ventana principal
+            current_key: API Key actual
+            normalize_art: Estado actual de la normalización de imágenes
+            on_save: Callback(api_key, normalize_art) al pulsar Guardar
+        """
+        super().__init__(parent)
+        self.current_key = current_key
+        self.on_save = on_save
+
+        self.title("Configuración")
+        self.geometry("600x420")
+        self.resizable(False, False)
+        self.configure(fg_color=theme.PRIMARY_BG)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.normalize_var = ctk.BooleanVar(value=bool(normalize_art))
+        self.setup_ui()
+        self.center_window(parent)
+
+        # Modal sobre la ventana principal (grab cuando ya es visible)
+        self.transient(parent)
+        self.after(100, self._grab)
+
+    def _grab(self):
+        try:
+            self.lift()
+            self.api_key_entry.focus_set()
+            self.grab_set()
+        except Exception:
+            pass
+
+    def center_window(self, parent):
+        """Centra la ventana sobre el padre"""
+        width, height = 600, 420
+        x = parent.winfo_x() + (parent.winfo_width() - width) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - height) // 2
+        self.geometry(f'{width}x{height}+{max(0, x)}+{max(0, y)}')
+
+    def setup_ui(self):
+        main_frame = ctk.CTkFrame(self, fg_color="transparent")
+        main_frame.pack(fill="both", expand=True, padx=theme.PADDING_L, pady=theme.PADDING_L)
+
+        title_label = ctk.CTkLabel(
+            main_frame,
+            text="Configuración",
+            font=theme.FONT_TITLE,
+            text_color=theme.TEXT_PRIMARY
+        )
+        title_label.pack(anchor="w", pady=(0, theme.PADDING_M))
+
+        # API Key
+        key_label = ctk.CTkLabel(
+            main_frame,
+            text="API Key de SteamGridDB:",
+            font=theme.FONT_BODY,
+            text_color=theme.TEXT_PRIMARY,
+            anchor="w"
+        )
+        key_label.pack(anchor="w", pady=(0, theme.PADDING_XS))
+
+        self.api_key_entry = ctk.CTkEntry(
+            main_frame,
+            height=theme.INPUT_HEIGHT,
+            font=theme.FONT_BODY,
+            fg_color=theme.SECONDARY_BG,
+            border_color=theme.BORDER,
+            text_color=theme.TEXT_PRIMARY,
+            placeholder_text="Ej: 1a2b3c4d5e6f7g8h9i0j..."
+        )
+        self.api_key_entry.pack(fill="x", pady=(0, theme.PADDING_XS))
+        if self.current_key:
+            self.api_key_entry.insert(0, self.current_key)
+
+        key_hint = ctk.CTkLabel(
+            main_frame,
+            text="Obtén uno en https://www.steamgriddb.com/profile/preferences/api",
+            font=theme.FONT_SMALL,
+            text_color=theme.TEXT_SECONDARY,
+            anchor="w"
+        )
+        key_hint.pack(anchor="w", pady=(0, theme.PADDING_L))
+
+        # Opciones de imágenes
+        options_frame = ctk.CTkFrame(
+            main_frame,
+            fg_color=theme.SECONDARY_BG,
+            corner_radius=theme.CORNER_RADIUS
+        )
+        options_frame.pack(fill="x", pady=(0, theme.PADDING_M))
+
+        normalize_switch = ctk.CTkSwitch(
+            options_frame,
+            text="Normalizar covers y banners descargados",
+            font=theme.FONT_BODY,
+            text_color=theme.TEXT_PRIMARY,
+            variable=self.normalize_var,
+            progress_color=theme.ACCENT_BLUE
+        )
+        normalize_switch.pack(anchor="w", padx=theme.PADDING_M, pady=(theme.PADDING_M, theme.PADDING_XS))
+
+        normalize_hint = ctk.CTkLabel(
+            options_frame,
+            text="Reduce al tamaño que usa Lutris, recomprime y quita metadatos",
+            font=theme.FONT_SMALL,
+            text_color=theme.TEXT_SECONDARY,
+            anchor="w"
+        )
+        normalize_hint.pack(anchor="w", padx=theme.PADDING_M, pady=(0, theme.PADDING_M))
+
+        # Botones
+        buttons_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        buttons_frame.pack(fill="x", side="bottom")
+
+        cancel_button = ctk.CTkButton(
+            buttons_frame,
+            text="Cancelar",
+            height=theme.BUTTON_HEIGHT,
+            font=theme.FONT_BODY,
+            **theme.get_button_colors("secondary"),
+            command=self.close
+        )
+        cancel_button.pack(side="left", fill="x", expand=True, padx=(0, theme.PADDING_S))
+
+        save_button = ctk.CTkButton(
+            buttons_frame,
+            text="Guardar",
+            height=theme.BUTTON_HEIGHT,
+            font=theme.FONT_BODY,
+            **theme.get_button_colors("primary"),
+            command=self.save
+        )
+        save_button.pack(side="right", fill="x", expand=True, padx=(theme.PADDING_S, 0))
+
+        self.bind("<Return>", lambda e: self.save())
+        self.bind("<Escape>", lambda e: self.close())
+
+    def save(self):
+        """Valida el API Key y entrega los valores a on_save"""
+        api_key = self.api_key_entry.get().strip()
+
+        if not api_key:
+            dialogs.show_error(self, "Error de validación", "Por favor ingresa un API Key válido")
+            return
+
+        if len(api_key) < 20:
+            dialogs.show_error(
+                self,
+                "Error de validación",
+                "El API Key parece ser demasiado corto. Verifica que lo hayas copiado completo."
+            )
+            return
+
+        normalize_art = self.normalize_var.get()
+        self.close()
+        self.on_save(api_key, normalize_art)
+
+    def close(self):
+        try:
+            self.grab_release()
+        except Exception:
+            pass
+        self.destroy()
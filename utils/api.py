@@ -1,22 +1,45 @@
 """
 Módulo para interactuar con la API de SteamGridDB
 """
+import http.client
 import urllib.request
 import urllib.parse
+import itertools
 import json
 import ssl
-from typing import List, Dict, Optional
+import zlib
+from typing import Callable, List, Dict, Optional
 import config
+from utils import metrics, net, tracing
+from utils.circuit_breaker import CircuitOpenError, get_breaker, get_retry_budget
+from utils.connectivity import OfflineError, get_connectivity
+from utils.http_cache import conditional_headers, get_http_cache, is_fresh, validators_from
+from utils.json_stream import CountingReader, JSONArrayReader, open_decoded
+from utils.net import Deadline, DeadlineExceeded, DeadlineReader
+from utils.models import ImageCandidate
+from utils.single_flight import SingleFlight
 
 # SSL Bypass
 import random
 import time
 import urllib.error
 
-# SSL Bypass
-ctx = ssl.create_default_context()
-ctx.check_hostname = False
-ctx.verify_mode = ssl.CERT_NONE
+# SSL Bypass (el contexto se crea en el primer uso: cargar los certificados
+# del sistema retrasa el arranque)
+_ssl_context = None
+
+def get_ssl_context() -> ssl.SSLContext:
+    """Contexto SSL compartido por las peticiones a la API y las descargas"""
+    global _ssl_context
+    if _ssl_context is None:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        _ssl_context = context
+    return _ssl_context
+
+# Errores de un cuerpo cortado a la mitad (gzip/deflate sin final, JSON incompleto)
+_TRUNCATED_BODY = (EOFError, http.client.IncompleteRead, ValueError, zlib.error)
 
 # Lista de User-Agents para rotación (Bypass WAF/Fortinet)
 USER_AGENTS = [
@@ -27,20 +50,57 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0"
 ]
 
+def _retry_after_seconds(error, default):
+    """Lee la cabecera Retry-After (en segundos) de un error HTTP"""
+    value = error.headers.get('Retry-After') if error.headers else None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+# Peticiones idénticas en curso compartidas entre todas las instancias
+_flights = SingleFlight("api")
+
+
+def _endpoint_name(url: str) -> str:
+    """Nombre corto del endpoint de una URL de la API (para las métricas)"""
+    for part in urllib.parse.urlparse(url).path.split('/'):
+        if part in ('search', 'grids', 'heroes', 'icons'):
+            return part
+    return 'other'
+
+
 class SteamGridDBAPI:
-    def __init__(self):
+    def __init__(self, base_url: str = None):
         self.api_key = config.STEAMGRIDDB_API_KEY
-        self.base_url = "https://www.steamgriddb.com/api/v2"
+        self.base_url = (base_url or config.STEAMGRIDDB_BASE_URL).rstrip('/')
         # Authorization header se mantiene, User-Agent se rota dinámicamente
         self.headers = {'Authorization': f'Bearer {self.api_key}'}
     
-    def _make_request(self, url_or_request, retry_count=3):
+    @tracing.traced("api.request", args=lambda self, req, *a, **kw: {'url': getattr(req, 'full_url', req)})
+    def _make_request(self, url_or_request, retry_count=3, deadline: Optional[Deadline] = None,
+                      read: Optional[Callable] = None):
         """
         Realiza una petición HTTP robusta con:
         - Rotación de User-Agent
         - Manejo de Rate Limiting (429) y errores 403
-        - Reintentos exponenciales
+        - Reintentos exponenciales (limitados por el presupuesto global)
+        - Cortacircuitos por host: con el servidor fallando, error inmediato
+        - Sin conexión: falla al instante con OfflineError
+        - Transferencia comprimida (gzip/deflate): leer con json_stream.open_decoded
+        - Plazo total (por defecto NET_DEADLINES['api']) que recorta los tiempos
+          de conexión/lectura de cada intento y las esperas entre reintentos
+        
+        Con read, cada intento incluye leer el cuerpo: read(respuesta) se llama
+        dentro del reintento y se retorna lo que devuelva. Un cuerpo cortado a
+        la mitad (EOFError, IncompleteRead, JSON incompleto) cuenta como fallo
+        de conexión y se reintenta; el cortacircuitos solo anota un éxito con el
+        cuerpo completo. Sin read se retorna la respuesta abierta.
         """
+        if get_connectivity().is_offline():
+            raise OfflineError("Sin conexión")
+        
         req = url_or_request
         if isinstance(req, str):
             req = urllib.request.Request(req)
@@ -51,78 +111,217 @@ class SteamGridDBAPI:
         # Asegurar Authorization (si no está ya en los headers del objeto Request)
         if not req.has_header('Authorization'):
             req.add_header('Authorization', f'Bearer {self.api_key}')
+        req.add_header('Accept-Encoding', 'gzip, deflate')
+        
+        endpoint = _endpoint_name(req.full_url)
+        metrics.inc(f"api.requests.{endpoint}")
+        breaker = get_breaker(urllib.parse.urlparse(req.full_url).netloc)
+        budget = get_retry_budget()
+        budget.record_request()
+        if deadline is None:
+            deadline = Deadline.for_class('api')
         
         delay = 1
         for attempt in range(retry_count + 1):
+            deadline.check("la petición a la API")
+            # Cortacircuitos abierto: fallar al instante sin tocar la red
+            if not breaker.allow():
+                metrics.inc("api.breaker_rejected")
+                raise CircuitOpenError(breaker.host, breaker.retry_in())
+            if attempt:
+                metrics.inc("api.retries")
             try:
                 # Pequeño delay global (jitter) para evitar patrones de bot
-                time.sleep(0.5 + random.random() * 0.5)
+                jitter_min, jitter_max = config.API_REQUEST_JITTER
+                if jitter_max > 0:
+                    time.sleep(random.uniform(jitter_min, jitter_max))
                 
-                return urllib.request.urlopen(req, context=ctx, timeout=30)
+                start = time.perf_counter()
+                response = net.urlopen(req, 'api', deadline, context=get_ssl_context())
+                metrics.observe(f"api.latency_ms.{endpoint}", (time.perf_counter() - start) * 1000)
+                if read is None:
+                    breaker.record_success()
+                    return response
+                with response:
+                    result = read(response)
+                breaker.record_success()
+                return result
             
+            except DeadlineExceeded:
+                # Se acabó nuestro plazo, no falló el host: ni fallo ni sonda,
+                # pero si era la prueba del semiabierto hay que soltarla
+                breaker.release()
+                raise
             except urllib.error.HTTPError as e:
+                if e.code == 304: # No modificado: lo resuelve quien hizo la petición condicional
+                    metrics.observe(f"api.latency_ms.{endpoint}", (time.perf_counter() - start) * 1000)
+                    breaker.record_success()
+                    raise
                 print(f"DEBUG: HTTP Error {e.code} for {req.full_url}")
+                metrics.inc(f"api.http_{e.code}")
                 if e.code == 429: # Rate Limit
-                    wait_time = delay * (2 ** attempt)
+                    # El servidor responde: no cuenta como fallo del cortacircuitos
+                    breaker.record_success()
+                    # Respetar Retry-After si el servidor lo indica
+                    wait_time = _retry_after_seconds(e, delay * (2 ** attempt))
                     print(f"⚠️ Rate limit (429). Esperando {wait_time}s...")
-                    time.sleep(wait_time)
-                    continue
                 elif e.code == 403: # Forbidden
+                    breaker.record_failure()
                     print(f"❌ Error 403 Forbidden. Intento {attempt+1}/{retry_count+1}")
-                    if attempt < retry_count:
-                        time.sleep(delay * 2)
-                        continue
-                    else:
+                    if attempt >= retry_count:
                         print("   Posible bloqueo de seguridad (WAF/Fortinet).")
                         raise e
+                    wait_time = delay * 2
                 elif e.code in [500, 502, 503, 504]: # Server Error
-                    time.sleep(delay)
-                    continue
+                    breaker.record_failure()
+                    wait_time = delay
                 else:
+                    breaker.record_success()
                     raise e
+                error = e
             except Exception as e:
                 print(f"⚠️ Error de conexión: {e}")
-                if attempt < retry_count:
-                    time.sleep(delay)
-                    continue
-                raise e
+                metrics.inc("api.connection_errors")
+                breaker.record_failure()
+                # Si la sonda confirma que no hay red, no seguir reintentando
+                # (con un cuerpo cortado las cabeceras llegaron: hay red, no se sondea)
+                if not isinstance(e, _TRUNCATED_BODY) and get_connectivity().report_failure():
+                    raise OfflineError("Sin conexión") from e
+                if attempt >= retry_count:
+                    raise e
+                wait_time = delay
+                error = e
+            
+            if attempt >= retry_count:
+                break
+            # Los reintentos salen de un presupuesto común a toda la aplicación
+            if not budget.try_retry():
+                metrics.inc("api.retry_budget_exhausted")
+                print("⚠️ Presupuesto de reintentos agotado, no se reintenta")
+                raise error
+            # No esperar un reintento que ya no cabe en el plazo
+            if wait_time >= deadline.remaining():
+                metrics.inc("net.deadline_exceeded")
+                raise DeadlineExceeded("Se agotó el plazo de la petición a la API") from error
+            time.sleep(wait_time)
         raise Exception("Max retries exceeded")
     
-    def search_game(self, query: str) -> Optional[Dict]:
+    def _get_json(self, url: str, parse=None, cache_key: str = None, deadline: Optional[Deadline] = None):
+        """
+        GET a la API que retorna el JSON decodificado
+        
+        Args:
+            url: URL de la API
+            parse: Función opcional que recibe el stream descomprimido y retorna
+                   los datos (para leer solo parte de una respuesta grande).
+                   Lo que retorna es lo que se guarda en la caché.
+            cache_key: Clave de la caché si parse no guarda la respuesta completa
+            deadline: Plazo de la operación (por defecto NET_DEADLINES['api'])
+        
+        Las llamadas simultáneas con la misma clave (desde otra ventana u otro
+        hilo) esperan a la que ya está en curso y comparten su resultado.
+        
+        Cada respuesta se guarda en la caché en disco con sus validadores.
+        Durante API_CACHE_FRESH_SECONDS se responde desde ella sin red; después
+        se revalida con una petición condicional y un 304 solo la renueva.
+        Sin conexión (o si la petición falla) se responde desde la caché;
+        lanza la excepción original si tampoco hay nada guardado.
+        """
+        key = cache_key or url
+        if deadline is None:
+            deadline = Deadline.for_class('api')
+        return _flights.do((self.api_key, key), lambda: self._fetch_json(url, parse, key, deadline),
+                           deadline=deadline)
+    
+    def _fetch_json(self, url: str, parse, key: str, deadline: Deadline):
+        """Cuerpo de _get_json (una sola ejecución por clave a la vez)"""
+        cache = get_http_cache()
+        entry = cache.get_response(key)
+        cached = cache.decode_response(entry)
+        if cached is None:
+            entry = None
+        
+        if get_connectivity().is_offline():
+            if cached is None:
+                metrics.inc("cache.api.miss")
+                raise OfflineError(f"Sin conexión y sin caché para {url}")
+            metrics.inc("cache.api.hit")
+            return cached
+        
+        if entry is not None and is_fresh(entry.get('stored'), config.API_CACHE_FRESH_SECONDS):
+            metrics.inc("cache.api.hit")
+            return cached
+        
+        validators = conditional_headers(entry.get('headers')) if entry else {}
+        if validators:
+            metrics.inc("cache.api.revalidations")
+        
+        def read(r):
+            counter = CountingReader(DeadlineReader(r, deadline))
+            stream = open_decoded(r, counter)
+            try:
+                if parse is None:
+                    body = stream.read()
+                    data = json.loads(body.decode())
+                else:
+                    data = parse(stream)
+                    body = json.dumps(data).encode()
+            finally:
+                metrics.inc("net.bytes_downloaded", counter.bytes_read)
+            return data, body, validators_from(r.headers)
+        
+        try:
+            # Authorization y User-Agent se añaden en _make_request; la lectura
+            # del cuerpo va dentro de cada intento (un corte se reintenta)
+            req = urllib.request.Request(url, headers=validators)
+            data, body, headers = self._make_request(req, deadline=deadline, read=read)
+        except Exception as e:
+            if cached is None:
+                raise
+            if isinstance(e, urllib.error.HTTPError) and e.code == 304:
+                # No modificado: renovar la entrada sin transferir el cuerpo
+                cache.touch_response(key)
+                metrics.inc("cache.api.not_modified")
+            metrics.inc("cache.api.hit")
+            return cached
+        
+        metrics.inc("cache.api.miss")
+        if data.get('success'):
+            cache.put_response(key, body, headers)
+        return data
+    
+    def search_game(self, query: str, deadline: Optional[Deadline] = None) -> Optional[Dict]:
         """Busca un juego en SteamGridDB"""
         url = f"{self.base_url}/search/autocomplete/{urllib.parse.quote(query)}"
         try:
-            req = urllib.request.Request(url) # Headers se añaden en _make_request
-            with self._make_request(req) as r:
-                data = json.loads(r.read().decode())
-                if data.get('success') and data.get('data'):
-                    # Retorna el primer resultado
-                    return {
-                        'id': data['data'][0]['id'],
-                        'name': data['data'][0]['name']
-                    }
+            data = self._get_json(url, deadline=deadline)
+            if data.get('success') and data.get('data'):
+                # Retorna el primer resultado
+                return {
+                    'id': data['data'][0]['id'],
+                    'name': data['data'][0]['name']
+                }
         except Exception as e:
             print(f"Error buscando juego: {e}")
         return None
 
-    def search_games(self, query: str) -> List[Dict]:
+    def search_games(self, query: str, deadline: Optional[Deadline] = None) -> List[Dict]:
         """Busca juegos en SteamGridDB y retorna una lista"""
         url = f"{self.base_url}/search/autocomplete/{urllib.parse.quote(query)}"
         try:
-            req = urllib.request.Request(url)
-            with self._make_request(req) as r:
-                data = json.loads(r.read().decode())
-                if data.get('success') and data.get('data'):
-                    return [{
-                        'id': item['id'],
-                        'name': item['name']
-                    } for item in data['data']]
+            data = self._get_json(url, deadline=deadline)
+            if data.get('success') and data.get('data'):
+                return [{
+                    'id': item['id'],
+                    'name': item['name']
+                } for item in data['data']]
         except Exception as e:
             print(f"Error buscando juegos: {e}")
         return []
 
     
-    def get_images(self, game_id: int, image_type: str, runner: str = None, limit: int = 12) -> List[Dict]:
+    def get_images(self, game_id: int, image_type: str, runner: str = None, limit: int = 12,
+                   deadline: Optional[Deadline] = None) -> List[ImageCandidate]:
         """
         Obtiene una lista de imágenes de un juego
         
@@ -131,6 +330,7 @@ class SteamGridDBAPI:
             image_type: 'cover', 'banner' o 'icon'
             runner: Runner del juego (para aplicar filtros Skip Notices)
             limit: Cantidad máxima de resultados
+            deadline: Plazo de la operación (por defecto NET_DEADLINES['api'])
         """
         # Determinar el endpoint según el tipo
         endpoint_map = {
@@ -155,29 +355,34 @@ class SteamGridDBAPI:
         if params:
             url += '?' + '&'.join(params)
         
+        # Aplicar filtro Skip Notices para juegos de Nintendo
+        start_index = 0
+        if runner in config.NINTENDO_RUNNERS:
+            skip_count = config.SKIP_COUNT.get(image_type, 0)
+            start_index = skip_count
+        window = start_index + limit
+        
+        def parse(stream):
+            # Leer solo las primeras `window` imágenes y solo los campos que se usan
+            reader = JSONArrayReader(stream, 'data')
+            items = [{
+                'id': img['id'],
+                'url': img['url'],
+                'thumb': img.get('thumb', img['url'])
+            } for img in itertools.islice(reader, window)]
+            return {'success': reader.fields.get('success', bool(items)), 'data': items}
+        
         try:
-            req = urllib.request.Request(url) # Headers se añaden en _make_request
-            with self._make_request(req) as r:
-                data = json.loads(r.read().decode())
+            data = self._get_json(url, parse=parse, cache_key=f"{url}#first={window}", deadline=deadline)
+            
+            if data.get('success') and data.get('data'):
+                images = []
+                
+                # Tomar imágenes desde el índice calculado
+                for img in data['data'][start_index:start_index + limit]:
+                    images.append(ImageCandidate(img['id'], img['url'], img.get('thumb')))
                 
-                if data.get('success') and data.get('data'):
-                    images = []
-                    
-                    # Aplicar filtro Skip Notices para juegos de Nintendo
-                    start_index = 0
-                    if runner in config.NINTENDO_RUNNERS:
-                        skip_count = config.SKIP_COUNT.get(image_type, 0)
-                        start_index = skip_count
-                    
-                    # Tomar imágenes desde el índice calculado
-                    for img in data['data'][start_index:start_index + limit]:
-                        images.append({
-                            'id': img['id'],
-                            'url': img['url'],
-                            'thumb': img.get('thumb', img['url'])
-                        })
-                    
-                    return images
+                return images
         except Exception as e:
             print(f"Error obteniendo imágenes: {e}")
         
@@ -0,0 +1,81 @@
+"""
+Índice en disco de las imágenes de Lutris (covers, banners e iconos)
+Permite saber qué archivos existen sin abrirlos, usando os.scandir
+"""
+import os
+from typing import Dict, Optional, Tuple
+import config
+
+# Extensión que Lutris usa para cada tipo de imagen
+ART_EXTENSIONS = {
+    'cover': '.jpg',
+    'banner': '.jpg',
+    'icon': '.png'
+}
+
+
+def get_art_directories() -> Dict[str, str]:
+    """Retorna los directorios de imágenes de Lutris por tipo"""
+    return {
+        'cover': config.COVERS_DIR,
+        'banner': config.BANNERS_DIR,
+        'icon': config.LUTRIS_ICONS_DIR
+    }
+
+
+def slug_from_filename(image_type: str, filename: str) -> Optional[str]:
+    """
+    Obtiene el slug a partir del nombre de archivo de una imagen
+
+    Returns:
+        El slug o None si el archivo no corresponde al tipo de imagen
+    """
+    extension = ART_EXTENSIONS.get(image_type)
+    if not extension or not filename.endswith(extension):
+        return None
+    slug = filename[:-len(extension)]
+    return slug or None
+
+
+def scan_art_directory(directory: str, image_type: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Escanea un directorio de imágenes con una sola llamada a os.scandir
+
+    Args:
+        directory: Directorio a escanear
+        image_type: 'cover', 'banner' o 'icon'
+
+    Returns:
+        Dict slug -> (mtime_ns, tamaño) de cada imagen encontrada
+    """
+    entries = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                slug = slug_from_filename(image_type, entry.name)
+                if not slug:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries[slug] = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        pass
+    return entries
+
+
+def scan_all_art(directories: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Tuple[int, int]]]:
+    """
+    Escanea todos los directorios de imágenes
+
+    Returns:
+        Dict tipo -> {slug: (mtime_ns, tamaño)}
+    """
+    if directories is None:
+        directories = get_art_directories()
+    return {
+        image_type: scan_art_directory(directory, image_type)
+        for image_type, directory in directories.items()
+        if directory
+    }
@@ -0,0 +1,242 @@
+"""
+Normalización y recompresión de covers y banners
+Redimensiona al tamaño objetivo, re-codifica con ajustes afinados, elimina
+metadatos y corrige el contenedor (p. ej. PNG guardado con extensión .jpg)
+"""
+import os
+import sys
+import time
+import uuid
+from typing import Callable, Dict, Optional
+from PIL import Image
+import config
+
+# Formato que Lutris espera según la extensión
+FORMATS_BY_EXTENSION = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG'
+}
+
+
+def measure_decode_time(path: str) -> float:
+    """Segundos que tarda Pillow en decodificar completamente una imagen"""
+    start = time.perf_counter()
+    with Image.open(path) as img:
+        img.load()
+    return time.perf_counter() - start
+
+
+def _encode(img: Image.Image, path: str, image_format: str):
+    """Codifica sin metadatos (no se pasan exif ni icc_profile)"""
+    if image_format == 'JPEG':
+        if img.mode not in ('RGB', 'L'):
+            # Aplanar la transparencia sobre negro (fondo de Lutris)
+            background = Image.new('RGB', img.size, (0, 0, 0))
+            rgba = img.convert('RGBA')
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            img = background
+        img.save(path, 'JPEG', quality=config.ART_JPEG_QUALITY,
+                 optimize=True, progressive=True, subsampling='4:2:0')
+    else:
+        img.save(path, 'PNG', optimize=True, compress_level=config.ART_PNG_COMPRESS_LEVEL)
+
+
+def normalize_image(path: str, image_type: str,
+                    before_replace: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Normaliza una imagen en disco (cover o banner)
+
+    El resultado se escribe en un temporal y solo reemplaza al original
+    (de forma atómica) si corrige algo o reduce el tamaño.
+
+    Args:
+        path: Ruta de la imagen
+        image_type: 'cover' o 'banner'
+        before_replace: Función llamada justo antes de reemplazar el archivo
+                        (p. ej. para respaldarlo)
+
+    Returns:
+        Dict con 'changed', 'bytes_before', 'bytes_after' y 'reason'
+    """
+    bytes_before = os.path.getsize(path)
+    result = {'changed': False, 'bytes_before': bytes_before,
+              'bytes_after': bytes_before, 'reason': None}
+
+    extension = os.path.splitext(path)[1].lower()
+    target_format = FORMATS_BY_EXTENSION.get(extension)
+    target_size = config.ART_TARGET_SIZES.get(image_type)
+    if not target_format or not target_size:
+        return result
+
+    with Image.open(path) as img:
+        wrong_container = img.format != target_format
+        too_large = img.width > target_size[0] or img.height > target_size[1]
+        img.load()
+        if too_large:
+            img.thumbnail(target_size, Image.Resampling.LANCZOS)
+
+        tmp = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+        try:
+            _encode(img, tmp, target_format)
+            bytes_after = os.path.getsize(tmp)
+
+            # Sin nada que corregir, solo vale la pena si ahorra espacio
+            if not (wrong_container or too_large) and bytes_after >= bytes_before:
+                return result
+
+            if before_replace:
+                before_replace()
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    if wrong_container:
+        result['reason'] = 'formato'
+    elif too_large:
+        result['reason'] = 'tamaño'
+    else:
+        result['reason'] = 'recompresión'
+    result['changed'] = True
+    result['bytes_after'] = bytes_after
+    return result
+
+
+def normalize_file(path: str, image_type: str, slug: str, job_id: str,
+                   backup_root: Optional[str] = None) -> Dict:
+    """
+    Normaliza un archivo respaldándolo antes y mide la decodificación
+
+    Es una función de módulo para poder ejecutarse en un proceso del
+    ImageProcessingService (solo viajan rutas, no bytes de imagen).
+
+    Returns:
+        El resultado de normalize_image más 'decode_before' y 'decode_after'
+    """
+    from utils.backup_store import BackupStore, get_backup_store
+
+    store = BackupStore(backup_root) if backup_root else get_backup_store()
+    decode_before = measure_decode_time(path)
+    result = normalize_image(
+        path, image_type,
+        before_replace=lambda: store.store(slug, image_type, path, job_id)
+    )
+    result['decode_before'] = decode_before
+    result['decode_after'] = measure_decode_time(path) if result['changed'] else decode_before
+    return result
+
+
+def normalize_library(directories: Optional[Dict[str, str]] = None, job_id: str = None,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      service=None) -> Dict:
+    """
+    Normaliza todos los covers y banners existentes (operación única)
+
+    Cada archivo modificado se respalda antes en el almacén de respaldos,
+    así que todo el trabajo se puede deshacer con rollback_job.
+
+    Args:
+        directories: Dict tipo -> directorio (por defecto, los de config)
+        job_id: Trabajo de respaldo (uno nuevo si es None)
+        progress: Función llamada con (procesados, total)
+        service: ImageProcessingService opcional para usar todos los núcleos
+
+    Returns:
+        Informe con archivos, bytes y tiempos de decodificación antes/después
+    """
+    from utils.art_index import get_art_directories, scan_art_directory
+    from utils.backup_store import get_backup_store, new_job_id
+
+    if directories is None:
+        directories = get_art_directories()
+    if job_id is None:
+        job_id = new_job_id("normalizar")
+    store = get_backup_store()
+
+    files = []
+    for image_type in ('cover', 'banner'):
+        directory = directories.get(image_type)
+        if directory:
+            for slug in scan_art_directory(directory, image_type):
+                files.append((image_type, slug, os.path.join(directory, f"{slug}.jpg")))
+
+    report = {
+        'job': job_id,
+        'files': len(files),
+        'changed': 0,
+        'errors': 0,
+        'bytes_before': 0,
+        'bytes_after': 0,
+        'decode_seconds_before': 0.0,
+        'decode_seconds_after': 0.0,
+        'reasons': {}
+    }
+
+    if service is not None:
+        futures = [
+            service.submit_normalize(path, image_type, slug, job_id, store.root)
+            for image_type, slug, path in files
+        ]
+        outcomes = ((files[i][2], futures[i].result) for i in range(len(files)))
+    else:
+        outcomes = (
+            (path, lambda it=image_type, s=slug, p=path: normalize_file(p, it, s, job_id, store.root))
+            for image_type, slug, path in files
+        )
+
+    for done, (path, get_result) in enumerate(outcomes, start=1):
+        try:
+            result = get_result()
+            report['bytes_before'] += result['bytes_before']
+            report['bytes_after'] += result['bytes_after']
+            report['decode_seconds_before'] += result['decode_before']
+            report['decode_seconds_after'] += result['decode_after']
+            if result['changed']:
+                report['changed'] += 1
+                report['reasons'][result['reason']] = report['reasons'].get(result['reason'], 0) + 1
+        except Exception as e:
+            report['errors'] += 1
+            print(f"⚠️  Error normalizando {path}: {e}")
+
+        if progress:
+            progress(done, len(files))
+
+    return report
+
+
+def print_report(report: Dict):
+    """Imprime el informe de normalize_library"""
+    saved = report['bytes_before'] - report['bytes_after']
+    before_ms = report['decode_seconds_before'] * 1000
+    after_ms = report['decode_seconds_after'] * 1000
+
+    print("\n" + "=" * 60)
+    print("🗜️  NORMALIZACIÓN DE IMÁGENES")
+    print("=" * 60)
+    print(f"Archivos:      {report['files']} ({report['changed']} modificados, {report['errors']} errores)")
+    for reason, count in report['reasons'].items():
+        print(f"  - {reason}: {count}")
+    print(f"Tamaño:        {report['bytes_before'] / 1e6:.1f} MB -> {report['bytes_after'] / 1e6:.1f} MB "
+          f"({saved / 1e6:.1f} MB ahorrados)")
+    print(f"Decodificación: {before_ms:.0f} ms -> {after_ms:.0f} ms en total")
+    print(f"Trabajo:       {report['job']} (se puede deshacer)")
+    print("=" * 60 + "\n")
+
+
+# Uso directo: python3 -m utils.art_normalizer [NATIVO|FLATPAK]
+if __name__ == "__main__":
+    from utils.config_manager import get_config_manager
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else get_config_manager().get_last_installation_mode()
+    config.configure_lutris_paths(mode)
+
+    def show_progress(done, total):
+        print(f"\r   {done}/{total}", end="", flush=True)
+
+    from utils.image_pool import ImageProcessingService
+    service = ImageProcessingService()
+    try:
+        print_report(normalize_library(progress=show_progress, service=service))
+    finally:
+        service.shutdown()
@@ -0,0 +1,68 @@
+"""
+Triage de imágenes faltantes
+Cruza los flags de la base de datos de Lutris con los archivos reales en disco
+"""
+from typing import Dict, List, Optional
+from utils.art_index import scan_all_art
+from utils.models import Game
+
+ART_TYPES = ('cover', 'banner', 'icon')
+
+# Flag de la DB correspondiente a cada tipo (ver LutrisDatabase)
+FLAG_KEYS = {
+    'cover': 'has_cover',
+    'banner': 'has_banner',
+    'icon': 'has_icon'
+}
+
+
+def find_missing_art(games: List[Game], directories: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """
+    Calcula qué juegos no tienen alguna de sus imágenes
+
+    Un solo escaneo por directorio (os.scandir) sustituye a una comprobación
+    de existencia por juego y tipo, así que el coste es lineal en archivos.
+
+    Args:
+        games: Juegos (Game) con sus flags has_cover, has_banner y has_icon
+        directories: Dict tipo -> directorio (por defecto, los de config)
+
+    Returns:
+        Lista de dicts {'game', 'missing', 'stale_flags'} con solo los juegos
+        a los que les falta algo. stale_flags son los tipos que la DB marca
+        como presentes pero no están en disco (Lutris mostrará una imagen rota);
+        esos juegos van primero, y después de más a menos tipos faltantes
+    """
+    on_disk = scan_all_art(directories)
+
+    results = []
+    for game in games:
+        slug = game.slug
+        missing = [t for t in ART_TYPES if slug not in on_disk.get(t, {})]
+        if not missing:
+            continue
+        # Flags activos en la DB cuyo archivo ya no existe
+        stale_flags = [t for t in missing if getattr(game, FLAG_KEYS[t])]
+        results.append({
+            'game': game,
+            'missing': missing,
+            'stale_flags': stale_flags
+        })
+
+    results.sort(key=lambda r: (-len(r['stale_flags']), -len(r['missing']), r['game'].name.lower()))
+    return results
+
+
+def summarize_missing_art(results: List[Dict]) -> Dict[str, int]:
+    """
+    Cuenta cuántos juegos carecen de cada tipo de imagen, y en 'stale'
+    cuántos tienen algún flag en la DB sin su archivo
+    """
+    summary = {t: 0 for t in ART_TYPES}
+    summary['stale'] = 0
+    for result in results:
+        for image_type in result['missing']:
+            summary[image_type] += 1
+        if result['stale_flags']:
+            summary['stale'] += 1
+    return summary
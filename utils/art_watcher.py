@@ -0,0 +1,202 @@
+"""
+Vigilante de los directorios de imágenes de Lutris
+Usa inotify cuando está disponible y, si no, sondeo periódico con os.scandir
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+import config
+from utils.art_index import get_art_directories, scan_art_directory, slug_from_filename
+
+# Constantes de inotify (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_inotify():
+    """Carga las funciones de inotify de la libc, o None si no existen"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class ArtWatcher:
+    """
+    Vigila los directorios de covers, banners e iconos y notifica los
+    cambios agrupados (debounce) como un dict slug -> set de tipos
+    """
+
+    def __init__(self, callback: Callable[[Dict[str, Set[str]]], None],
+                 directories: Optional[Dict[str, str]] = None,
+                 debounce: float = None, poll_interval: float = None):
+        """
+        Args:
+            callback: Función llamada (desde el hilo del vigilante) con los cambios
+            directories: Dict tipo -> directorio (por defecto, los de config)
+            debounce: Segundos de calma antes de notificar
+            poll_interval: Segundos entre escaneos cuando no hay inotify
+        """
+        self.callback = callback
+        self.directories = directories or get_art_directories()
+        self.debounce = config.WATCHER_DEBOUNCE if debounce is None else debounce
+        self.poll_interval = config.WATCHER_POLL_INTERVAL if poll_interval is None else poll_interval
+
+        self.mode = None  # 'inotify' o 'polling'
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._pending = {}
+        self._last_event = 0.0
+
+    def start(self):
+        """Inicia el vigilante en un hilo en segundo plano"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        fd, watches = self._setup_inotify()
+        if fd is not None:
+            self.mode = 'inotify'
+            target = lambda: self._run_inotify(fd, watches)
+        else:
+            self.mode = 'polling'
+            target = self._run_polling
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el vigilante"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    # ------------------------------------------
+    # Registro de cambios con debounce
+    # ------------------------------------------
+
+    def _record(self, image_type: str, filename: str):
+        """Registra un cambio pendiente de notificar"""
+        slug = slug_from_filename(image_type, filename)
+        if slug:
+            self._pending.setdefault(slug, set()).add(image_type)
+            self._last_event = time.monotonic()
+
+    def _flush_if_quiet(self):
+        """Notifica los cambios pendientes si ha pasado el tiempo de debounce"""
+        if not self._pending:
+            return
+        if time.monotonic() - self._last_event < self.debounce:
+            return
+
+        changes, self._pending = self._pending, {}
+        try:
+            self.callback(changes)
+        except Exception as e:
+            print(f"⚠️  Error notificando cambios de imágenes: {e}")
+
+    # ------------------------------------------
+    # Backend inotify
+    # ------------------------------------------
+
+    def _setup_inotify(self):
+        """Crea el descriptor de inotify y los watches, o (None, None) si falla"""
+        libc = _load_inotify()
+        if libc is None:
+            return None, None
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None, None
+
+        watches = {}
+        for image_type, directory in self.directories.items():
+            if not directory or not os.path.isdir(directory):
+                continue
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                watches[wd] = image_type
+
+        if not watches:
+            os.close(fd)
+            return None, None
+        return fd, watches
+
+    def _run_inotify(self, fd, watches):
+        """Bucle principal leyendo eventos de inotify"""
+        try:
+            while not self._stop_event.is_set():
+                timeout = self.debounce if self._pending else 0.5
+                readable, _, _ = select.select([fd], [], [], timeout)
+                if readable:
+                    try:
+                        data = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        data = b''
+                    self._parse_events(data, watches)
+                self._flush_if_quiet()
+        finally:
+            os.close(fd)
+
+    def _parse_events(self, data: bytes, watches):
+        """Decodifica un bloque de eventos de inotify"""
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Se perdieron eventos: marcar todo lo que hay en disco
+                for image_type, directory in self.directories.items():
+                    for slug in scan_art_directory(directory, image_type):
+                        self._pending.setdefault(slug, set()).add(image_type)
+                self._last_event = time.monotonic()
+                continue
+
+            image_type = watches.get(wd)
+            if image_type and name:
+                self._record(image_type, os.fsdecode(name))
+
+    # ------------------------------------------
+    # Backend de sondeo (fallback)
+    # ------------------------------------------
+
+    def _run_polling(self):
+        """Bucle de sondeo comparando instantáneas de os.scandir"""
+        snapshots = {
+            image_type: scan_art_directory(directory, image_type)
+            for image_type, directory in self.directories.items()
+        }
+
+        while not self._stop_event.wait(self.poll_interval):
+            for image_type, directory in self.directories.items():
+                current = scan_art_directory(directory, image_type)
+                previous = snapshots[image_type]
+                for slug in current.keys() | previous.keys():
+                    if current.get(slug) != previous.get(slug):
+                        self._pending.setdefault(slug, set()).add(image_type)
+                snapshots[image_type] = current
+            # Un intervalo de sondeo ya agrupa los cambios
+            self._last_event = 0.0
+            self._flush_if_quiet()
@@ -0,0 +1,336 @@
+"""
+Almacén de respaldos direccionado por contenido para las imágenes reemplazadas
+Cada archivo sobrescrito se guarda una sola vez (por su SHA-256) y un diario
+registra qué blob corresponde a cada slug/tipo para poder deshacer cambios.
+Deshacer también respalda lo que sobrescribe y deja una marca 'undo' en el
+diario, así que se puede rehacer y no se deshace dos veces lo mismo.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+import config
+
+# ioctl FICLONE de Linux (reflink en Btrfs/XFS)
+FICLONE = 0x40049409
+
+
+def new_job_id(label: str = "cambio") -> str:
+    """Genera un identificador de trabajo ordenable por fecha"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{uuid.uuid4().hex[:6]}"
+
+
+def _file_sha256(path: str) -> str:
+    """Calcula el SHA-256 de un archivo leyéndolo por bloques"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Intenta clonar src en dst compartiendo bloques (reflink). True si funcionó"""
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except (OSError, AttributeError):
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def clone_file(src: str, dst: str, allow_hardlink: bool = True) -> str:
+    """
+    Coloca una copia de src en dst usando el método más barato disponible
+
+    Args:
+        src: Archivo origen
+        dst: Destino (se reemplaza de forma atómica)
+        allow_hardlink: Si es False solo se usa reflink o copia completa
+                        (necesario cuando el destino podría modificarse en el sitio)
+
+    Returns:
+        'hardlink', 'reflink' o 'copy'
+    """
+    tmp = f"{dst}.tmp-{uuid.uuid4().hex[:8]}"
+    method = 'copy'
+    try:
+        if allow_hardlink:
+            try:
+                os.link(src, tmp)
+                method = 'hardlink'
+            except OSError:
+                pass
+        if method == 'copy':
+            if _reflink(src, tmp):
+                method = 'reflink'
+            else:
+                shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return method
+
+
+class BackupStore:
+    """Blobs deduplicados por contenido más un diario JSONL de reemplazos"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(config.CACHE_DIR, "backups")
+        self.blobs_dir = os.path.join(self.root, "blobs")
+        self.journal_path = os.path.join(self.root, "journal.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def store(self, slug: str, image_type: str, path: str, job_id: str) -> Optional[str]:
+        """
+        Respalda el archivo actual antes de sobrescribirlo
+
+        Si el archivo no existe también se anota, para que deshacer el
+        trabajo elimine la imagen que se cree después.
+
+        Args:
+            slug: Identificador del juego
+            image_type: Clave de la ruta ('cover', 'banner', 'icon_lutris', ...)
+            path: Ruta del archivo que se va a reemplazar
+            job_id: Trabajo al que pertenece el reemplazo
+
+        Returns:
+            El hash del blob guardado o None si no había archivo
+        """
+        digest = None
+        if os.path.exists(path):
+            digest = _file_sha256(path)
+            blob = self._blob_path(digest)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                # El original se elimina justo después, así que un hardlink es seguro
+                clone_file(path, blob, allow_hardlink=True)
+
+        self._append({
+            'job': job_id,
+            'slug': slug,
+            'type': image_type,
+            'path': path,
+            'blob': digest,
+            'time': time.time()
+        })
+        return digest
+
+    def _append(self, entry: Dict):
+        """Añade una entrada al diario"""
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.journal_path, 'a') as f:
+                f.write(line)
+
+    def read_journal(self) -> List[Dict]:
+        """Lee todas las entradas del diario (las líneas corruptas se ignoran)"""
+        entries = []
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    @staticmethod
+    def _undone(entries: List[Dict]) -> set:
+        """
+        Pares (trabajo, slug) ya deshechos según las marcas 'undo' del diario
+
+        Deshacer un deshacer (rehacer) vuelve a dejar vigente el trabajo original.
+        """
+        undone = set()
+        undoes = {}  # trabajo de deshacer -> trabajo que deshizo
+        for entry in entries:
+            if entry.get('kind') != 'undo':
+                continue
+            undoes[entry['job']] = entry['undoes']
+            for slug in entry['slugs']:
+                undone.add((entry['undoes'], slug))
+                if entry['undoes'] in undoes:
+                    undone.discard((undoes[entry['undoes']], slug))
+        return undone
+
+    def list_jobs(self, include_undo: bool = False) -> List[Dict]:
+        """
+        Retorna los trabajos vigentes, del más reciente al más antiguo
+
+        Los juegos ya deshechos no cuentan y un trabajo sin juegos vigentes no
+        aparece. Los propios deshacer solo se listan con include_undo (rehacer).
+        """
+        entries = self.read_journal()
+        undone = self._undone(entries)
+        undo_jobs = {e['job'] for e in entries if e.get('kind') == 'undo'}
+        jobs = {}
+        for entry in entries:
+            if entry.get('kind') == 'undo' or (entry['job'], entry['slug']) in undone:
+                continue
+            if entry['job'] in undo_jobs and not include_undo:
+                continue
+            job = jobs.setdefault(entry['job'], {'job': entry['job'], 'time': entry['time'], 'slugs': set()})
+            job['time'] = max(job['time'], entry['time'])
+            job['slugs'].add(entry['slug'])
+        return sorted(jobs.values(), key=lambda j: j['time'], reverse=True)
+
+    def has_backup(self, slug: str) -> bool:
+        """Indica si hay algo que restaurar para un juego"""
+        return any(slug in job['slugs'] for job in self.list_jobs())
+
+    def _restore(self, entry: Dict) -> bool:
+        """Devuelve un archivo al estado registrado en una entrada"""
+        path = entry['path']
+        try:
+            if entry['blob'] is None:
+                # La imagen no existía antes del cambio
+                if os.path.exists(path):
+                    os.remove(path)
+                return True
+
+            blob = self._blob_path(entry['blob'])
+            if not os.path.exists(blob):
+                print(f"⚠️  Respaldo perdido para {entry['slug']} ({entry['type']})")
+                return False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Nunca hardlink al restaurar: Lutris podría reescribir el archivo en el sitio
+            clone_file(blob, path, allow_hardlink=False)
+            return True
+        except OSError as e:
+            print(f"❌ Error restaurando {path}: {e}")
+            return False
+
+    def _undo(self, job_id: str, slugs: Optional[set] = None) -> int:
+        """
+        Restaura el estado previo a un trabajo (o solo a algunos de sus juegos)
+
+        Los archivos actuales se respaldan antes en un trabajo de deshacer
+        propio, y una marca en el diario deja esos juegos como deshechos.
+        """
+        entries = self.read_journal()
+        undone = self._undone(entries)
+        # La primera entrada de cada ruta dentro del trabajo es el estado original
+        first = {}
+        for entry in entries:
+            if (entry.get('kind') == 'undo' or entry['job'] != job_id
+                    or (job_id, entry['slug']) in undone
+                    or (slugs is not None and entry['slug'] not in slugs)):
+                continue
+            first.setdefault(entry['path'], entry)
+        if not first:
+            return 0
+
+        undo_id = new_job_id("deshacer")
+        restored = 0
+        for entry in first.values():
+            try:
+                self.store(entry['slug'], entry['type'], entry['path'], undo_id)
+            except OSError as e:
+                print(f"❌ No se pudo respaldar {entry['path']} antes de restaurarlo: {e}")
+                continue
+            if self._restore(entry):
+                restored += 1
+        self._append({
+            'kind': 'undo',
+            'job': undo_id,
+            'undoes': job_id,
+            'slugs': sorted({entry['slug'] for entry in first.values()}),
+            'time': time.time()
+        })
+        return restored
+
+    def rollback_job(self, job_id: str) -> int:
+        """
+        Deshace un trabajo completo restaurando el estado previo a él
+        (con un trabajo de deshacer, list_jobs(include_undo=True), equivale a rehacer)
+
+        Returns:
+            Cantidad de archivos restaurados
+        """
+        return self._undo(job_id)
+
+    def rollback_slug(self, slug: str) -> int:
+        """
+        Deshace el último trabajo vigente que modificó un juego
+
+        Returns:
+            Cantidad de archivos restaurados
+        """
+        for job in self.list_jobs():
+            if slug in job['slugs']:
+                return self._undo(job['job'], {slug})
+        return 0
+
+    def prune(self, keep_jobs: Optional[int] = None, keep_days: Optional[float] = None) -> int:
+        """
+        Olvida los trabajos antiguos y borra los blobs que ya nadie referencia
+
+        Se conservan los keep_jobs trabajos más recientes y cualquiera de los
+        últimos keep_days días (por defecto config.BACKUP_KEEP_JOBS / BACKUP_KEEP_DAYS).
+
+        Returns:
+            Cantidad de blobs eliminados
+        """
+        keep_jobs = config.BACKUP_KEEP_JOBS if keep_jobs is None else keep_jobs
+        keep_days = config.BACKUP_KEEP_DAYS if keep_days is None else keep_days
+        cutoff = time.time() - keep_days * 86400
+
+        with self._lock:
+            entries = self.read_journal()
+            last_seen = {}
+            for entry in entries:
+                last_seen[entry['job']] = max(last_seen.get(entry['job'], 0), entry['time'])
+            newest = sorted(last_seen, key=last_seen.get, reverse=True)
+            kept = set(newest[:keep_jobs]) | {job for job, t in last_seen.items() if t >= cutoff}
+            kept_entries = [e for e in entries if e['job'] in kept]
+
+            if len(kept_entries) != len(entries):
+                tmp = f"{self.journal_path}.tmp-{uuid.uuid4().hex[:8]}"
+                with open(tmp, 'w') as f:
+                    f.writelines(json.dumps(entry) + "\n" for entry in kept_entries)
+                os.replace(tmp, self.journal_path)
+
+            referenced = {e['blob'] for e in kept_entries if e.get('blob')}
+            removed = 0
+            for dirpath, _, filenames in os.walk(self.blobs_dir):
+                for name in filenames:
+                    if name in referenced:
+                        continue
+                    try:
+                        os.remove(os.path.join(dirpath, name))
+                        removed += 1
+                    except OSError:
+                        pass
+        if removed:
+            print(f"🧹 Respaldos antiguos eliminados: {removed}")
+        return removed
+
+
+# Instancia global del almacén de respaldos
+_backup_store = None
+
+def get_backup_store():
+    """Obtiene la instancia global del almacén de respaldos"""
+    global _backup_store
+    if _backup_store is None:
+        _backup_store = BackupStore()
+        try:
+            _backup_store.prune()
+        except OSError as e:
+            print(f"⚠️  No se pudieron limpiar los respaldos antiguos: {e}")
+    return _backup_store
@@ -0,0 +1,297 @@
+"""
+Acciones masivas sobre varios juegos seleccionados
+Cada juego avanza por etapas encadenadas en trabajadores acotados:
+
+    'best_art'  buscar en SteamGridDB (si hace falta) -> elegir la mejor imagen
+                de cada tipo -> descargarlas
+    'resolve'   volver a buscar el juego en SteamGridDB
+    'reencode'  recomprimir cover y banner existentes en el pool de procesos
+
+Las búsquedas se agrupan por nombre normalizado (una por grupo, ver
+utils.name_resolver). Búsquedas y descargas van al planificador de red como
+BULK (ceden el turno a lo interactivo): las consultas a la API en el carril
+'api' y solo los bytes de las imágenes en 'images'. La recompresión va al
+ImageProcessingService (repartida desde el planificador, nunca desde el hilo
+de Tk). Al terminar se hace una sola transacción en la base de datos y se
+llama una vez a on_done.
+
+Ejemplo:
+    job = BulkJob('best_art', games, api, image_manager, db,
+                  on_progress=lambda slug, status, detail: ...,
+                  on_done=lambda summary: ...)
+    job.start()
+    ...
+    job.cancel()
+"""
+import threading
+from typing import Callable, Dict, List, Optional
+from utils.backup_store import new_job_id
+from utils.name_resolver import NameResolver
+from utils.scheduler import get_scheduler, when_all, BULK
+
+IMAGE_TYPES = ('cover', 'banner', 'icon')
+
+# Acciones disponibles -> nombre para la interfaz
+ACTIONS = {
+    'best_art': "Aplicar la mejor imagen",
+    'resolve': "Volver a buscar en SteamGridDB",
+    'reencode': "Recomprimir imágenes",
+}
+
+# Estados de cada juego
+PENDING = 'pending'
+SEARCHING = 'searching'
+DOWNLOADING = 'downloading'
+ENCODING = 'encoding'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class BulkJob:
+    def __init__(self, action: str, games: List, api, image_manager, db,
+                 types=IMAGE_TYPES, matches: Optional[Dict] = None,
+                 resolver: Optional[NameResolver] = None,
+                 on_progress: Optional[Callable[[str, str, str], None]] = None,
+                 on_done: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            action: 'best_art', 'resolve' o 'reencode'
+            games: Juegos (Game) sobre los que actuar
+            api: Instancia de SteamGridDBAPI
+            image_manager: Instancia de ImageManager
+            db: Instancia de LutrisDatabase
+            types: Tipos de imagen para 'best_art', o dict slug -> tipos
+                   para pedir tipos distintos por juego (p. ej. solo los que faltan)
+            matches: Dict slug -> resultado de búsqueda, compartido con quien llama
+                     (se reutiliza y se actualiza)
+            resolver: NameResolver a usar (uno nuevo si es None)
+            on_progress: on_progress(slug, estado, detalle) desde cualquier hilo
+            on_done: on_done(resumen) una sola vez al terminar, desde cualquier hilo
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Acción desconocida: {action}")
+        self.action = action
+        self.games = list(games)
+        self.api = api
+        self.image_manager = image_manager
+        self.db = db
+        self.types = dict(types) if isinstance(types, dict) else tuple(types)
+        self.matches = matches if matches is not None else {}
+        self.resolver = resolver or NameResolver(api)
+        self.on_progress = on_progress
+        self.on_done = on_done
+
+        self.job_id = new_job_id(action)
+        self.status = {game.slug: PENDING for game in self.games}
+        self.updated = []  # juegos con imágenes nuevas (para la transacción final)
+        self.cancelled = False
+        self._futures = set()
+        self._service = None
+        self._lock = threading.Lock()
+        self._remaining = len(self.games)
+
+    # ------------------------------------------
+    # Control
+    # ------------------------------------------
+
+    def start(self):
+        """Encola la primera etapa de cada juego y vuelve enseguida"""
+        if not self.games:
+            self._complete()
+            return
+        to_search = []
+        for game in self.games:
+            if self.action == 'reencode':
+                self._reencode(game)
+            elif self.action == 'best_art' and game.slug in self.matches:
+                self._download(game, self.matches[game.slug])
+            else:
+                to_search.append(game)
+
+        # Una búsqueda por grupo de variantes del mismo juego
+        for key, members in NameResolver.group(to_search).items():
+            self._stage(members, SEARCHING, self.resolver.resolve_group,
+                        (key, [game.name for game in members]), 'api', self._after_search)
+
+    def cancel(self):
+        """Cancela lo que aún no empezó; lo que está en curso termina su etapa y se detiene"""
+        with self._lock:
+            self.cancelled = True
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+
+    def counts(self) -> Dict[str, int]:
+        """Juegos por estado"""
+        with self._lock:
+            counts = {}
+            for status in self.status.values():
+                counts[status] = counts.get(status, 0) + 1
+            return counts
+
+    # ------------------------------------------
+    # Etapas
+    # ------------------------------------------
+
+    def _stage(self, games, status, fn, args, lane, then):
+        """
+        Encola fn(*args) como trabajo masivo y encadena then(game, resultado)
+        para cada juego de la etapa (uno, o un grupo que comparte búsqueda)
+        """
+        if not isinstance(games, list):
+            games = [games]
+        if self.cancelled:
+            for game in games:
+                self._finish(game, CANCELLED)
+            return
+        for game in games:
+            self._report(game, status)
+        future = get_scheduler().submit(fn, *args, lane=lane, priority=BULK)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(lambda f: self._stage_done(games, f, then))
+
+    def _stage_done(self, games, future, then):
+        with self._lock:
+            self._futures.discard(future)
+        for game in games:
+            # Una etapa que llegó a ejecutarse cuenta aunque se cancele después;
+            # la siguiente ya no se encola (ver _stage)
+            if future.cancelled():
+                self._finish(game, CANCELLED)
+                continue
+            error = future.exception()
+            if error is not None:
+                self._finish(game, FAILED, str(error))
+                continue
+            try:
+                then(game, future.result())
+            except Exception as e:
+                self._finish(game, FAILED, str(e))
+
+    def _after_search(self, game, match):
+        if not match:
+            self._finish(game, FAILED, "no está en SteamGridDB")
+            return
+        self.matches[game.slug] = match
+        if self.action == 'resolve':
+            self._finish(game, DONE, f"{match['name']} (#{match['id']})")
+        else:
+            self._download(game, match)
+
+    def _download(self, game, match):
+        # Las URLs salen de la API; solo los bytes van al carril de imágenes
+        self._stage(game, SEARCHING, self.image_manager.best_image_urls,
+                    (match['id'], self.api, self._types_for(game)), 'api', self._after_lookup)
+
+    def _types_for(self, game):
+        if isinstance(self.types, dict):
+            return tuple(self.types.get(game.slug, IMAGE_TYPES))
+        return self.types
+
+    def _after_lookup(self, game, urls):
+        if not urls:
+            self._finish(game, FAILED, "sin imágenes en SteamGridDB")
+            return
+        self._stage(game, DOWNLOADING, self.image_manager.apply_images,
+                    (game.slug, urls, self.job_id), 'images', self._after_download)
+
+    def _after_download(self, game, results):
+        updated = [image_type for image_type, ok in results.items() if ok]
+        if not updated:
+            self._finish(game, FAILED, "sin imágenes nuevas")
+            return
+        with self._lock:
+            self.updated.append(game)
+        self._finish(game, DONE, ", ".join(updated))
+
+    def _reencode(self, game):
+        # Preparar y repartir al pool no va en el hilo que llama (el de Tk):
+        # es una etapa más del planificador, en el carril de imágenes
+        self._stage(game, ENCODING, self._submit_reencode, (game,), 'images', self._after_reencode_submit)
+
+    def _submit_reencode(self, game) -> Dict:
+        """Manda cover y banner existentes al pool (los iconos ya se generan a su tamaño)"""
+        paths = self.image_manager.get_image_paths(game.slug)
+        existing = [t for t in ('cover', 'banner') if self.image_manager.image_exists(game.slug, t)]
+        if not existing:
+            return {}
+        service = self._image_service()
+        backup_root = self.image_manager.backup_store.root
+        return {t: service.submit_normalize(paths[t], t, game.slug, self.job_id, backup_root)
+                for t in existing}
+
+    def _after_reencode_submit(self, game, futures):
+        if not futures:
+            self._finish(game, DONE, "sin cover ni banner")
+            return
+        with self._lock:
+            self._futures.update(futures.values())
+            cancelled = self.cancelled
+        if cancelled:
+            # cancel() llegó mientras se repartía: lo que aún no empezó no se hace
+            for future in futures.values():
+                future.cancel()
+
+        def done(_):
+            with self._lock:
+                self._futures.difference_update(futures.values())
+            saved, errors = 0, 0
+            for future in futures.values():
+                if future.cancelled() or future.exception() is not None:
+                    errors += 1
+                else:
+                    result = future.result()
+                    saved += result['bytes_before'] - result['bytes_after']
+            if self.cancelled and errors:
+                self._finish(game, CANCELLED)
+            elif errors:
+                self._finish(game, FAILED, f"{errors} sin recomprimir")
+            else:
+                self._finish(game, DONE, f"{saved / 1024:.0f} KB ahorrados")
+
+        when_all(futures.values(), done)
+
+    def _image_service(self):
+        with self._lock:
+            if self._service is None:
+                from utils.image_pool import ImageProcessingService
+                self._service = ImageProcessingService(self.image_manager)
+            return self._service
+
+    # ------------------------------------------
+    # Progreso y cierre
+    # ------------------------------------------
+
+    def _report(self, game, status, detail: str = ""):
+        with self._lock:
+            self.status[game.slug] = status
+        if self.on_progress:
+            self.on_progress(game.slug, status, detail)
+
+    def _finish(self, game, status, detail: str = ""):
+        self._report(game, status, detail)
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+        if last:
+            self._complete()
+
+    def _complete(self):
+        """Una sola transacción con todos los juegos actualizados y un único aviso"""
+        if self.updated:
+            try:
+                self.db.update_games_images([(game.id, game.name) for game in self.updated])
+            except Exception as e:
+                print(f"Error guardando el lote en la base de datos: {e}")
+        if self._service is not None:
+            self._service.shutdown(wait=False)
+
+        if self.on_done:
+            summary = self.counts()
+            summary['updated'] = [game.slug for game in self.updated]
+            summary['job_id'] = self.job_id
+            self.on_done(summary)
@@ -0,0 +1,184 @@
+"""
+Cortacircuitos por host y presupuesto global de reintentos
+Cuando SteamGridDB (o un proxy/WAF delante) empieza a responder 403, 5xx o
+a cortar conexiones, el cortacircuitos de ese host se abre y las
+peticiones fallan al instante en vez de reintentar con esperas. Pasado el
+enfriamiento deja pasar una sola petición de prueba (semiabierto): si sale
+bien se cierra y si no vuelve a abrirse.
+
+El presupuesto de reintentos limita los reintentos a una fracción de las
+peticiones de toda la aplicación, así que un lote masivo no multiplica el
+tráfico contra un servidor que ya está fallando.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+import config
+from utils import metrics
+
+CLOSED = 'cerrado'
+OPEN = 'abierto'
+HALF_OPEN = 'semiabierto'
+
+
+class CircuitOpenError(Exception):
+    """El cortacircuitos del host está abierto: la petición no se intentó"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} bloqueado temporalmente (reintento en {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(self, host: str, failure_threshold: Optional[int] = None,
+                 cooldown: Optional[float] = None):
+        """
+        Args:
+            host: Host al que se aplica
+            failure_threshold: Fallos seguidos que abren el circuito
+            cooldown: Segundos abierto antes de dejar pasar una prueba
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURE_THRESHOLD
+        self.cooldown = cooldown or config.BREAKER_COOLDOWN
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Indica si se puede intentar una petición ahora"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self._set_state(HALF_OPEN)
+            # Semiabierto: una sola petición de prueba a la vez
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def release(self):
+        """
+        Libera la prueba en curso sin cambiar el estado: la petición terminó
+        sin decir nada del host (p. ej. se agotó nuestro plazo)
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        """Segundos que faltan para la próxima prueba (0 si no está abierto)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def _set_state(self, state: str):
+        # Se llama con el lock tomado
+        previous, self.state = self.state, state
+        metrics.inc(f"breaker.{state}")
+        if state == OPEN and previous == CLOSED:
+            print(f"⛔ {self.host}: demasiados fallos, se pausan las peticiones {self.cooldown:.0f}s")
+        elif state == CLOSED:
+            print(f"✅ {self.host}: peticiones reanudadas")
+        _notify(self.host, state)
+
+
+class RetryBudget:
+    """
+    Cubeta de fichas compartida: cada petición suma `ratio` fichas y cada
+    reintento gasta una. Siempre se permite un mínimo por segundo para no
+    quedarse sin reintentos tras un rato de inactividad.
+    """
+
+    def __init__(self, ratio: Optional[float] = None, min_per_second: Optional[float] = None,
+                 max_tokens: float = 10.0):
+        self.ratio = config.RETRY_BUDGET_RATIO if ratio is None else ratio
+        self.min_per_second = config.RETRY_BUDGET_MIN_PER_SECOND if min_per_second is None else min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._last) * self.min_per_second)
+        self._last = now
+
+    def record_request(self):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_retry(self) -> bool:
+        """Gasta una ficha si hay; False si el presupuesto está agotado"""
+        with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+# ==========================================
+# Instancias globales
+# ==========================================
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_listeners = []
+_retry_budget = None
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    """Cortacircuitos compartido de un host"""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def all_breakers() -> Dict[str, CircuitBreaker]:
+    with _breakers_lock:
+        return dict(_breakers)
+
+
+def add_listener(callback: Callable[[str, str], None]):
+    """callback(host, estado) se llama (desde cualquier hilo) al cambiar un cortacircuitos"""
+    _listeners.append(callback)
+
+
+def _notify(host: str, state: str):
+    for callback in list(_listeners):
+        try:
+            callback(host, state)
+        except Exception as e:
+            print(f"Error notificando el cortacircuitos: {e}")
+
+
+def get_retry_budget() -> RetryBudget:
+    """Presupuesto de reintentos global"""
+    global _retry_budget
+    if _retry_budget is None:
+        _retry_budget = RetryBudget()
+    return _retry_budget
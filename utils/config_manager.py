@@ -2,18 +2,36 @@
 Gestor de configuración persistente para Lutris Visual Manager
 Guarda la configuración del usuario en ~/.config/lutris-visual-manager/
 """
+import atexit
 import os
 import json
+import tempfile
+import threading
 from pathlib import Path
 
+# Segundos que se agrupan los cambios antes de escribir el archivo
+SAVE_DELAY = 0.5
+
 class ConfigManager:
-    def __init__(self):
+    def __init__(self, config_dir=None, save_delay=SAVE_DELAY):
+        """
+        Args:
+            config_dir: Directorio de configuración (por defecto el de XDG)
+            save_delay: Ventana en segundos para agrupar escrituras
+        """
         # Directorio de configuración siguiendo el estándar XDG
-        self.config_dir = Path.home() / ".config" / "lutris-visual-manager"
+        self.config_dir = Path(config_dir) if config_dir else Path.home() / ".config" / "lutris-visual-manager"
         self.config_file = self.config_dir / "config.json"
+        self.save_delay = save_delay
         
         # Crear directorio si no existe
-        self.config_dir.mkdir(parents=True, exist_ok=True)
+        self.config_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+        
+        # Escritura diferida: el último estado serializado espera en _pending
+        self._lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+        atexit.register(self.flush)
         
         # Cargar configuración
         self.config = self._load_config()
@@ -29,18 +47,68 @@ class ConfigManager:
                 return {}
         return {}
     
-    def _save_config(self):
-        """Guarda la configuración en el archivo"""
+    def _save_config(self, immediate=False):
+        """
+        Programa el guardado de la configuración
+        
+        Los cambios hechos dentro de save_delay se agrupan en una sola escritura.
+        Con immediate=True (API Key) se escribe ya y se informa el resultado.
+        """
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=4)
-            
-            # Establecer permisos restrictivos (solo el usuario puede leer/escribir)
-            os.chmod(self.config_file, 0o600)
-            return True
+            data = json.dumps(self.config, indent=4)
         except Exception as e:
             print(f"❌ Error al guardar configuración: {e}")
             return False
+        
+        with self._lock:
+            self._pending = data
+            if not immediate:
+                # Si ya hay una escritura programada, se llevará este estado
+                if self._timer is None:
+                    self._timer = threading.Timer(self.save_delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return True
+        return self.flush()
+    
+    def flush(self):
+        """Escribe ya los cambios pendientes (se llama también al salir)"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            data, self._pending = self._pending, None
+            if data is None:
+                return True
+            try:
+                self._write_atomic(data)
+                return True
+            except Exception as e:
+                print(f"❌ Error al guardar configuración: {e}")
+                return False
+    
+    def _write_atomic(self, data):
+        """Archivo temporal (0600 desde su creación) + fsync + os.replace"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix=".config.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        
+        # Persistir también la entrada del directorio
+        dir_fd = os.open(self.config_dir, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
     
     def get_api_key(self):
         """Obtiene el API Key guardado"""
@@ -49,13 +117,13 @@ class ConfigManager:
     def set_api_key(self, api_key):
         """Guarda el API Key"""
         self.config['steamgriddb_api_key'] = api_key
-        return self._save_config()
+        return self._save_config(immediate=True)
     
     def clear_api_key(self):
         """Elimina el API Key guardado"""
         if 'steamgriddb_api_key' in self.config:
             del self.config['steamgriddb_api_key']
-            return self._save_config()
+            return self._save_config(immediate=True)
         return True
     
     def get_last_installation_mode(self):
@@ -67,6 +135,16 @@ class ConfigManager:
         self.config['last_installation_mode'] = mode
         return self._save_config()
     
+    def get_normalize_art(self):
+        """Indica si se normalizan/recomprimen las imágenes descargadas"""
+        import config
+        return self.config.get('normalize_art', config.ART_NORMALIZE_DEFAULT)
+    
+    def set_normalize_art(self, enabled):
+        """Activa o desactiva la normalización de imágenes descargadas"""
+        self.config['normalize_art'] = bool(enabled)
+        return self._save_config()
+    
     def get_window_geometry(self, window_name):
         """Obtiene la geometría guardada de una ventana"""
         geometries = self.config.get('window_geometries', {})
@@ -86,7 +164,7 @@ class ConfigManager:
     def reset_config(self):
         """Resetea toda la configuración"""
         self.config = {}
-        return self._save_config()
+        return self._save_config(immediate=True)
 
 
 # Instancia global del gestor de configuración
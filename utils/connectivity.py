@@ -0,0 +1,127 @@
+"""
+Detección de conectividad y modo sin conexión
+Una petición HEAD rápida a la API (por los mismos proxies que el resto de
+peticiones, ver HTTP(S)_PROXY / no_proxy) decide si se usan solo las
+cachés locales. Estando sin conexión nunca se bloquea en sockets: la
+comprobación para volver a estar en línea corre en segundo plano.
+"""
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Callable, Optional
+import config
+
+
+class OfflineError(Exception):
+    """La operación necesita red y la aplicación está sin conexión"""
+
+
+class ConnectivityMonitor:
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None,
+                 recheck_interval: Optional[float] = None, forced_offline: Optional[bool] = None):
+        """
+        Args:
+            base_url: URL cuyo host se sondea (por defecto la de la API)
+            timeout: Tiempo máximo de la sonda
+            recheck_interval: Segundos entre sondas estando sin conexión
+            forced_offline: Modo sin conexión explícito (no se sondea)
+        """
+        self.url = base_url or config.STEAMGRIDDB_BASE_URL
+        self.host = urllib.parse.urlparse(self.url).hostname
+        self.timeout = timeout or config.CONNECTIVITY_PROBE_TIMEOUT
+        self.recheck_interval = recheck_interval or config.OFFLINE_RECHECK_INTERVAL
+        self.forced = config.OFFLINE_MODE if forced_offline is None else forced_offline
+        self.offline = self.forced
+        self.last_probe = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback: Callable[[bool], None]):
+        """callback(offline) se llama (desde cualquier hilo) al cambiar el estado"""
+        self._listeners.append(callback)
+
+    def _set_offline(self, offline: bool):
+        changed = offline != self.offline
+        self.offline = offline
+        if changed:
+            print("📴 Sin conexión: se usarán solo las cachés locales" if offline else "📶 Conexión recuperada")
+            for callback in list(self._listeners):
+                try:
+                    callback(offline)
+                except Exception as e:
+                    print(f"Error notificando conectividad: {e}")
+
+    def probe(self) -> bool:
+        """Sonda HTTP síncrona (como mucho timeout segundos); retorna True si hay conexión"""
+        if self.forced:
+            return False
+        self.last_probe = time.monotonic()
+        # Import tardío: utils.api importa este módulo
+        from utils.api import get_ssl_context
+        req = urllib.request.Request(self.url, method='HEAD', headers={'User-Agent': 'Mozilla/5.0'})
+        try:
+            # urlopen usa los proxies del entorno igual que las peticiones normales
+            with urllib.request.urlopen(req, timeout=self.timeout, context=get_ssl_context()):
+                online = True
+        except urllib.error.HTTPError:
+            # Cualquier respuesta HTTP (401, 404, 5xx...) significa que hay red
+            online = True
+        except (urllib.error.URLError, OSError):
+            online = False
+        self._set_offline(not online)
+        return online
+
+    def probe_async(self):
+        """Lanza la sonda en segundo plano (una a la vez)"""
+        with self._lock:
+            if self._probing or self.forced:
+                return
+            self._probing = True
+
+        def run():
+            try:
+                self.probe()
+            finally:
+                self._probing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def is_offline(self) -> bool:
+        """Estado actual; sin conexión, reprograma la sonda cada recheck_interval"""
+        if self.offline and not self.forced and time.monotonic() - self.last_probe > self.recheck_interval:
+            self.probe_async()
+        return self.offline
+
+    def report_failure(self) -> bool:
+        """
+        Informa un error de conexión; sondea para decidir si seguir reintentando
+
+        Returns:
+            True si se entró (o ya se estaba) en modo sin conexión
+        """
+        if self.offline:
+            return True
+        return not self.probe()
+
+    def set_forced_offline(self, forced: bool):
+        """Activa o desactiva el modo sin conexión explícito"""
+        self.forced = forced
+        if forced:
+            self._set_offline(True)
+        else:
+            self.last_probe = 0.0
+            self.probe_async()
+
+
+# Instancia global
+_monitor = None
+
+def get_connectivity() -> ConnectivityMonitor:
+    """Obtiene el monitor de conectividad global"""
+    global _monitor
+    if _monitor is None:
+        _monitor = ConnectivityMonitor()
+    return _monitor
@@ -2,8 +2,10 @@
 Módulo para interactuar con la base de datos de Lutris
 """
 import sqlite3
-from typing import List, Dict, Optional
+from typing import List, Optional
 import config
+from utils import tracing
+from utils.models import Game
 
 class LutrisDatabase:
     def __init__(self):
@@ -13,6 +15,7 @@ class LutrisDatabase:
         """Crea una conexión a la base de datos"""
         return sqlite3.connect(self.db_path)
     
+    @tracing.traced("db.get_runners")
     def get_runners(self) -> List[str]:
         """Obtiene la lista de runners únicos que tienen juegos instalados"""
         conn = self._connect()
@@ -27,34 +30,49 @@ class LutrisDatabase:
         conn.close()
         return runners
     
-    def get_games_by_runner(self, runner: str) -> List[Dict]:
+    @tracing.traced("db.get_games_by_runner")
+    def get_games_by_runner(self, runner: str) -> List[Game]:
         """Obtiene todos los juegos de un runner específico"""
         conn = self._connect()
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT id, slug, name, platform, configpath,
+            SELECT id, slug, name, platform,
                    has_custom_coverart_big, has_custom_banner, has_custom_icon
             FROM games 
             WHERE runner = ? AND installed = 1
             ORDER BY name
         """, (runner,))
         
-        games = []
-        for row in cursor.fetchall():
-            games.append({
-                'id': row[0],
-                'slug': row[1],
-                'name': row[2],
-                'platform': row[3],
-                'configpath': row[4],
-                'has_cover': bool(row[5]),
-                'has_banner': bool(row[6]),
-                'has_icon': bool(row[7])
-            })
+        games = [
+            Game(row[0], row[1], row[2], runner, row[3], bool(row[4]), bool(row[5]), bool(row[6]))
+            for row in cursor
+        ]
         
         conn.close()
         return games
     
+    @tracing.traced("db.get_all_games")
+    def get_all_games(self) -> List[Game]:
+        """Obtiene los juegos instalados de todos los runners (búsqueda y triage)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, slug, name, runner, platform,
+                   has_custom_coverart_big, has_custom_banner, has_custom_icon
+            FROM games 
+            WHERE installed = 1 AND runner IS NOT NULL
+            ORDER BY name
+        """)
+        
+        games = [
+            Game(row[0], row[1], row[2], row[3], row[4], bool(row[5]), bool(row[6]), bool(row[7]))
+            for row in cursor
+        ]
+        
+        conn.close()
+        return games
+    
+    @tracing.traced("db.update_game_images")
     def update_game_images(self, game_id: int, game_name: str):
         """Actualiza los flags de imágenes personalizadas de un juego"""
         conn = self._connect()
@@ -70,7 +88,26 @@ class LutrisDatabase:
         """, (game_name, game_name, game_id))
         conn.commit()
         conn.close()
-    
+
+    @tracing.traced("db.update_games_images")
+    def update_games_images(self, games: List[tuple]):
+        """Como update_game_images para muchos juegos (id, nombre), en una sola transacción"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    UPDATE games
+                    SET has_custom_banner=1,
+                        has_custom_icon=1,
+                        has_custom_coverart_big=1,
+                        name=?,
+                        sortname=?
+                    WHERE id=?
+                """, [(name, name, game_id) for game_id, name in games])
+        finally:
+            conn.close()
+
+    @tracing.traced("db.update_game_name")
     def update_game_name(self, game_id: int, new_name: str):
         """Actualiza solo el nombre y sortname de un juego (corrección de metadatos)"""
         conn = self._connect()
@@ -84,7 +121,8 @@ class LutrisDatabase:
         conn.commit()
         conn.close()
 
-    def get_game_by_id(self, game_id: int) -> Optional[Dict]:
+    @tracing.traced("db.get_game_by_id")
+    def get_game_by_id(self, game_id: int) -> Optional[Game]:
         """Obtiene un juego específico por su ID"""
         conn = self._connect()
         cursor = conn.cursor()
@@ -98,11 +136,15 @@ class LutrisDatabase:
         conn.close()
         
         if row:
-            return {
-                'id': row[0],
-                'slug': row[1],
-                'name': row[2],
-                'runner': row[3],
-                'platform': row[4]
-            }
+            return Game(row[0], row[1], row[2], row[3], row[4])
         return None
+
+    @tracing.traced("db.get_game_configpath")
+    def get_game_configpath(self, game_id: int) -> Optional[str]:
+        """Obtiene el configpath de un juego (no se carga con los listados)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT configpath FROM games WHERE id = ?", (game_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
@@ -0,0 +1,264 @@
+"""
+Caché en disco de respuestas de la API, miniaturas e imágenes completas
+Las entradas se indexan por el hash de la URL y se escriben de forma
+atómica, así que otro hilo nunca lee un archivo a medias. Es la fuente de
+datos del modo sin conexión.
+
+Estructura:
+    CACHE_DIR/http/api/ab/<sha256>.json   respuestas JSON (con cabeceras)
+    CACHE_DIR/http/thumbs/ab/<sha256>     miniaturas de candidatos
+    CACHE_DIR/http/images/ab/<sha256>     imágenes completas descargadas
+    CACHE_DIR/http/<kind>/ab/<sha256>.meta  validadores (ETag, Last-Modified)
+
+Las entradas guardan sus validadores para revalidar con una petición
+condicional: un 304 renueva la entrada sin volver a transferir el cuerpo.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+import config
+
+# Cada cuántas escrituras se revisa el tamaño total
+PRUNE_EVERY = 50
+
+# Cabeceras de respuesta que se guardan para revalidar
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def validators_from(headers) -> Dict:
+    """Extrae ETag / Last-Modified de las cabeceras de una respuesta"""
+    if not headers:
+        return {}
+    found = {}
+    for name in VALIDATOR_HEADERS:
+        value = headers.get(name)
+        if value:
+            found[name] = value
+    return found
+
+
+def conditional_headers(validators: Optional[Dict]) -> Dict:
+    """Cabeceras If-None-Match / If-Modified-Since para una entrada guardada"""
+    if not validators:
+        return {}
+    headers = {}
+    if validators.get('ETag'):
+        headers['If-None-Match'] = validators['ETag']
+    if validators.get('Last-Modified'):
+        headers['If-Modified-Since'] = validators['Last-Modified']
+    return headers
+
+
+def is_fresh(stored: Optional[float], max_age: float) -> bool:
+    """Indica si una entrada guardada en stored (epoch) sigue vigente"""
+    return stored is not None and time.time() - stored < max_age
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class HTTPCache:
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            root: Directorio de la caché (por defecto CACHE_DIR/http)
+            max_bytes: Tamaño máximo antes de borrar las entradas más antiguas
+        """
+        self.root = root or os.path.join(config.CACHE_DIR, "http")
+        self.max_bytes = max_bytes if max_bytes is not None else config.HTTP_CACHE_MAX_MB * 1024 * 1024
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, kind: str, url: str, suffix: str = "") -> str:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.root, kind, digest[:2], digest + suffix)
+
+    def _after_write(self):
+        with self._lock:
+            self._writes += 1
+            if self._writes % PRUNE_EVERY:
+                return
+        self.prune()
+
+    # ------------------------------------------
+    # Respuestas de la API
+    # ------------------------------------------
+
+    def get_response(self, url: str) -> Optional[Dict]:
+        """
+        Entrada guardada para una URL de la API
+
+        Returns:
+            Dict con 'url', 'stored' (epoch), 'headers' y 'body' (texto) o None
+        """
+        try:
+            with open(self._path("api", url, ".json"), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_json(self, url: str):
+        """Cuerpo JSON ya decodificado de una respuesta guardada (o None)"""
+        return self.decode_response(self.get_response(url))
+
+    @staticmethod
+    def decode_response(entry: Optional[Dict]):
+        """Cuerpo JSON de una entrada de get_response (o None)"""
+        if entry is None:
+            return None
+        try:
+            return json.loads(entry['body'])
+        except (KeyError, ValueError):
+            return None
+
+    def put_response(self, url: str, body: bytes, headers: Optional[Dict] = None):
+        """Guarda el cuerpo de una respuesta de la API con sus cabeceras de validación"""
+        entry = {
+            'url': url,
+            'stored': time.time(),
+            'headers': headers or {},
+            'body': body.decode() if isinstance(body, bytes) else body,
+        }
+        try:
+            _write_atomic(self._path("api", url, ".json"), json.dumps(entry).encode())
+            self._after_write()
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar en caché {url}: {e}")
+
+    def touch_response(self, url: str):
+        """Renueva una respuesta guardada tras un 304 (sin cambiar el cuerpo)"""
+        entry = self.get_response(url)
+        if entry is None:
+            return
+        entry['stored'] = time.time()
+        try:
+            _write_atomic(self._path("api", url, ".json"), json.dumps(entry).encode())
+        except OSError as e:
+            print(f"⚠️ No se pudo renovar la caché de {url}: {e}")
+
+    # ------------------------------------------
+    # Miniaturas e imágenes ('thumbs' / 'images')
+    # ------------------------------------------
+
+    def has(self, kind: str, url: str) -> bool:
+        return os.path.exists(self._path(kind, url))
+
+    def get_bytes(self, kind: str, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(kind, url), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def get_meta(self, kind: str, url: str) -> Dict:
+        """
+        Metadatos de una imagen guardada
+
+        Returns:
+            Dict con 'stored' (epoch) y 'headers' (validadores). Las entradas
+            sin .meta usan la fecha del archivo y no tienen validadores.
+        """
+        try:
+            with open(self._path(kind, url, ".meta"), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+        try:
+            return {'stored': os.stat(self._path(kind, url)).st_mtime, 'headers': {}}
+        except OSError:
+            return {'stored': None, 'headers': {}}
+
+    def put_bytes(self, kind: str, url: str, data: bytes, headers: Optional[Dict] = None):
+        try:
+            _write_atomic(self._path(kind, url), data)
+            self._write_meta(kind, url, headers or {})
+            self._after_write()
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar en caché {url}: {e}")
+
+    def touch_bytes(self, kind: str, url: str):
+        """Renueva una imagen guardada tras un 304"""
+        try:
+            self._write_meta(kind, url, self.get_meta(kind, url).get('headers') or {})
+        except OSError as e:
+            print(f"⚠️ No se pudo renovar la caché de {url}: {e}")
+
+    def _write_meta(self, kind: str, url: str, headers: Dict):
+        meta = {'stored': time.time(), 'headers': headers}
+        _write_atomic(self._path(kind, url, ".meta"), json.dumps(meta).encode())
+
+    # ------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------
+
+    def size(self) -> int:
+        """Bytes ocupados por la caché"""
+        total = 0
+        for dirpath, _dirs, files in os.walk(self.root):
+            for name in files:
+                try:
+                    total += os.stat(os.path.join(dirpath, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Borra las entradas menos usadas hasta quedar por debajo del límite
+
+        Returns:
+            Cantidad de archivos borrados
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        for dirpath, _dirs, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+                total += st.st_size
+        if total <= max_bytes:
+            return 0
+
+        removed = 0
+        for _used, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            total -= size
+            if total <= max_bytes:
+                break
+        return removed
+
+
+# Instancia global
+_http_cache = None
+
+def get_http_cache() -> HTTPCache:
+    """Obtiene la caché HTTP global"""
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HTTPCache()
+    return _http_cache
@@ -1,19 +1,91 @@
 """
 Módulo para gestionar imágenes: descarga, conversión y reemplazo
 """
+import http.client
 import os
+import re
+import time
+import urllib.error
+import urllib.parse
 import urllib.request
-import shutil
-import ssl
+import uuid
 from io import BytesIO
 from PIL import Image
 from typing import Optional
 import config
+from utils.backup_store import get_backup_store, new_job_id, clone_file
+from utils.config_manager import get_config_manager
+from utils import metrics, net, tracing
+from utils.api import get_ssl_context
+from utils.circuit_breaker import CircuitOpenError, get_breaker, get_retry_budget
+from utils.connectivity import OfflineError, get_connectivity
+from utils.http_cache import conditional_headers, get_http_cache, is_fresh, validators_from
+from utils.net import Deadline, DeadlineExceeded
+from utils.single_flight import SingleFlight
+
+
+# Descargas idénticas en curso compartidas entre ventanas e hilos
+_flights = SingleFlight("images")
+
+# Tipo de tráfico (config.NET_TIMEOUTS / NET_DEADLINES) de cada caché
+TRAFFIC_CLASSES = {
+    'images': 'image',
+    'thumbs': 'thumbnail',
+}
+
+# Reintentos de una descarga que se corta a mitad del cuerpo
+BODY_RETRIES = 2
+# Errores de un cuerpo cortado (las cabeceras sí llegaron)
+_TRUNCATED = (http.client.IncompleteRead, ConnectionResetError)
+
+
+def fit_icon(source: Image.Image, size: int) -> Image.Image:
+    """Escala un icono RGBA a un lienzo cuadrado de size x size (centrado)"""
+    width, height = source.size
+    if width == height == size:
+        return source
+    
+    scale = size / max(width, height)
+    new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    resized = source.resize(new_size, Image.Resampling.LANCZOS)
+    if new_size == (size, size):
+        return resized
+    
+    canvas = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    canvas.paste(resized, ((size - new_size[0]) // 2, (size - new_size[1]) // 2))
+    return canvas
+
+
+def temp_path_for(path: str) -> str:
+    """Temporal junto al destino (mismo sistema de archivos para os.replace) con su extensión"""
+    base, extension = os.path.splitext(path)
+    return f"{base}.tmp-{uuid.uuid4().hex[:8]}{extension}"
+
+
+def write_icon_set(image: Image.Image, save_path: str, system_paths: dict = None):
+    """
+    Genera todos los PNG de un icono a partir de una sola imagen decodificada
+    
+    Args:
+        image: Icono decodificado
+        save_path: Ruta del icono de Lutris (LUTRIS_ICON_SIZE)
+        system_paths: Dict tamaño -> ruta de los iconos del tema hicolor
+    """
+    source = image.convert('RGBA')
+    largest = max(source.size)
+    
+    lutris_size = config.LUTRIS_ICON_SIZE
+    fit_icon(source, lutris_size).save(save_path, "PNG", optimize=True)
+    
+    for size, path in (system_paths or {}).items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if size == lutris_size:
+            # Mismo contenido: compartir bytes con hardlink si es el mismo FS
+            clone_file(save_path, path)
+        elif size <= largest:
+            # No se generan tamaños mayores que el original (serían borrosos)
+            fit_icon(source, size).save(path, "PNG", optimize=True)
 
-# SSL Bypass
-ctx = ssl.create_default_context()
-ctx.check_hostname = False
-ctx.verify_mode = ssl.CERT_NONE
 
 class ImageManager:
     def __init__(self):
@@ -21,6 +93,16 @@ class ImageManager:
         self.banners_dir = config.BANNERS_DIR
         self.icons_lutris_dir = config.LUTRIS_ICONS_DIR
         self.icons_system_dir = config.SYSTEM_ICONS_DIR
+        self.backup_store = get_backup_store()
+        
+        # Raíz del tema hicolor (.../hicolor/128x128/apps/ -> .../hicolor)
+        self.hicolor_dir = None
+        self.system_icon_size = config.LUTRIS_ICON_SIZE
+        size_dir = os.path.dirname(os.path.normpath(self.icons_system_dir))
+        match = re.fullmatch(r'(\d+)x\1', os.path.basename(size_dir))
+        if match:
+            self.hicolor_dir = os.path.dirname(size_dir)
+            self.system_icon_size = int(match.group(1))
         
         # Crear directorios si no existen
         for directory in [self.covers_dir, self.banners_dir, 
@@ -36,6 +118,16 @@ class ImageManager:
             'icon_system': os.path.join(self.icons_system_dir, f"lutris_{slug}.png")
         }
     
+    def get_system_icon_paths(self, slug: str) -> dict:
+        """Obtiene las rutas del icono del sistema para cada tamaño del tema hicolor"""
+        name = f"lutris_{slug}.png"
+        paths = {self.system_icon_size: os.path.join(self.icons_system_dir, name)}
+        if self.hicolor_dir:
+            for size in config.SYSTEM_ICON_SIZES:
+                if size != self.system_icon_size:
+                    paths[size] = os.path.join(self.hicolor_dir, f"{size}x{size}", "apps", name)
+        return paths
+    
     def image_exists(self, slug: str, image_type: str) -> bool:
         """Verifica si una imagen existe"""
         paths = self.get_image_paths(slug)
@@ -47,76 +139,258 @@ class ImageManager:
             return os.path.exists(paths['icon_system'])
         return False
     
-    def download_image(self, url: str, save_path: str) -> bool:
+    def fetch_bytes(self, url: str, kind: str = 'images', deadline: Optional[Deadline] = None) -> bytes:
+        """
+        Bytes de una imagen remota, desde la caché en disco si ya se descargó
+        
+        Las URLs de SteamGridDB casi nunca cambian de contenido, así que la
+        caché se usa también con conexión durante IMAGE_CACHE_FRESH_SECONDS;
+        después se revalida con una petición condicional (un 304 no vuelve a
+        transferir la imagen). Sin conexión nunca se abre un socket.
+        
+        Si otra ventana u otro hilo ya está descargando la misma URL, espera
+        a esa descarga en lugar de abrir otra conexión.
+        
+        Args:
+            url: URL de la imagen
+            kind: 'images' (imágenes completas) o 'thumbs' (miniaturas)
+            deadline: Plazo de la descarga (por defecto el de su tipo de tráfico);
+                      al agotarse se abandona con DeadlineExceeded
+        """
+        traffic_class = TRAFFIC_CLASSES[kind]
+        if deadline is None:
+            deadline = Deadline.for_class(traffic_class)
+        return _flights.do((kind, url), lambda: self._fetch_bytes(url, kind, traffic_class, deadline),
+                           deadline=deadline)
+    
+    def _fetch_bytes(self, url: str, kind: str, traffic_class: str, deadline: Deadline) -> bytes:
+        """Cuerpo de fetch_bytes (una sola ejecución por URL a la vez)"""
+        cache = get_http_cache()
+        cached = cache.get_bytes(kind, url)
+        meta = cache.get_meta(kind, url) if cached is not None else None
+        if cached is not None and (get_connectivity().is_offline()
+                                   or is_fresh(meta.get('stored'), config.IMAGE_CACHE_FRESH_SECONDS)):
+            metrics.inc(f"cache.{kind}.hit")
+            return cached
+        if cached is None:
+            metrics.inc(f"cache.{kind}.miss")
+            if get_connectivity().is_offline():
+                raise OfflineError(f"Sin conexión y sin caché para {url}")
+        
+        # Con el cortacircuitos del host abierto no se abre ningún socket
+        breaker = get_breaker(urllib.parse.urlparse(url).netloc)
+        if not breaker.allow():
+            metrics.inc("images.breaker_rejected")
+            if cached is None:
+                raise CircuitOpenError(breaker.host, breaker.retry_in())
+            metrics.inc(f"cache.{kind}.hit")
+            return cached
+        
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        validators = conditional_headers(meta.get('headers')) if meta else {}
+        if validators:
+            headers.update(validators)
+            metrics.inc(f"cache.{kind}.revalidations")
+        
+        req = urllib.request.Request(url, headers=headers)
+        with tracing.span("image.download" if kind == 'images' else "image.download_thumbnail", url=url):
+            try:
+                data, response_headers = self._download_body(req, traffic_class, deadline, breaker)
+            except DeadlineExceeded:
+                # Se acabó nuestro plazo, no falló el host: ni fallo ni sonda,
+                # pero si era la prueba del semiabierto hay que soltarla
+                breaker.release()
+                raise
+            except urllib.error.HTTPError as e:
+                if e.code == 403 or e.code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if cached is None:
+                    raise
+                if e.code == 304:
+                    # No modificado: renovar la entrada sin transferir la imagen
+                    cache.touch_bytes(kind, url)
+                    metrics.inc(f"cache.{kind}.not_modified")
+                metrics.inc(f"cache.{kind}.hit")
+                return cached
+            except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+                breaker.record_failure()
+                if not isinstance(e, http.client.HTTPException):
+                    # Error de red: la sonda decide si pasar a modo sin conexión
+                    get_connectivity().report_failure()
+                if cached is None:
+                    raise
+                metrics.inc(f"cache.{kind}.hit")
+                return cached
+        breaker.record_success()
+        if cached is not None:
+            metrics.inc(f"cache.{kind}.miss")
+        metrics.inc("net.bytes_downloaded", len(data))
+        cache.put_bytes(kind, url, data, response_headers)
+        return data
+    
+    def _download_body(self, req, traffic_class: str, deadline: Deadline, breaker):
+        """
+        Descarga el cuerpo completo; si se corta a la mitad se reintenta
+        (con el presupuesto global de reintentos y si el cortacircuitos lo permite)
+
+        Returns:
+            (bytes, validadores de la respuesta)
+        """
+        budget = get_retry_budget()
+        budget.record_request()
+        for attempt in range(BODY_RETRIES + 1):
+            try:
+                with net.urlopen(req, traffic_class, deadline, context=get_ssl_context()) as r:
+                    # Leer todo antes de guardar: un cuerpo truncado no deja un archivo a medias
+                    return net.read_all(r, deadline), validators_from(r.headers)
+            except _TRUNCATED:
+                # El último fallo lo anota quien llama
+                if attempt >= BODY_RETRIES or not budget.try_retry():
+                    raise
+                breaker.record_failure()
+                if not breaker.allow():
+                    raise
+                metrics.inc("images.retries")
+    
+    def is_available_offline(self, url: str, kind: str = 'images') -> bool:
+        """Indica si la imagen se puede usar sin conexión (está en la caché)"""
+        return get_http_cache().has(kind, url)
+    
+    def download_image(self, url: str, save_path: str, deadline: Optional[Deadline] = None) -> bool:
         """Descarga una imagen desde una URL"""
         try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, context=ctx) as r:
-                with open(save_path, 'wb') as f:
-                    f.write(r.read())
+            data = self.fetch_bytes(url, deadline=deadline)
+            with open(save_path, 'wb') as f:
+                f.write(data)
             return True
         except Exception as e:
             print(f"Error descargando imagen: {e}")
             return False
     
-    def download_and_convert_icon(self, url: str, save_path: str) -> bool:
-        """Descarga y convierte un icono a PNG real usando Pillow"""
+    def download_and_convert_icon(self, url: str, save_path: str, system_paths: dict = None,
+                                  deadline: Optional[Deadline] = None) -> bool:
+        """
+        Descarga un icono, lo decodifica una sola vez y genera todos los PNG
+        
+        Args:
+            url: URL del icono
+            save_path: Ruta del icono de Lutris (LUTRIS_ICON_SIZE)
+            system_paths: Dict tamaño -> ruta de los iconos del tema hicolor
+            deadline: Plazo de la descarga (por defecto NET_DEADLINES['image'])
+        """
         try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, context=ctx) as response:
-                img_data = response.read()
-                image = Image.open(BytesIO(img_data))
-                image.save(save_path, "PNG")
+            img_data = self.fetch_bytes(url, deadline=deadline)
+            
+            write_icon_set(Image.open(BytesIO(img_data)), save_path, system_paths)
             return True
         except Exception as e:
             print(f"Error convirtiendo icono: {e}")
             return False
     
-    def replace_image(self, slug: str, image_type: str, url: str) -> bool:
+    def _backup_and_remove(self, slug: str, key: str, path: str, job_id: str):
+        """Respalda la imagen actual en el almacén y la elimina"""
+        self.backup_store.store(slug, key, path, job_id)
+        if os.path.exists(path):
+            os.remove(path)
+    
+    def _backup_and_install(self, slug: str, key: str, tmp: str, path: str, job_id: str):
+        """Respalda la imagen actual y pone la nueva (ya completa en tmp) en su lugar"""
+        self.backup_store.store(slug, key, path, job_id)
+        os.replace(tmp, path)
+    
+    def replace_image(self, slug: str, image_type: str, url: str, job_id: str = None) -> bool:
         """
         Reemplaza una imagen del juego descargando desde URL
         
+        La imagen nueva se descarga y prepara en un temporal junto al destino;
+        la actual solo se respalda y se sustituye cuando la nueva está
+        completa, así que una descarga fallida no deja el juego sin imagen.
+        
         Args:
             slug: Identificador del juego
             image_type: 'cover', 'banner' o 'icon'
             url: URL de la imagen a descargar
+            job_id: Trabajo de respaldo al que pertenece (uno nuevo si es None)
         
         Returns:
             True si se reemplazó exitosamente
         """
         paths = self.get_image_paths(slug)
+        if job_id is None:
+            job_id = new_job_id()
+        
+        # Sin conexión, no tocar la imagen actual si la nueva no está en caché
+        if get_connectivity().is_offline() and not self.is_available_offline(url):
+            print(f"📴 Sin conexión: {url} no está en la caché")
+            return False
         
+        temps = []
         try:
-            if image_type == 'cover':
-                # Eliminar la anterior si existe
-                if os.path.exists(paths['cover']):
-                    os.remove(paths['cover'])
-                return self.download_image(url, paths['cover'])
-            
-            elif image_type == 'banner':
-                # Eliminar la anterior si existe
-                if os.path.exists(paths['banner']):
-                    os.remove(paths['banner'])
-                return self.download_image(url, paths['banner'])
+            if image_type in ('cover', 'banner'):
+                path = paths[image_type]
+                tmp = temp_path_for(path)
+                temps.append(tmp)
+                if not self.download_image(url, tmp):
+                    return False
+                
+                # Etapa opcional: redimensionar, recomprimir y corregir el formato
+                if get_config_manager().get_normalize_art():
+                    self.normalize_downloaded(tmp, image_type)
+                self._backup_and_install(slug, image_type, tmp, path, job_id)
+                return True
             
             elif image_type == 'icon':
-                # Eliminar los anteriores si existen
-                if os.path.exists(paths['icon_lutris']):
-                    os.remove(paths['icon_lutris'])
-                if os.path.exists(paths['icon_system']):
-                    os.remove(paths['icon_system'])
+                system_paths = self.get_system_icon_paths(slug)
+                data = self.fetch_bytes(url)
+                
+                # Decodificar una vez y generar todos los tamaños en temporales
+                tmp_lutris = temp_path_for(paths['icon_lutris'])
+                tmp_system = {size: temp_path_for(path) for size, path in system_paths.items()}
+                temps.append(tmp_lutris)
+                temps.extend(tmp_system.values())
+                write_icon_set(Image.open(BytesIO(data)), tmp_lutris, tmp_system)
                 
-                # Descargar y convertir a PNG
-                if self.download_and_convert_icon(url, paths['icon_lutris']):
-                    # Copiar al directorio del sistema
-                    shutil.copy2(paths['icon_lutris'], paths['icon_system'])
-                    return True
-                return False
+                # Todo listo: respaldar y sustituir cada tamaño
+                self._backup_and_install(slug, 'icon_lutris', tmp_lutris, paths['icon_lutris'], job_id)
+                for size, path in system_paths.items():
+                    key = 'icon_system' if path == paths['icon_system'] else f"icon_system_{size}"
+                    if os.path.exists(tmp_system[size]):
+                        self._backup_and_install(slug, key, tmp_system[size], path, job_id)
+                    else:
+                        # Tamaño mayor que el original: no se genera y el anterior se retira
+                        self._backup_and_remove(slug, key, path, job_id)
+                return True
         
         except Exception as e:
             print(f"Error reemplazando imagen: {e}")
             return False
+        finally:
+            for tmp in temps:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+    
+    def normalize_downloaded(self, path: str, image_type: str):
+        """Normaliza una imagen recién descargada (un fallo no invalida la descarga)"""
+        from utils.art_normalizer import normalize_image
+        try:
+            result = normalize_image(path, image_type)
+            if result['changed']:
+                saved = result['bytes_before'] - result['bytes_after']
+                print(f"🗜️  {os.path.basename(path)}: {result['reason']}, {saved / 1024:.0f} KB ahorrados")
+        except Exception as e:
+            print(f"⚠️  No se pudo normalizar {path}: {e}")
+    
+    def rollback_game(self, slug: str) -> int:
+        """Deshace el último cambio de imágenes de un juego (sin red)"""
+        return self.backup_store.rollback_slug(slug)
+    
+    def rollback_job(self, job_id: str) -> int:
+        """Deshace todas las imágenes reemplazadas por un trabajo (sin red)"""
+        return self.backup_store.rollback_job(job_id)
     
+    @tracing.traced("image.get_thumbnail")
     def get_thumbnail(self, slug: str, image_type: str, size: tuple) -> Optional[Image.Image]:
         """
         Obtiene una miniatura de una imagen existente
@@ -130,6 +404,7 @@ class ImageManager:
             Objeto PIL Image redimensionado o None
         """
         paths = self.get_image_paths(slug)
+        start = time.perf_counter()
         
         try:
             if image_type == 'cover' and os.path.exists(paths['cover']):
@@ -143,61 +418,79 @@ class ImageManager:
             
             # Redimensionar manteniendo proporción
             img.thumbnail(size, Image.Resampling.LANCZOS)
+            metrics.observe("image.thumbnail_decode_ms", (time.perf_counter() - start) * 1000)
             return img
         
         except Exception as e:
             print(f"Error obteniendo miniatura: {e}")
             return None
     
-    def download_thumbnail(self, url: str, size: tuple) -> Optional[Image.Image]:
-        """Descarga y redimensiona una imagen desde URL (para previews)"""
+    def download_thumbnail(self, url: str, size: tuple, deadline: Optional[Deadline] = None) -> Optional[Image.Image]:
+        """
+        Descarga y redimensiona una imagen desde URL (para previews)
+        
+        Si no llega dentro del plazo (por defecto NET_DEADLINES['thumbnail'])
+        se abandona y retorna None.
+        """
         try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, context=ctx) as response:
-                img_data = response.read()
-                img = Image.open(BytesIO(img_data))
-                img.thumbnail(size, Image.Resampling.LANCZOS)
-                return img
+            img_data = self.fetch_bytes(url, 'thumbs', deadline)
+            img = Image.open(BytesIO(img_data))
+            img.thumbnail(size, Image.Resampling.LANCZOS)
+            return img
+        except OfflineError:
+            return None
         except Exception as e:
             print(f"Error descargando miniatura: {e}")
             return None
     
-    def batch_update_images(self, slug: str, game_id: int, api) -> dict:
+    def best_image_urls(self, game_id: int, api, types=None) -> dict:
         """
-        Actualiza todas las imágenes (Cover, Banner, Icon) automáticamente
-        usando el ID de SteamGridDB.
-        
+        Busca la mejor imagen de cada tipo en SteamGridDB (solo peticiones a la API)
+
+        Va en el carril 'api' del planificador; las descargas se hacen
+        después con apply_images en el carril 'images'.
+
         Args:
-            slug: Identificador local del juego
             game_id: ID de SteamGridDB
             api: Instancia de SteamGridDBAPI
-            
+            types: Tipos a buscar (por defecto los tres)
+
         Returns:
-            Dict con el resultado por tipo {'cover': bool, 'banner': bool, 'icon': bool}
+            Dict tipo -> URL (solo los tipos con resultados)
         """
-        results = {'cover': False, 'banner': False, 'icon': False}
-        
-        try:
-            # Obtener URLs de todas las imágenes disponibles
-            images = api.get_all_images(game_id)
-            
-            # 1. Cover
-            if images.get('covers'):
+        if types is None:
+            types = ('cover', 'banner', 'icon')
+        urls = {}
+        for image_type in types:
+            try:
                 # Tomar la primera imagen (mejor score)
-                url = images['covers'][0]['url']
-                results['cover'] = self.replace_image(slug, 'cover', url)
-            
-            # 2. Banner
-            if images.get('banners'):
-                url = images['banners'][0]['url']
-                results['banner'] = self.replace_image(slug, 'banner', url)
-                
-            # 3. Icon
-            if images.get('icons'):
-                url = images['icons'][0]['url']
-                results['icon'] = self.replace_image(slug, 'icon', url)
-                
-        except Exception as e:
-            print(f"Error en batch update: {e}")
-            
+                images = api.get_images(game_id, image_type, limit=1)
+            except Exception as e:
+                print(f"Error buscando {image_type} de {game_id}: {e}")
+                continue
+            if images:
+                urls[image_type] = images[0].url
+        return urls
+
+    def apply_images(self, slug: str, urls: dict, job_id: str = None) -> dict:
+        """
+        Descarga y aplica varias imágenes de un juego bajo un mismo trabajo de respaldo
+
+        Args:
+            slug: Identificador local del juego
+            urls: Dict tipo -> URL (ver best_image_urls)
+            job_id: Trabajo de respaldo compartido (uno nuevo si es None)
+
+        Returns:
+            Dict con el resultado por tipo {'cover': bool, 'banner': bool, 'icon': bool}
+        """
+        if job_id is None:
+            job_id = new_job_id("lote")
+        results = {}
+        for image_type, url in urls.items():
+            try:
+                results[image_type] = self.replace_image(slug, image_type, url, job_id)
+            except Exception as e:
+                print(f"Error en batch update: {e}")
+                results[image_type] = False
         return results
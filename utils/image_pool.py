@@ -0,0 +1,235 @@
+"""
+Servicio de procesamiento de imágenes en un pool de procesos
+Evita el GIL en trabajos masivos (miniaturas, normalización, iconos).
+Las imágenes viajan por ruta de archivo o por memoria compartida: nunca
+se serializan con pickle los píxeles ni los bytes codificados.
+"""
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Optional, Tuple
+from PIL import Image
+import config
+from utils import metrics
+
+
+# ==========================================
+# Funciones que se ejecutan en los procesos
+# ==========================================
+
+def _thumbnail_job(path: str, size: tuple):
+    """Decodifica y reduce una imagen; deja los píxeles en memoria compartida"""
+    if not os.path.exists(path):
+        return None
+    with Image.open(path) as img:
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA')
+        data = img.tobytes()
+        mode, img_size = img.mode, img.size
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+    name = shm.name
+    shm.close()
+    return name, mode, img_size, len(data)
+
+
+def _icon_job(src_path: str, save_path: str, system_paths: dict) -> bool:
+    """Genera todos los PNG de un icono a partir de un archivo descargado"""
+    from utils.image_manager import write_icon_set
+    with Image.open(src_path) as img:
+        write_icon_set(img, save_path, system_paths)
+    return True
+
+
+def _normalize_job(path: str, image_type: str, slug: str, job_id: str, backup_root: str):
+    """Normaliza un cover o banner (ver art_normalizer.normalize_file)"""
+    from utils.art_normalizer import normalize_file
+    return normalize_file(path, image_type, slug, job_id, backup_root)
+
+
+def _receive_image(meta) -> Optional[Image.Image]:
+    """Reconstruye en este proceso una imagen dejada en memoria compartida"""
+    if meta is None:
+        return None
+    name, mode, size, length = meta
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return Image.frombytes(mode, size, bytes(shm.buf[:length]))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# Servicios vivos: el medidor pool.pending (registrado una sola vez) suma
+# los trabajos pendientes de todos, sin retener servicios ya descartados
+_services = weakref.WeakSet()
+_services_lock = threading.Lock()
+
+
+def _total_pending() -> int:
+    with _services_lock:
+        services = list(_services)
+    return sum(service.pending for service in services)
+
+
+metrics.register_gauge("pool.pending", _total_pending)
+
+
+# ==========================================
+# Servicio
+# ==========================================
+
+class ImageProcessingService:
+    """
+    Pool de procesos con la misma API que los helpers de ImageManager
+
+    Los métodos síncronos (get_thumbnail, normalize_image, convert_icon)
+    devuelven lo mismo que sus equivalentes; los submit_* devuelven Futures
+    para repartir trabajos masivos entre todos los núcleos.
+    """
+
+    def __init__(self, image_manager=None, workers: Optional[int] = None):
+        """
+        Args:
+            image_manager: ImageManager para resolver las rutas por slug
+                           (si es None se crea uno al pedir la primera miniatura por slug)
+            workers: Cantidad de procesos (por defecto config.IMAGE_POOL_WORKERS o
+                     el número de CPUs)
+        """
+        self.image_manager = image_manager
+        self.workers = workers or config.IMAGE_POOL_WORKERS or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        with _services_lock:
+            _services.add(self)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Crea el pool bajo demanda (forkserver: seguro con hilos y Tk)"""
+        with self._lock:
+            if self._executor is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(method)
+                )
+            return self._executor
+
+    @property
+    def pending(self) -> int:
+        """Trabajos enviados que aún no terminaron"""
+        return self._pending
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            self._pending += 1
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self, wait: bool = True):
+        """Detiene los procesos del pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    # ------------------------------------------
+    # Miniaturas
+    # ------------------------------------------
+
+    def _thumbnail_source(self, slug: str, image_type: str) -> Optional[str]:
+        """Misma elección de archivo que ImageManager.get_thumbnail"""
+        with self._lock:
+            if self.image_manager is None:
+                from utils.image_manager import ImageManager
+                self.image_manager = ImageManager()
+        paths = self.image_manager.get_image_paths(slug)
+        key = 'icon_lutris' if image_type == 'icon' else image_type
+        return paths.get(key)
+
+    def submit_thumbnail_file(self, path: str, size: tuple) -> Future:
+        """Future con la miniatura (PIL Image o None) de un archivo"""
+        result = Future()
+        inner = self._submit(_thumbnail_job, path, tuple(size))
+
+        def deliver(f):
+            try:
+                result.set_result(_receive_image(f.result()))
+            except Exception as e:
+                result.set_exception(e)
+
+        inner.add_done_callback(deliver)
+        return result
+
+    def submit_thumbnail(self, slug: str, image_type: str, size: tuple) -> Future:
+        """Future con la miniatura de un juego (ver ImageManager.get_thumbnail)"""
+        return self.submit_thumbnail_file(self._thumbnail_source(slug, image_type), size)
+
+    def get_thumbnail(self, slug: str, image_type: str, size: tuple) -> Optional[Image.Image]:
+        """Equivalente a ImageManager.get_thumbnail, decodificando en otro proceso"""
+        try:
+            return self.submit_thumbnail(slug, image_type, size).result()
+        except Exception as e:
+            print(f"Error obteniendo miniatura: {e}")
+            return None
+
+    def get_thumbnails(self, requests: Iterable[Tuple[str, str, tuple]]) -> Dict[Tuple[str, str], Optional[Image.Image]]:
+        """
+        Genera muchas miniaturas en paralelo
+
+        Args:
+            requests: Iterable de (slug, image_type, size)
+
+        Returns:
+            Dict (slug, image_type) -> PIL Image o None
+        """
+        futures = {
+            (slug, image_type): self.submit_thumbnail(slug, image_type, size)
+            for slug, image_type, size in requests
+        }
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                print(f"Error obteniendo miniatura: {e}")
+                results[key] = None
+        return results
+
+    # ------------------------------------------
+    # Normalización e iconos
+    # ------------------------------------------
+
+    def submit_normalize(self, path: str, image_type: str, slug: str, job_id: str,
+                         backup_root: Optional[str] = None) -> Future:
+        """Future con el resultado de art_normalizer.normalize_file"""
+        if backup_root is None:
+            backup_root = os.path.join(config.CACHE_DIR, "backups")
+        return self._submit(_normalize_job, path, image_type, slug, job_id, backup_root)
+
+    def normalize_image(self, path: str, image_type: str, slug: str, job_id: str) -> Dict:
+        """Normaliza un archivo en otro proceso (con respaldo previo)"""
+        return self.submit_normalize(path, image_type, slug, job_id).result()
+
+    def submit_convert_icon(self, src_path: str, save_path: str, system_paths: dict = None) -> Future:
+        """Future que genera todos los PNG de un icono ya descargado en src_path"""
+        return self._submit(_icon_job, src_path, save_path, system_paths or {})
+
+    def convert_icon(self, src_path: str, save_path: str, system_paths: dict = None) -> bool:
+        """Equivalente a la conversión de download_and_convert_icon desde un archivo"""
+        try:
+            return self.submit_convert_icon(src_path, save_path, system_paths).result()
+        except Exception as e:
+            print(f"Error convirtiendo icono: {e}")
+            return False
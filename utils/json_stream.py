@@ -0,0 +1,196 @@
+"""
+Lectura incremental de respuestas JSON comprimidas
+Permite recorrer el array de una respuesta grande (por ejemplo, el "data"
+de /grids) elemento a elemento y dejar de leer en cuanto se tiene lo
+necesario, sin cargar ni decodificar el cuerpo completo.
+
+Ejemplo:
+    with api._make_request(req) as r:
+        reader = JSONArrayReader(open_decoded(r), 'data')
+        first = list(itertools.islice(reader, 20))
+"""
+import codecs
+import gzip
+import json
+import zlib
+
+# Bytes que se leen de la red en cada paso
+CHUNK_SIZE = 16 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class CountingReader:
+    """Envuelve un stream binario y cuenta los bytes leídos (los de la red)"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def readable(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class _DeflateReader:
+    """Descompresor deflate (con cabecera zlib o sin ella, como envían algunos servidores)"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._decompressor = None
+        self._eof = False
+
+    def read(self, size=-1):
+        while not self._eof:
+            chunk = self.raw.read(CHUNK_SIZE)
+            if not chunk:
+                self._eof = True
+                return self._decompressor.flush() if self._decompressor else b""
+            if self._decompressor is None:
+                # 0x78 es la cabecera zlib; si no está, es deflate "crudo"
+                wbits = zlib.MAX_WBITS if chunk[0] == 0x78 else -zlib.MAX_WBITS
+                self._decompressor = zlib.decompressobj(wbits)
+            data = self._decompressor.decompress(chunk)
+            if data:
+                return data
+        return b""
+
+
+def open_decoded(response, counter: CountingReader = None):
+    """
+    Stream binario con el cuerpo ya descomprimido según Content-Encoding
+
+    Args:
+        response: Respuesta de urllib (o cualquier objeto con read() y headers)
+        counter: CountingReader opcional ya envuelto sobre response
+    """
+    raw = counter or response
+    encoding = (response.headers.get('Content-Encoding') or '').strip().lower()
+    if encoding in ('gzip', 'x-gzip'):
+        return gzip.GzipFile(fileobj=raw)
+    if encoding == 'deflate':
+        return _DeflateReader(raw)
+    return raw
+
+
+def read_decoded(response, counter: CountingReader = None) -> bytes:
+    """Cuerpo completo descomprimido de una respuesta"""
+    return open_decoded(response, counter).read()
+
+
+class JSONArrayReader:
+    """
+    Itera los elementos del array de una clave de primer nivel de un objeto JSON
+
+    Las demás claves de primer nivel que aparezcan antes del array quedan
+    en `fields` (en SteamGridDB, "success" va antes de "data"). Si se deja
+    de iterar a mitad del array, el resto del cuerpo no se lee.
+    """
+
+    def __init__(self, stream, key: str, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.key = key
+        self.chunk_size = chunk_size
+        self.fields = {}
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    # ------------------------------------------
+    # Buffer
+    # ------------------------------------------
+
+    def _fill(self) -> bool:
+        """Lee otro bloque; retorna False al final del stream"""
+        if self._eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            self._buf += self._text.decode(b"", final=True)
+            return False
+        # Descartar lo ya consumido para que el buffer no crezca
+        if self._pos > self.chunk_size:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += self._text.decode(chunk)
+        return True
+
+    def _skip_ws(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return
+            if not self._fill():
+                raise ValueError("JSON incompleto")
+
+    def _next_char(self) -> str:
+        self._skip_ws()
+        char = self._buf[self._pos]
+        self._pos += 1
+        return char
+
+    def _expect(self, char: str):
+        found = self._next_char()
+        if found != char:
+            raise ValueError(f"JSON inesperado: se esperaba {char!r} y llegó {found!r}")
+
+    def _value(self):
+        self._skip_ws()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un número al final del buffer puede seguir en el próximo bloque
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    # ------------------------------------------
+    # Recorrido
+    # ------------------------------------------
+
+    def __iter__(self):
+        self._expect('{')
+        if self._next_char() == '}':
+            return
+        self._pos -= 1
+        while True:
+            name = self._value()
+            self._expect(':')
+            if name == self.key:
+                yield from self._array()
+            else:
+                self.fields[name] = self._value()
+            char = self._next_char()
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"JSON inesperado: {char!r}")
+
+    def _array(self):
+        self._expect('[')
+        if self._next_char() == ']':
+            return
+        self._pos -= 1
+        while True:
+            yield self._value()
+            char = self._next_char()
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"JSON inesperado: {char!r}")
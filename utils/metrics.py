@@ -0,0 +1,143 @@
+"""
+Registro de métricas en proceso (contadores, histogramas y medidores)
+Los módulos de utils publican aquí y el panel de diagnóstico lo lee.
+Publicar cuesta un lock y una suma: se puede llamar desde cualquier hilo.
+
+Ejemplo:
+    metrics.inc("api.retries")
+    metrics.observe("api.latency_ms.search", 153.2)
+    metrics.register_gauge("pool.pending", lambda: service.pending)
+"""
+import bisect
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+# Límites superiores (ms) de los cubos de los histogramas de latencia
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Histograma de cubos fijos con conteo, suma, mínimo y máximo"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)  # el último es "+inf"
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Aproximación por cubos (límite superior del cubo, acotado al máximo visto)"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= target:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'bounds': self.bounds,
+            'buckets': list(self.buckets),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+
+    def inc(self, name: str, amount: float = 1):
+        """Suma amount a un contador"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float, bounds=LATENCY_BUCKETS_MS):
+        """Registra un valor en un histograma (se crea con bounds la primera vez)"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(bounds)
+            histogram.observe(value)
+
+    def register_gauge(self, name: str, fn: Callable[[], float]):
+        """Medidor calculado al leer (por ejemplo, tamaño de una cola)"""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def unregister_gauge(self, name: str):
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def snapshot(self) -> Dict:
+        """Copia consistente de todas las métricas"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {name: h.snapshot() for name, h in self._histograms.items()}
+            gauges = dict(self._gauges)
+
+        values = {}
+        for name, fn in gauges.items():
+            try:
+                values[name] = fn()
+            except Exception:
+                values[name] = None
+        return {'counters': counters, 'histograms': histograms, 'gauges': values}
+
+    def reset(self):
+        """Borra contadores e histogramas (los medidores se mantienen)"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Memoria residente del proceso (Linux: /proc; si no, el pico de getrusage)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return None
+
+
+# Registro global y atajos
+_registry = MetricsRegistry()
+_registry.register_gauge("process.rss_bytes", process_rss_bytes)
+_registry.register_gauge("process.threads", threading.active_count)
+
+inc = _registry.inc
+observe = _registry.observe
+register_gauge = _registry.register_gauge
+unregister_gauge = _registry.unregister_gauge
+snapshot = _registry.snapshot
+reset = _registry.reset
+
+
+def get_registry() -> MetricsRegistry:
+    """Obtiene el registro de métricas global"""
+    return _registry
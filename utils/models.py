@@ -0,0 +1,46 @@
+"""
+Registros compactos que recorren la aplicación
+Usan __slots__ (sin __dict__ por instancia): en bibliotecas de miles de
+juegos ocupan una fracción de lo que ocupaba un dict por fila.
+"""
+from typing import Dict, Iterable, Optional
+
+
+class Game:
+    """Juego instalado de la base de datos de Lutris"""
+
+    __slots__ = ('id', 'slug', 'name', 'runner', 'platform', 'has_cover', 'has_banner', 'has_icon')
+
+    def __init__(self, id: int, slug: str, name: str, runner: Optional[str] = None,
+                 platform: Optional[str] = None, has_cover: bool = False,
+                 has_banner: bool = False, has_icon: bool = False):
+        self.id = id
+        self.slug = slug
+        self.name = name
+        self.runner = runner
+        self.platform = platform
+        self.has_cover = has_cover
+        self.has_banner = has_banner
+        self.has_icon = has_icon
+
+    def __repr__(self):
+        return f"Game(id={self.id!r}, slug={self.slug!r}, name={self.name!r}, runner={self.runner!r})"
+
+
+class ImageCandidate:
+    """Imagen de SteamGridDB que se ofrece en el selector"""
+
+    __slots__ = ('id', 'url', 'thumb')
+
+    def __init__(self, id: int, url: str, thumb: Optional[str] = None):
+        self.id = id
+        self.url = url
+        self.thumb = thumb or url
+
+    def __repr__(self):
+        return f"ImageCandidate(id={self.id!r}, url={self.url!r})"
+
+
+def index_by_slug(games: Iterable[Game]) -> Dict[str, Game]:
+    """Índice slug -> juego para búsquedas en O(1) sobre la lista cargada"""
+    return {game.slug: game for game in games}
@@ -0,0 +1,147 @@
+"""
+Resolución masiva de juegos en SteamGridDB por nombre normalizado
+Las bibliotecas de MAME y emuladores repiten el mismo juego con etiquetas de
+región, revisión o versión: "Street Fighter II (World 910522)",
+"Street Fighter II (USA)", "Street Fighter II (Rev 1)"... Antes cada uno
+hacía su propia búsqueda. Aquí se agrupan por nombre normalizado, se hace
+una sola búsqueda por grupo y el candidato se elige puntuando localmente
+todos los resultados (no solo el primero del autocompletado).
+
+Ejemplo:
+    resolver = NameResolver(api)
+    matches = resolver.resolve(games)   # slug -> {'id', 'name'} o None
+
+Contadores en utils.metrics:
+    resolver.names      nombres resueltos
+    resolver.searches   búsquedas hechas a SteamGridDB
+"""
+import difflib
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+import config
+from utils import metrics
+from utils.search_index import normalize_text
+
+# Etiquetas entre paréntesis, corchetes o llaves: (USA), [!], (World 910522), (Rev A)
+_TAGS = re.compile(r"\s*[\(\[\{][^\)\]\}]*[\)\]\}]")
+# Revisiones y versiones sueltas al final: "Rev 1", "rev.A", "v1.02", "Set 2"
+_TRAILING_REVISION = re.compile(r"\s+(?:rev(?:ision)?\.?\s*[a-z0-9.]+|v\d+(?:\.\d+)*[a-z]?|set\s*\d+)$",
+                                re.IGNORECASE)
+# "Legend of Zelda, The" -> "The Legend of Zelda"
+_TRAILING_ARTICLE = re.compile(r"^(.*),\s*(the|a|an)$", re.IGNORECASE)
+# Números romanos de secuela (sin "v" ni "x", que suelen ser parte del título)
+_ROMAN = {'ii': '2', 'iii': '3', 'iv': '4', 'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9'}
+
+
+def clean_name(name: str) -> str:
+    """Nombre sin etiquetas de región/revisión, apto para buscar (conserva mayúsculas)"""
+    text = _TAGS.sub("", name or "")
+    previous = None
+    while text != previous:
+        previous = text
+        text = _TRAILING_REVISION.sub("", text.strip())
+    text = text.strip(" -_:,.")
+    article = _TRAILING_ARTICLE.match(text)
+    if article:
+        text = f"{article.group(2)} {article.group(1)}"
+    return " ".join(text.split()) or (name or "").strip()
+
+
+def name_key(name: str) -> str:
+    """Clave de agrupación: limpia, en minúsculas, sin puntuación ni artículo inicial"""
+    text = normalize_text(clean_name(name).replace("&", " and "))
+    words = [_ROMAN.get(word, word) for word in text.split()]
+    if len(words) > 1 and words[0] == 'the':
+        words = words[1:]
+    return " ".join(words)
+
+
+def score_candidate(candidate_name: str, key: str) -> float:
+    """Parecido (0..1) entre el nombre de un resultado y la clave buscada"""
+    candidate = name_key(candidate_name)
+    if candidate == key:
+        return 1.0
+    tokens_a, tokens_b = set(candidate.split()), set(key.split())
+    jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b) if tokens_a | tokens_b else 0.0
+    ratio = difflib.SequenceMatcher(None, candidate, key).ratio()
+    return (jaccard + ratio) / 2
+
+
+def best_candidate(candidates: List[Dict], key: str, min_score: float) -> Optional[Dict]:
+    """Mejor resultado por puntuación local (a igualdad, el que SteamGridDB puso antes)"""
+    best, best_score = None, min_score
+    for candidate in candidates:
+        score = score_candidate(candidate['name'], key)
+        if score > best_score or (best is None and score >= best_score):
+            best, best_score = candidate, score
+    return best
+
+
+class NameResolver:
+    def __init__(self, api, min_score: Optional[float] = None):
+        """
+        Args:
+            api: Instancia de SteamGridDBAPI
+            min_score: Puntuación mínima para aceptar un resultado
+                       (por defecto config.NAME_MATCH_MIN_SCORE)
+        """
+        self.api = api
+        self.min_score = config.NAME_MATCH_MIN_SCORE if min_score is None else min_score
+        self._matches: Dict[str, Dict] = {}  # clave -> resultado (solo aciertos)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def group(games: Iterable) -> Dict[str, List]:
+        """Agrupa juegos (Game) por clave de nombre, conservando el orden"""
+        groups: Dict[str, List] = {}
+        for game in games:
+            groups.setdefault(name_key(game.name), []).append(game)
+        return groups
+
+    def resolve_group(self, key: str, names: List[str], fallback: bool = False) -> Optional[Dict]:
+        """
+        Resuelve un grupo de nombres equivalentes con una sola búsqueda
+
+        Args:
+            key: Clave común (name_key) de los nombres
+            names: Nombres originales del grupo (se busca el nombre limpio más repetido)
+            fallback: Si ningún resultado alcanza min_score, devolver el primero de
+                      SteamGridDB (uso interactivo: el usuario ve lo que abre).
+                      Ese resultado no se guarda para las resoluciones en bloque.
+
+        Returns:
+            Dict {'id', 'name'} o None si ningún resultado se parece lo suficiente
+        """
+        metrics.inc("resolver.names", len(names))
+        if not key and not fallback:
+            return None
+        with self._lock:
+            match = self._matches.get(key) if key else None
+        if match is not None:
+            return match
+
+        query = Counter(clean_name(name) for name in names).most_common(1)[0][0]
+        metrics.inc("resolver.searches")
+        candidates = self.api.search_games(query)
+        match = best_candidate(candidates, key, self.min_score) if key else None
+        if match is not None:
+            with self._lock:
+                self._matches[key] = match
+        elif fallback and candidates:
+            match = candidates[0]
+        return match
+
+    def resolve_name(self, name: str, fallback: bool = False) -> Optional[Dict]:
+        """Resuelve un solo nombre (reutiliza lo ya resuelto para variantes del mismo juego)"""
+        return self.resolve_group(name_key(name), [name], fallback)
+
+    def resolve(self, games: Iterable) -> Dict[str, Optional[Dict]]:
+        """Resuelve muchos juegos con una búsqueda por grupo: slug -> resultado o None"""
+        results = {}
+        for key, members in self.group(games).items():
+            match = self.resolve_group(key, [game.name for game in members])
+            for game in members:
+                results[game.slug] = match
+        return results
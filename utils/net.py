@@ -0,0 +1,181 @@
+"""
+Tiempos de espera y plazos de las operaciones de red
+Cada tipo de tráfico ('api', 'thumbnail', 'image') tiene su tiempo de
+conexión y de lectura (config.NET_TIMEOUTS) y un plazo total por operación
+(config.NET_DEADLINES). El plazo se pasa de la UI a la API y a las
+descargas, y limita tanto los sockets como las esperas entre reintentos:
+una miniatura que no llega a tiempo se abandona en vez de colgar un hilo.
+
+Ejemplo:
+    deadline = Deadline.for_class('thumbnail')
+    with net.urlopen(req, 'thumbnail', deadline, context=ctx) as r:
+        data = net.read_all(r, deadline)
+"""
+import functools
+import http.client
+import time
+import urllib.error
+import urllib.request
+from typing import Optional, Tuple
+import config
+from utils import metrics
+
+# Bytes por lectura al descargar un cuerpo con plazo
+READ_CHUNK = 64 * 1024
+
+
+class DeadlineExceeded(TimeoutError):
+    """Se agotó el plazo de la operación"""
+
+
+class Deadline:
+    """Instante límite de una operación (reloj monótono)"""
+
+    __slots__ = ('expires_at',)
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_class(cls, traffic_class: str) -> 'Deadline':
+        """Plazo por defecto de un tipo de tráfico"""
+        return cls(config.NET_DEADLINES[traffic_class])
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = "la operación"):
+        """Lanza DeadlineExceeded si el plazo ya pasó"""
+        if self.expired():
+            metrics.inc("net.deadline_exceeded")
+            raise DeadlineExceeded(f"Se agotó el plazo de {what}")
+
+
+def _raise_if_deadline(error: BaseException, deadline: Optional[Deadline], what: str):
+    """
+    Un timeout de socket recortado al plazo (ver timeouts_for) es el plazo
+    agotado, no un fallo del host: se relanza como DeadlineExceeded
+    """
+    if deadline is None or isinstance(error, DeadlineExceeded):
+        return
+    reason = getattr(error, 'reason', error)
+    if isinstance(reason, TimeoutError) and deadline.expired():
+        metrics.inc("net.deadline_exceeded")
+        raise DeadlineExceeded(f"Se agotó el plazo de {what}") from error
+
+
+def timeouts_for(traffic_class: str, deadline: Optional[Deadline] = None) -> Tuple[float, float]:
+    """(conexión, lectura) del tipo de tráfico, recortados a lo que queda del plazo"""
+    connect, read = config.NET_TIMEOUTS[traffic_class]
+    if deadline is not None:
+        deadline.check()
+        remaining = deadline.remaining()
+        connect, read = min(connect, remaining), min(read, remaining)
+    return connect, read
+
+
+# ==========================================
+# Conexiones con tiempo de conexión y de lectura distintos
+# ==========================================
+
+class _HTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, read_timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_timeout = read_timeout
+
+    def connect(self):
+        # self.timeout (el de urlopen) solo se usa para conectar
+        super().connect()
+        if self.read_timeout is not None:
+            self.sock.settimeout(self.read_timeout)
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, read_timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_timeout = read_timeout
+
+    def connect(self):
+        super().connect()
+        if self.read_timeout is not None:
+            self.sock.settimeout(self.read_timeout)
+
+
+class _HTTPHandler(urllib.request.HTTPHandler):
+    def __init__(self, read_timeout):
+        super().__init__()
+        self.read_timeout = read_timeout
+
+    def http_open(self, req):
+        return self.do_open(functools.partial(_HTTPConnection, read_timeout=self.read_timeout), req)
+
+
+class _HTTPSHandler(urllib.request.HTTPSHandler):
+    def __init__(self, read_timeout, context=None):
+        super().__init__(context=context)
+        self.read_timeout = read_timeout
+
+    def https_open(self, req):
+        return self.do_open(functools.partial(_HTTPSConnection, read_timeout=self.read_timeout),
+                            req, context=self._context)
+
+
+def urlopen(req, traffic_class: str, deadline: Optional[Deadline] = None, context=None):
+    """
+    urllib.request.urlopen con el tiempo de conexión y de lectura del tipo
+    de tráfico, ambos limitados por lo que queda del plazo
+    """
+    connect, read = timeouts_for(traffic_class, deadline)
+    opener = urllib.request.build_opener(_HTTPHandler(read), _HTTPSHandler(read, context))
+    try:
+        return opener.open(req, timeout=connect)
+    except (urllib.error.URLError, TimeoutError) as e:
+        _raise_if_deadline(e, deadline, "la petición")
+        raise
+
+
+def read_all(response, deadline: Optional[Deadline] = None) -> bytes:
+    """Lee el cuerpo completo comprobando el plazo entre bloques"""
+    if deadline is None:
+        return response.read()
+    chunks = []
+    while True:
+        deadline.check("la descarga")
+        try:
+            chunk = response.read(READ_CHUNK)
+        except TimeoutError as e:
+            _raise_if_deadline(e, deadline, "la descarga")
+            raise
+        if not chunk:
+            # read(n) no avisa si la conexión se cortó antes de Content-Length
+            missing = getattr(response, 'length', None)
+            if missing:
+                raise http.client.IncompleteRead(b"".join(chunks), missing)
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+class DeadlineReader:
+    """Envuelve un stream de respuesta y comprueba el plazo en cada lectura"""
+
+    def __init__(self, raw, deadline: Optional[Deadline]):
+        self.raw = raw
+        self.deadline = deadline
+
+    def read(self, size=-1):
+        if self.deadline is not None:
+            self.deadline.check("la respuesta")
+        try:
+            return self.raw.read(size)
+        except TimeoutError as e:
+            _raise_if_deadline(e, self.deadline, "la respuesta")
+            raise
+
+    def readable(self):
+        return True
+
+    def close(self):
+        pass
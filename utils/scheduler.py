@@ -0,0 +1,242 @@
+"""
+Planificador de trabajo de red con prioridades
+Todo el tráfico pasa por colas con prioridad y límites de concurrencia
+separados para la API de SteamGridDB ('api') y el CDN de imágenes
+('images'), así que un "Aplicar" no compite en igualdad con veinte
+miniaturas ni con un relleno masivo.
+
+- Prioridades: INTERACTIVE (aplicar, búsquedas del usuario) < VISIBLE
+  (miniaturas en pantalla) < OFFSCREEN < PREFETCH < BULK.
+- Reserva: PREFETCH y BULK nunca ocupan todos los hilos de un carril; queda
+  al menos SCHEDULER_RESERVED libre para lo interactivo.
+- Envejecimiento: cada SCHEDULER_AGING_SECONDS de espera una tarea sube un
+  nivel, así que lo de baja prioridad no se queda sin turno para siempre.
+- Lo encolado se puede cancelar (future.cancel()), cambiar de prioridad
+  (set_priority) o descartar si su plazo vence antes de empezar.
+
+Ejemplo:
+    future = get_scheduler().submit(api.get_images, game_id, 'cover',
+                                    lane='api', priority=INTERACTIVE)
+    future.add_done_callback(lambda f: root.after(0, show, f.result()))
+
+Las tareas no deben esperar a otras del mismo carril (se bloquearían).
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+import config
+from utils import metrics
+from utils.net import Deadline, DeadlineExceeded
+
+# Clases de prioridad (menor número = antes)
+INTERACTIVE = 0
+VISIBLE = 1
+OFFSCREEN = 2
+PREFETCH = 3
+BULK = 4
+
+PRIORITY_NAMES = {
+    INTERACTIVE: 'interactive',
+    VISIBLE: 'visible',
+    OFFSCREEN: 'offscreen',
+    PREFETCH: 'prefetch',
+    BULK: 'bulk',
+}
+
+
+class _Task:
+    __slots__ = ('fn', 'args', 'kwargs', 'priority', 'seq', 'enqueued', 'future', 'deadline')
+
+    def __init__(self, fn, args, kwargs, priority, seq, future, deadline):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.future = future
+        self.deadline = deadline
+
+
+class _Lane:
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = []
+        self.running = 0
+        self.running_low = 0
+        self.workers = 0
+
+
+class NetworkScheduler:
+    def __init__(self, limits: Optional[Dict[str, int]] = None, reserved: Optional[int] = None,
+                 aging: Optional[float] = None):
+        """
+        Args:
+            limits: Dict carril -> hilos (por defecto config.SCHEDULER_LIMITS)
+            reserved: Hilos de cada carril vedados a PREFETCH/BULK
+            aging: Segundos de espera para subir un nivel de prioridad
+        """
+        limits = limits or config.SCHEDULER_LIMITS
+        self.reserved = config.SCHEDULER_RESERVED if reserved is None else reserved
+        self.aging = aging or config.SCHEDULER_AGING_SECONDS
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._lanes = {name: _Lane(name, limit) for name, limit in limits.items()}
+        self._index = {}  # future -> (carril, tarea) mientras está encolada
+
+        for lane in self._lanes.values():
+            metrics.register_gauge(f"scheduler.queued.{lane.name}", lambda lane=lane: len(lane.queue))
+            metrics.register_gauge(f"scheduler.running.{lane.name}", lambda lane=lane: lane.running)
+
+    def submit(self, fn: Callable, *args, lane: str = 'api', priority: int = VISIBLE,
+               deadline: Optional[Deadline] = None, **kwargs) -> Future:
+        """
+        Encola fn(*args, **kwargs) en un carril
+
+        Args:
+            lane: 'api' o 'images'
+            priority: INTERACTIVE, VISIBLE, OFFSCREEN, PREFETCH o BULK
+            deadline: Si vence antes de empezar, la tarea falla con DeadlineExceeded
+
+        Returns:
+            Future con el resultado
+        """
+        future = Future()
+        with self._cond:
+            target = self._lanes[lane]
+            task = _Task(fn, args, kwargs, priority, next(self._seq), future, deadline)
+            target.queue.append(task)
+            self._index[future] = (target, task)
+            while target.workers < target.limit:
+                target.workers += 1
+                threading.Thread(target=self._worker, args=(target,), daemon=True,
+                                 name=f"net-{lane}-{target.workers}").start()
+            self._cond.notify_all()
+        return future
+
+    def call(self, fn: Callable, *args, lane: str = 'api', priority: int = VISIBLE, **kwargs):
+        """submit() y espera el resultado (desde hilos que no sean del planificador)"""
+        return self.submit(fn, *args, lane=lane, priority=priority, **kwargs).result()
+
+    def set_priority(self, future: Future, priority: int) -> bool:
+        """Cambia la prioridad de una tarea aún encolada (p. ej. una miniatura que entra en pantalla)"""
+        with self._cond:
+            entry = self._index.get(future)
+            if entry is None:
+                return False
+            entry[1].priority = priority
+            self._cond.notify_all()
+            return True
+
+    def cancel_queued(self, lane: Optional[str] = None, min_priority: int = PREFETCH) -> int:
+        """Cancela lo encolado de prioridad min_priority o menor (p. ej. la precarga)"""
+        cancelled = 0
+        with self._cond:
+            for target, task in list(self._index.values()):
+                if (lane is None or target.name == lane) and task.priority >= min_priority:
+                    cancelled += task.future.cancel()
+        return cancelled
+
+    def pending(self, lane: Optional[str] = None) -> int:
+        with self._cond:
+            lanes = [self._lanes[lane]] if lane else self._lanes.values()
+            return sum(len(target.queue) for target in lanes)
+
+    # ------------------------------------------
+    # Hilos de trabajo
+    # ------------------------------------------
+
+    def _pick(self, lane: _Lane) -> Optional[_Task]:
+        """Mejor tarea elegible del carril (se llama con el lock tomado)"""
+        now = time.monotonic()
+        best = None
+        best_key = None
+        low_full = lane.running_low >= lane.limit - self.reserved
+        for task in list(lane.queue):
+            if task.future.cancelled():
+                lane.queue.remove(task)
+                self._index.pop(task.future, None)
+                metrics.inc("scheduler.cancelled")
+                continue
+            if task.priority >= PREFETCH and low_full:
+                continue
+            key = (task.priority - (now - task.enqueued) / self.aging, task.seq)
+            if best_key is None or key < best_key:
+                best, best_key = task, key
+        return best
+
+    def _worker(self, lane: _Lane):
+        while True:
+            with self._cond:
+                task = self._pick(lane)
+                while task is None:
+                    # Despertar de vez en cuando: el envejecimiento cambia el orden
+                    self._cond.wait(self.aging)
+                    task = self._pick(lane)
+                lane.queue.remove(task)
+                self._index.pop(task.future, None)
+                low = task.priority >= PREFETCH
+                lane.running += 1
+                lane.running_low += low
+
+            try:
+                self._run(task)
+            finally:
+                with self._cond:
+                    lane.running -= 1
+                    lane.running_low -= low
+                    self._cond.notify_all()
+
+    def _run(self, task: _Task):
+        future = task.future
+        if not future.set_running_or_notify_cancel():
+            metrics.inc("scheduler.cancelled")
+            return
+        waited = (time.monotonic() - task.enqueued) * 1000
+        metrics.observe(f"scheduler.wait_ms.{PRIORITY_NAMES.get(task.priority, task.priority)}", waited)
+        if task.deadline is not None and task.deadline.expired():
+            metrics.inc("scheduler.expired")
+            future.set_exception(DeadlineExceeded("El plazo venció antes de empezar"))
+            return
+        try:
+            future.set_result(task.fn(*task.args, **task.kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+
+def when_all(futures, callback: Callable):
+    """
+    Llama a callback(futures) una sola vez, cuando todos hayan terminado
+    (desde el hilo que complete el último; inmediatamente si no hay ninguno)
+    """
+    futures = list(futures)
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        callback(futures)
+
+    if not futures:
+        callback(futures)
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
+# Instancia global
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> NetworkScheduler:
+    """Obtiene el planificador de red global"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = NetworkScheduler()
+        return _scheduler
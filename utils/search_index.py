@@ -0,0 +1,150 @@
+"""
+Índice de búsqueda en memoria sobre los juegos de todas las plataformas
+Soporta coincidencias por prefijo, subcadena y trigramas (búsqueda difusa)
+"""
+import bisect
+import re
+import unicodedata
+from typing import List, Optional
+from utils.models import Game
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Puntuaciones por tipo de coincidencia (mayor es mejor)
+SCORE_PREFIX = 3.0
+SCORE_WORD_PREFIX = 2.5
+SCORE_SUBSTRING = 2.0
+# Fracción mínima de trigramas compartidos para una coincidencia difusa
+FUZZY_THRESHOLD = 0.4
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sin acentos y con cualquier separador convertido en un espacio"""
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+def trigrams(text: str) -> set:
+    """Trigramas de un texto normalizado (con relleno en los bordes)"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class GameSearchIndex:
+    """
+    Índice precalculado de nombres y slugs normalizados
+
+    Cada juego se identifica por su posición en la lista original, de modo
+    que la UI puede traducir los resultados a sus cards ya existentes.
+    """
+
+    def __init__(self, games: List[Game]):
+        """
+        Args:
+            games: Lista de juegos (Game)
+        """
+        self.games = games
+        self._keys = []         # texto buscable por juego (nombre + slug)
+        self._prefixes = []     # (clave, id) ordenado para prefijos completos
+        self._words = []        # (palabra, id) ordenado para prefijos de palabra
+        self._trigrams = {}     # trigrama -> lista de ids
+
+        for game_id, game in enumerate(games):
+            name = normalize_text(game.name or '')
+            slug = normalize_text(game.slug or '')
+            key = name if slug == name else f"{name} {slug}"
+            self._keys.append(key)
+
+            self._prefixes.append((name, game_id))
+            if slug and slug != name:
+                self._prefixes.append((slug, game_id))
+            for word in set(key.split()):
+                self._words.append((word, game_id))
+            for tri in trigrams(name):
+                self._trigrams.setdefault(tri, []).append(game_id)
+
+        self._prefixes.sort()
+        self._words.sort()
+        # Posición alfabética de cada juego: desempate barato entre enteros
+        self._order = [0] * len(games)
+        for position, game_id in enumerate(sorted(range(len(games)), key=self._keys.__getitem__)):
+            self._order[game_id] = position
+
+    def __len__(self):
+        return len(self.games)
+
+    @staticmethod
+    def _prefix_range(entries, prefix):
+        """Ids de las entradas ordenadas que empiezan por prefix"""
+        start = bisect.bisect_left(entries, (prefix,))
+        end = bisect.bisect_left(entries, (prefix + '\uffff',))
+        return [game_id for _, game_id in entries[start:end]]
+
+    def search(self, query: str, runner: Optional[str] = None,
+               limit: Optional[int] = None) -> List[int]:
+        """
+        Busca juegos y retorna sus ids ordenados por relevancia
+
+        Args:
+            query: Texto escrito por el usuario
+            runner: Si se indica, solo juegos de ese runner
+            limit: Cantidad máxima de resultados
+
+        Returns:
+            Lista de ids (posiciones en la lista original de juegos)
+        """
+        q = normalize_text(query)
+        if not q:
+            ids = range(len(self.games))
+            if runner:
+                ids = [i for i in ids if self.games[i].runner == runner]
+            return list(ids)[:limit] if limit else list(ids)
+
+        scores = {}
+
+        def add(game_id, score):
+            if score > scores.get(game_id, 0):
+                scores[game_id] = score
+
+        # 1. Prefijo del nombre o slug completo
+        for game_id in self._prefix_range(self._prefixes, q):
+            add(game_id, SCORE_PREFIX)
+
+        # 2. Prefijo de alguna palabra (solo consultas de una palabra)
+        if ' ' not in q:
+            for game_id in self._prefix_range(self._words, q):
+                add(game_id, SCORE_WORD_PREFIX)
+
+        # 3. Subcadena (con un solo carácter casi todo coincide: basta el prefijo)
+        if len(q) >= 2:
+            for game_id, key in enumerate(self._keys):
+                if q in key and game_id not in scores:
+                    add(game_id, SCORE_SUBSTRING)
+
+        # 4. Trigramas (tolerante a errores de escritura)
+        if len(q) >= 3:
+            query_tris = trigrams(q)
+            hits = {}
+            for tri in query_tris:
+                for game_id in self._trigrams.get(tri, ()):
+                    hits[game_id] = hits.get(game_id, 0) + 1
+            needed = len(query_tris) * FUZZY_THRESHOLD
+            for game_id, count in hits.items():
+                if count >= needed and game_id not in scores:
+                    add(game_id, count / len(query_tris))
+
+        tiers = {}
+        for game_id, score in scores.items():
+            if runner and self.games[game_id].runner != runner:
+                continue
+            tiers.setdefault(score, []).append(game_id)
+
+        ranked = []
+        for score in sorted(tiers, reverse=True):
+            ranked.extend(sorted(tiers[score], key=self._order.__getitem__))
+            if limit and len(ranked) >= limit:
+                return ranked[:limit]
+        return ranked
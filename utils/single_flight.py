@@ -0,0 +1,82 @@
+"""
+Combinación de peticiones idénticas en curso (single-flight)
+Si varios hilos o ventanas piden la misma clave a la vez, solo el primero
+hace el trabajo; los demás esperan y reciben el mismo resultado (o la misma
+excepción). Al terminar, la clave se olvida: no es una caché.
+
+Ejemplo:
+    _flights = SingleFlight("api")
+    data = _flights.do(url, lambda: fetch(url))
+
+Contadores en utils.metrics:
+    singleflight.<nombre>.calls    llamadas totales
+    singleflight.<nombre>.shared   llamadas que reutilizaron un trabajo en curso
+"""
+import threading
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+from utils import metrics
+from utils.net import Deadline, DeadlineExceeded
+
+T = TypeVar('T')
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Nombre del grupo (prefijo de sus contadores)
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T], deadline: Optional[Deadline] = None) -> T:
+        """
+        Ejecuta fn una sola vez por clave entre los que llegan a la vez
+
+        Args:
+            key: Clave que identifica el trabajo
+            fn: Trabajo a ejecutar si no hay uno igual en curso
+            deadline: Plazo de quien llama; si se agota esperando un trabajo ajeno
+                      se lanza DeadlineExceeded (como si hubiera hecho la petición)
+        """
+        metrics.inc(f"singleflight.{self.name}.calls")
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.inc(f"singleflight.{self.name}.shared")
+            if not call.done.wait(max(0.0, deadline.remaining()) if deadline is not None else None):
+                metrics.inc("net.deadline_exceeded")
+                raise DeadlineExceeded(f"Se agotó el plazo esperando una petición en curso ({self.name})")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Claves con un trabajo en curso"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,64 @@
+"""
+Perfil de arranque: tiempo hasta el primer pintado, desglosado por fases
+Se activa con `python3 main.py --startup-profile`.
+"""
+import time
+from utils import tracing
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool = False, start: float = None):
+        """
+        Args:
+            enabled: Si es False, mark() y report() no hacen nada
+            start: Instante inicial (time.perf_counter) si se tomó antes
+        """
+        self.enabled = enabled
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = []  # (fase, instante)
+
+    def mark(self, phase: str):
+        """Registra el fin de una fase"""
+        if not self.enabled:
+            return
+        self.marks.append((phase, time.perf_counter()))
+        tracing.instant(f"startup.{phase}")
+
+    def mark_first_paint(self, widget, phase: str, callback=None):
+        """
+        Registra la fase cuando Tk pinta por primera vez la ventana de widget
+
+        Args:
+            widget: Cualquier widget de la ventana (el evento se escucha en su toplevel)
+            phase: Nombre de la fase
+            callback: Función opcional a llamar tras registrar el pintado
+        """
+        if not self.enabled:
+            return
+        toplevel = widget.winfo_toplevel()
+        state = {'done': False}
+
+        def on_expose(_event):
+            if state['done']:
+                return
+            state['done'] = True
+            self.mark(phase)
+            if callback:
+                # Dejar terminar el resto del pintado antes de seguir
+                toplevel.after_idle(callback)
+
+        toplevel.bind("<Expose>", on_expose, add="+")
+
+    def report(self):
+        """Imprime la tabla de fases con su duración y el tiempo acumulado"""
+        if not self.enabled or not self.marks:
+            return
+        print("\n" + "=" * 50)
+        print("⏱️  PERFIL DE ARRANQUE")
+        print("=" * 50)
+        print(f"{'fase':<28} {'ms':>9} {'total ms':>10}")
+        previous = self.start
+        for phase, instant in self.marks:
+            print(f"{phase:<28} {(instant - previous) * 1000:>9.1f} {(instant - self.start) * 1000:>10.1f}")
+            previous = instant
+        print("=" * 50)
@@ -0,0 +1,180 @@
+"""
+Trazas de rendimiento en formato Chrome trace-event
+Desactivadas por defecto: cada punto instrumentado solo consulta un
+booleano. Al activarlas se registran spans con el hilo que los ejecutó y
+al salir se escribe un JSON que se abre en chrome://tracing o en
+https://ui.perfetto.dev
+
+Activación:
+    LVM_TRACE=/tmp/lvm-trace.json python3 main.py
+    python3 main.py --trace /tmp/lvm-trace.json
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+_enabled = False
+_output_path = None
+_events = []  # list.append es atómico: no hace falta lock para registrar
+_thread_names = {}
+_pid = os.getpid()
+_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000
+
+
+def _register_thread() -> int:
+    tid = threading.get_native_id()
+    if tid not in _thread_names:
+        _thread_names[tid] = threading.current_thread().name
+    return tid
+
+
+class _Span:
+    """Span activo; al cerrarse se guarda como evento completo ('X')"""
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = _now_us()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        event = {
+            'name': self.name,
+            'cat': self.name.split('.', 1)[0],
+            'ph': 'X',
+            'ts': self.start,
+            'dur': end - self.start,
+            'pid': _pid,
+            'tid': _register_thread(),
+        }
+        if self.args:
+            event['args'] = self.args
+        _events.append(event)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **args):
+    """
+    Context manager que mide un bloque
+
+    Ejemplo:
+        with tracing.span("api.request", url=url):
+            ...
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name: str, args=None):
+    """
+    Decorador que mide cada llamada a la función
+
+    Args:
+        name: Nombre del span
+        args: Función opcional que recibe los argumentos de la llamada y
+              retorna un dict para adjuntar al span (solo con trazas activas)
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*call_args, **kwargs):
+            if not _enabled:
+                return fn(*call_args, **kwargs)
+            with _Span(name, args(*call_args, **kwargs) if args else {}):
+                return fn(*call_args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instant(name: str, **args):
+    """Marca un instante (evento 'i') en la línea del hilo actual"""
+    if not _enabled:
+        return
+    event = {'name': name, 'ph': 'i', 's': 't', 'ts': _now_us(), 'pid': _pid, 'tid': _register_thread()}
+    if args:
+        event['args'] = args
+    _events.append(event)
+
+
+def enable(path: Optional[str] = None):
+    """
+    Activa las trazas
+
+    Args:
+        path: Archivo donde guardarlas al salir (None: solo en memoria)
+    """
+    global _enabled, _output_path
+    with _lock:
+        if path:
+            _output_path = path
+        if not _enabled:
+            _enabled = True
+            atexit.register(save)
+    print(f"🔬 Trazas activadas{f' → {_output_path}' if _output_path else ''}")
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enable_from_environment():
+    """Activa las trazas si LVM_TRACE contiene una ruta de salida"""
+    path = os.environ.get("LVM_TRACE")
+    if path:
+        enable(path)
+
+
+def get_events() -> list:
+    """Copia de los eventos registrados (incluye nombres de hilos)"""
+    events = list(_events)
+    for tid, thread_name in list(_thread_names.items()):
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': _pid, 'tid': tid,
+                       'args': {'name': thread_name}})
+    return events
+
+
+def save(path: Optional[str] = None) -> Optional[str]:
+    """Escribe las trazas en formato trace-event JSON y retorna la ruta"""
+    path = path or _output_path
+    if not path or not _events:
+        return None
+    try:
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': get_events(), 'displayTimeUnit': 'ms'}, f)
+        print(f"🔬 Trazas guardadas en {path} ({len(_events)} eventos)")
+        return path
+    except OSError as e:
+        print(f"⚠️ No se pudieron guardar las trazas: {e}")
+        return None